@@ -1,5 +1,9 @@
+import re
+import time
 import streamlit as st
-from modules import polygon_api, dcf, lbo, growth_simulator
+from modules import polygon_api, memo, comps, instrumentation
+
+rerun_start = time.perf_counter()
 
 st.set_page_config(
     page_title="LBO & DCF Valuation Suite",
@@ -34,6 +38,9 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
+if polygon_api.get_api_key() == polygon_api.DEMO_API_KEY:
+    st.warning("⚠️ Using demo API key. Please add your Polygon.io API key to .streamlit/secrets.toml")
+
 # --- Sidebar: Inputs ---
 st.sidebar.title("💼 Deal Inputs")
 ticker = st.sidebar.text_input("Ticker Symbol", value="AAPL")
@@ -48,40 +55,143 @@ st.sidebar.subheader("Model Assumptions")
 interest_rate = st.sidebar.number_input("Interest Rate (%)", value=5.0)
 debt_pct = st.sidebar.slider("% Debt Financing", 0, 100, 60)
 exit_year = st.sidebar.number_input("Exit Year", value=5)
-exit_multiple = st.sidebar.number_input("Exit Multiple (EBITDA)", value=8.0)
+# Default the exit multiple to the peer median EV/EBITDA once a comps universe is loaded
+peers = comps.default_table().peer_multiple(ticker.strip().upper())
+exit_multiple = st.sidebar.number_input("Exit Multiple (EBITDA)", value=round(peers['median'], 1) if peers else 8.0)
+if peers:
+    peer_set = ", ".join(v for v in peers['peers'].values() if v != comps.ALL) or "whole universe"
+    st.sidebar.caption(f"Peer median {peers['median']:.1f}x (IQR {peers['q1']:.1f}x–{peers['q3']:.1f}x, "
+                       f"n={peers['count']}, {peer_set})")
 rev_growth = st.sidebar.slider("Revenue Growth Rate (%)", 0, 50, 8)
 ebitda_margin = st.sidebar.slider("EBITDA Margin (%)", 0, 100, 22)
 discount_rate = st.sidebar.number_input("Discount Rate / WACC (%)", value=10.0)
 holding_period = st.sidebar.slider("Holding Period (years)", 1, 10, 5)
 
+dcf_base = {
+    'rev_growth': rev_growth,
+    'ebitda_margin': ebitda_margin,
+    'discount_rate': discount_rate,
+    'exit_multiple': exit_multiple,
+    'exit_year': exit_year
+}
+lbo_base = {
+    'debt_pct': debt_pct,
+    'interest_rate': interest_rate,
+    'exit_multiple': exit_multiple,
+    'holding_period': holding_period
+}
+
 # --- Main Tabs ---
+# Only the selected tab runs, so each view (and plotly) is imported on first use
 tabs = st.tabs([
-    "📈 DCF Engine", "💣 LBO Engine", "📊 Growth Simulator", "📅 Debt Forecast"
-])
-
-with tabs[0]:
-    st.header("📈 DCF Engine")
-    if data:
-        dcf_outputs = dcf.run(data, rev_growth, ebitda_margin, discount_rate, exit_multiple, exit_year)
-        dcf.display(dcf_outputs)
-    else:
-        st.info("Enter a ticker symbol and fetch data to run DCF model.")
+    "📈 DCF Engine", "💣 LBO Engine", "📊 Growth Simulator", "📅 Debt Forecast", "🧮 Sensitivity", "🎲 Monte Carlo",
+    "🗂 Scenarios", "📡 Live"
+], key="active_tab", on_change="rerun")
 
-with tabs[1]:
-    st.header("💣 LBO Engine")
-    if data:
-        lbo_outputs = lbo.run(data, debt_pct, interest_rate, exit_multiple, exit_year, holding_period)
-        lbo.display(lbo_outputs)
-    else:
-        st.info("Enter a ticker symbol and fetch data to run LBO model.")
+if tabs[0].open:
+    with tabs[0]:
+        st.header("📈 DCF Engine")
+        if data:
+            from modules import dcf, dcf_view
+            dcf_outputs = dcf.run(data, rev_growth, ebitda_margin, discount_rate, exit_multiple, exit_year)
+            dcf_view.display(dcf_outputs)
+        else:
+            st.info("Enter a ticker symbol and fetch data to run DCF model.")
+
+if tabs[1].open:
+    with tabs[1]:
+        st.header("💣 LBO Engine")
+        if data:
+            from modules import lbo, lbo_view
+            lbo_outputs = lbo.run(data, debt_pct, interest_rate, exit_multiple, exit_year, holding_period)
+            lbo_view.display(lbo_outputs)
+            lbo_view.display_goal_seek(data, lbo_base)
+        else:
+            st.info("Enter a ticker symbol and fetch data to run LBO model.")
+
+if tabs[2].open:
+    with tabs[2]:
+        st.header("📊 Growth Trajectory Simulator")
+        from modules import growth_view
+        growth_view.display()
+
+if tabs[3].open:
+    with tabs[3]:
+        st.header("📅 Debt Forecast & Payoff")
+        if data:
+            # lbo.run is memoized, so this reuses the LBO tab's result
+            from modules import lbo, lbo_view
+            lbo_outputs = lbo.run(data, debt_pct, interest_rate, exit_multiple, exit_year, holding_period)
+            lbo_view.display_debt_schedule(lbo_outputs)
+        else:
+            st.info("Run LBO model to view debt schedule.")
 
-with tabs[2]:
-    st.header("📊 Growth Trajectory Simulator")
-    growth_simulator.display()
+if tabs[4].open:
+    with tabs[4]:
+        st.header("🧮 Sensitivity Analysis")
+        if data:
+            from modules import sensitivity_view
+            sensitivity_view.display(data, dcf_base, lbo_base)
+        else:
+            st.info("Enter a ticker symbol and fetch data to run sensitivity tables.")
 
-with tabs[3]:
-    st.header("📅 Debt Forecast & Payoff")
-    if data and 'lbo_outputs' in locals():
-        lbo.display_debt_schedule(lbo_outputs)
+if tabs[5].open:
+    with tabs[5]:
+        st.header("🎲 Monte Carlo Valuation")
+        if data:
+            from modules import monte_carlo_view
+            monte_carlo_view.display(data, dcf_base, lbo_base)
+        else:
+            st.info("Enter a ticker symbol and fetch data to run Monte Carlo simulations.")
+
+if tabs[6].open:
+    with tabs[6]:
+        st.header("🗂 Saved Scenarios")
+        from modules import scenarios_view
+        scenarios_view.display(ticker.strip().upper(), data, {**dcf_base, **lbo_base})
+
+if tabs[7].open:
+    with tabs[7]:
+        st.header("📡 Live Marks")
+        from modules import live_view
+        live_view.display(ticker.strip().upper(), data, {**dcf_base, **lbo_base})
+
+if data:
+    with st.sidebar.expander("📥 Export"):
+        from modules import export_view
+        export_view.display(data, dcf_base, lbo_base, exit_year)
+
+with st.sidebar.expander("🏢 Comps"):
+    universe = st.text_area("Peer universe", placeholder="MSFT, GOOGL, META, AMZN, ORCL")
+    if st.button("Refresh Comps") and universe.strip():
+        table = comps.default_table()
+        with st.spinner("Fetching peer data..."):
+            changed, failures = table.refresh([t.upper() for t in re.split(r"[\s,]+", universe) if t])
+            table.save()
+        st.session_state['comps_status'] = (len(changed), sorted(failures))
+        st.rerun()
+    if 'comps_status' in st.session_state:
+        changed, failed = st.session_state['comps_status']
+        st.caption(f"{changed} companies updated" + (f"; failed: {', '.join(failed)}" if failed else ""))
+    st.caption(f"{len(comps.default_table())} companies in the comps table")
+
+with st.sidebar.expander("⚡ Model Cache"):
+    st.dataframe(memo.stats())
+
+def toggle_recording():
+    # Recording is process-wide, so only an actual toggle touches it, never a plain rerun
+    if st.session_state.get('record_timings'):
+        instrumentation.enable()
     else:
-        st.info("Run LBO model to view debt schedule.") 
\ No newline at end of file
+        instrumentation.disable()
+
+with st.sidebar.expander("🩺 Diagnostics"):
+    recording = st.checkbox("Record timings", value=instrumentation.ENABLED, key="record_timings",
+                            on_change=toggle_recording)
+
+if instrumentation.ENABLED:
+    instrumentation.observe('app.rerun', time.perf_counter() - rerun_start)
+if recording:
+    with st.expander("🩺 Diagnostics", expanded=True):
+        from modules import diagnostics_view
+        diagnostics_view.display()
@@ -0,0 +1,238 @@
+"""Throughput benchmark for the DCF, LBO, debt, IRR and growth engines.
+
+Times every engine over grids of synthetic scenarios and writes the
+results to JSON so runs can be compared over time:
+
+    python benchmarks/models.py --sizes 1 100 10000 1000000 -o bench.json
+    python benchmarks/models.py -o new.json --compare bench.json
+
+Scalar entry points (`dcf.run`, `lbo.run`, ...) are called once per
+scenario, capped at --max-calls; vectorized entry points take the whole
+grid in one call. Memoization is bypassed so every call does real work.
+Exits non-zero when --compare finds a throughput regression beyond
+--tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules import dcf, lbo, irr, growth_simulator  # noqa: E402
+
+def synthetic_data(revenue=100000000):
+    """Return financials shaped like polygon_api.demo_data()."""
+    import pandas as pd
+    return {
+        'financials': {
+            'income': pd.DataFrame({
+                'revenues': [revenue],
+                'operating_expenses': [revenue * 0.7],
+                'net_income': [revenue * 0.2]
+            }),
+            'balance': pd.DataFrame({
+                'total_assets': [revenue * 5],
+                'total_liabilities': [revenue * 3],
+                'total_equity': [revenue * 2]
+            })
+        },
+        'company_info': {'name': 'Synthetic Co', 'market_cap': revenue * 10},
+        'market_data': {'price': 100, 'volume': 1000000, 'market_cap': revenue * 10},
+        'market_cap_ev': {'market_cap': revenue * 10, 'enterprise_value': revenue * 12}
+    }
+
+def scenarios(rng, size):
+    """Draw `size` assumption sets spread around the sidebar defaults."""
+    return {
+        'rev_growth': rng.uniform(0, 20, size),
+        'ebitda_margin': rng.uniform(10, 40, size),
+        'discount_rate': rng.uniform(6, 14, size),
+        'exit_multiple': rng.uniform(5, 12, size),
+        'exit_year': rng.integers(3, 8, size).astype(float),
+        'debt_pct': rng.uniform(30, 80, size),
+        'interest_rate': rng.uniform(3, 10, size),
+        'holding_period': rng.integers(3, 8, size).astype(float)
+    }
+
+def cash_flows(s):
+    """Equity cash flows (scenario, year) with a sign change, for the IRR solver."""
+    years = 7
+    flows = np.zeros((len(s['exit_multiple']), years + 1))
+    flows[:, 0] = -1.0
+    flows[:, 1:years] = 0.05
+    flows[:, years] = s['exit_multiple'] / 4
+    return flows
+
+# name -> (kind, builder). A builder takes (data, scenarios) and returns
+# the calls to time: one per scenario for scalar benchmarks, one in total
+# for vectorized ones.
+def scalar_dcf(data, s):
+    run = dcf.run.uncached
+    return [lambda i=i: run(data, s['rev_growth'][i], s['ebitda_margin'][i], s['discount_rate'][i],
+                            s['exit_multiple'][i], int(s['exit_year'][i])) for i in range(len(s['rev_growth']))]
+
+def scalar_lbo(data, s):
+    run = lbo.run.uncached
+    return [lambda i=i: run(data, s['debt_pct'][i], s['interest_rate'][i], s['exit_multiple'][i],
+                            int(s['exit_year'][i]), int(s['holding_period'][i])) for i in range(len(s['debt_pct']))]
+
+def scalar_debt_schedule(data, s):
+    return [lambda i=i: lbo.calculate_debt_schedule(1.2e9, s['debt_pct'][i], s['interest_rate'][i],
+                                                    int(s['holding_period'][i])) for i in range(len(s['debt_pct']))]
+
+def scalar_irr(data, s):
+    flows = cash_flows(s)
+    return [lambda i=i: irr.solve_irr(flows[i:i + 1]) for i in range(len(flows))]
+
+def scalar_growth(data, s):
+    simulate = growth_simulator.simulate_growth_scenarios.uncached
+    rates = s['rev_growth']
+    return [lambda i=i: simulate(100.0, 10, {'Base': rates[i], 'Bull': rates[i] + 5, 'Bear': rates[i] - 5})
+            for i in range(len(rates))]
+
+def batch_dcf(data, s):
+    return [lambda: dcf.run_batch(data, s['rev_growth'], s['ebitda_margin'], s['discount_rate'],
+                                  s['exit_multiple'], s['exit_year'])]
+
+def batch_lbo(data, s):
+    return [lambda: lbo.run_batch(data, s['debt_pct'], s['interest_rate'], s['exit_multiple'], s['holding_period'])]
+
+def batch_debt_schedule(data, s):
+    return [lambda: lbo.calculate_debt_schedule_batch(1.2e9, s['debt_pct'], s['interest_rate'], s['holding_period'])]
+
+def batch_irr(data, s):
+    flows = cash_flows(s)
+    return [lambda: irr.solve_irr(flows)]
+
+def batch_growth(data, s):
+    rates = np.repeat(s['rev_growth'][:, None], 10, axis=1)
+    return [lambda: growth_simulator.growth_paths(100.0, rates)]
+
+BENCHMARKS = {
+    'dcf.run': ('scalar', scalar_dcf),
+    'dcf.run_batch': ('batch', batch_dcf),
+    'lbo.run': ('scalar', scalar_lbo),
+    'lbo.run_batch': ('batch', batch_lbo),
+    'lbo.calculate_debt_schedule': ('scalar', scalar_debt_schedule),
+    'lbo.calculate_debt_schedule_batch': ('batch', batch_debt_schedule),
+    'irr.solve_irr.single': ('scalar', scalar_irr),
+    'irr.solve_irr': ('batch', batch_irr),
+    'growth_simulator.simulate_growth_scenarios': ('scalar', scalar_growth),
+    'growth_simulator.growth_paths': ('batch', batch_growth)
+}
+
+def measure(calls, repeats):
+    """Time each call `repeats` times; return per-call latencies in seconds."""
+    latencies = []
+    for _ in range(repeats):
+        for call in calls:
+            start = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - start)
+    return np.array(latencies)
+
+def peak_memory(call):
+    """Peak traced allocation (bytes) during one call; NumPy buffers are included."""
+    tracemalloc.start()
+    try:
+        call()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run_benchmark(name, size, data, max_calls, repeats, seed):
+    kind, builder = BENCHMARKS[name]
+    n = min(size, max_calls) if kind == 'scalar' else size
+    calls = builder(data, scenarios(np.random.default_rng(seed), n))
+    calls[0]()  # warm-up
+    latencies = measure(calls, repeats)
+    per_call = n / len(calls)
+    total = latencies.sum()
+    return {
+        'name': name,
+        'kind': kind,
+        'size': size,
+        'scenarios_timed': n,
+        'calls': len(latencies),
+        'seconds': total,
+        'scenarios_per_s': per_call * len(latencies) / total if total else float('inf'),
+        'latency_ms': {f"p{p}": float(np.percentile(latencies, p) * 1000) for p in (50, 90, 99)} | {
+            'max': float(latencies.max() * 1000)
+        },
+        'peak_mb': peak_memory(calls[0]) / 2 ** 20
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(results, baseline, tolerance):
+    """Return (name, size, old, new) for every result slower than baseline by more than `tolerance`."""
+    old = {(r['name'], r['size']): r['scenarios_per_s'] for r in baseline['results']}
+    regressions = []
+    for r in results:
+        before = old.get((r['name'], r['size']))
+        if before and r['scenarios_per_s'] < before * (1 - tolerance):
+            regressions.append((r['name'], r['size'], before, r['scenarios_per_s']))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10000, 1000000], help="Scenario grid sizes")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument('--max-calls', type=int, default=1000, help="Cap on timed calls for scalar benchmarks")
+    parser.add_argument('--repeats', type=int, default=5, help="Times each call is repeated")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default='benchmark-models.json', help="JSON file to write")
+    parser.add_argument('--compare', metavar='BASELINE', help="Earlier JSON output to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed throughput drop vs baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    data = synthetic_data()
+    results = []
+    print(f"{'benchmark':50} {'size':>9} {'scen/s':>12} {'p50 ms':>9} {'p99 ms':>9} {'peak MB':>8}")
+    for size in args.sizes:
+        for name in args.only or BENCHMARKS:
+            r = run_benchmark(name, size, data, args.max_calls, args.repeats, args.seed)
+            results.append(r)
+            print(f"{name:50} {size:>9} {r['scenarios_per_s']:>12,.0f} {r['latency_ms']['p50']:>9.3f} "
+                  f"{r['latency_ms']['p99']:>9.3f} {r['peak_mb']:>8.1f}")
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': vars(args)
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name, size, before, after in regressions:
+            print(f"REGRESSION {name} @ {size}: {before:,.0f} -> {after:,.0f} scenarios/s")
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.tolerance:.0%} vs {args.compare}")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
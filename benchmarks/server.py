@@ -0,0 +1,106 @@
+"""Load test for the model server.
+
+Starts `modules.server` in-process on a free port (or targets --url) and
+drives it with concurrent keep-alive clients, then reports requests per
+second, client-side latency percentiles and the server's batch sizes:
+
+    python benchmarks/server.py --clients 64 --requests 5000 --endpoint lbo
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules import instrumentation, server  # noqa: E402
+
+def payload(rng, endpoint):
+    """One random request body near the sidebar defaults."""
+    if endpoint == 'growth':
+        return {'base_value': 100.0, 'years': int(rng.integers(3, 11)), 'rate': float(rng.uniform(0, 20))}
+    body = {
+        'revenue': float(rng.uniform(1e8, 1e10)),
+        'exit_multiple': float(rng.uniform(5, 12))
+    }
+    if endpoint == 'dcf':
+        body.update(rev_growth=float(rng.uniform(0, 20)), discount_rate=float(rng.uniform(6, 14)),
+                    exit_year=int(rng.integers(3, 8)))
+    else:
+        body.update(debt_pct=float(rng.uniform(30, 80)), interest_rate=float(rng.uniform(3, 10)),
+                    holding_period=int(rng.integers(3, 8)))
+    return body
+
+async def post(reader, writer, host, path, body):
+    data = json.dumps(body).encode()
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':')[1])
+    return status, json.loads(await reader.readexactly(length))
+
+async def client(host, port, path, bodies, latencies, failures):
+    reader, writer = await asyncio.open_connection(host, port)
+    for body in bodies:
+        start = time.perf_counter()
+        status, _ = await post(reader, writer, host, path, body)
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            failures.append(status)
+    writer.close()
+
+async def load(args):
+    rng = np.random.default_rng(args.seed)
+    local = None
+    host, port = args.host, args.port
+    if not port:
+        instrumentation.enable()
+        local = server.Server(workers=args.workers, max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000)
+        await local.start(host, 0)
+        port = local.port
+    path = f"/{args.endpoint}"
+    bodies = [payload(rng, args.endpoint) for _ in range(args.requests)]
+    latencies, failures = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, path, bodies[i::args.clients], latencies, failures)
+                           for i in range(args.clients)))
+    elapsed = time.perf_counter() - start
+    ms = np.array(latencies) * 1000
+    print(f"{args.requests} {path} requests from {args.clients} clients in {elapsed:.2f}s: "
+          f"{args.requests / elapsed:,.0f} req/s, {len(failures)} failed")
+    print(f"latency ms  p50 {np.percentile(ms, 50):.2f}  p95 {np.percentile(ms, 95):.2f}  "
+          f"p99 {np.percentile(ms, 99):.2f}  max {ms.max():.2f}")
+    if local is not None:
+        _, counters = instrumentation.snapshot()
+        batches = counters.get(f"server.{args.endpoint}.batches", 0)
+        if batches:
+            print(f"mean batch size {counters[f'server.{args.endpoint}.requests'] / batches:.1f} over {batches} batches")
+        await local.close()
+    return 1 if failures else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--endpoint', choices=list(server.ENDPOINTS), default='lbo')
+    parser.add_argument('--clients', type=int, default=64, help="Concurrent keep-alive connections")
+    parser.add_argument('--requests', type=int, default=5000, help="Total requests")
+    parser.add_argument('--host', default=server.HOST)
+    parser.add_argument('--port', type=int, default=None, help="Target a running server instead of starting one")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-batch', type=int, default=server.MAX_BATCH)
+    parser.add_argument('--max-wait-ms', type=float, default=server.MAX_WAIT * 1000)
+    parser.add_argument('--seed', type=int, default=0)
+    return asyncio.run(load(parser.parse_args(argv)))
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+"""Cold-start benchmark for app.py with an import-time budget.
+
+Runs the app script in a fresh interpreter under `python -X importtime`
+(Streamlit bare mode, no server), several times, and reports the median
+wall time, total import time and the heaviest top-level imports:
+
+    python benchmarks/startup.py --runs 5 --budget 2.5
+
+Exits non-zero when the median wall time exceeds the budget (seconds).
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should only load when a tab or feature needs them. Streamlit
+# itself imports plotly.graph_objects, so plotly is not listed.
+WATCHED = ['openpyxl', 'modules.dcf', 'modules.dcf_view', 'modules.lbo', 'modules.lbo_view', 'modules.growth_view',
+           'modules.sensitivity_view', 'modules.monte_carlo_view']
+
+LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)')
+
+SCRIPT = f"""
+import runpy, sys
+runpy.run_path('app.py', run_name='__main__')
+print('LOADED ' + ' '.join(m for m in {WATCHED!r} if m in sys.modules))
+"""
+
+def parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us, depth)} from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return modules
+
+def run_once(python=sys.executable):
+    """Start the app once in a fresh interpreter and time it."""
+    start = time.perf_counter()
+    proc = subprocess.run([python, '-X', 'importtime', '-c', SCRIPT], cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"app.py failed to start:\n{proc.stderr[-2000:]}")
+    modules = parse_importtime(proc.stderr)
+    loaded = next((l.split()[1:] for l in proc.stdout.splitlines() if l.startswith('LOADED')), [])
+    return {
+        'wall_s': wall,
+        'import_s': sum(m[0] for m in modules.values()) / 1e6,
+        'n_modules': len(modules),
+        'top_level': {name: m[1] / 1e6 for name, m in modules.items() if m[2] == 0},
+        'loaded': loaded
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help="Cold starts to measure (default 5)")
+    parser.add_argument('--budget', type=float, default=2.5, help="Median wall-time budget in seconds (default 2.5)")
+    parser.add_argument('--top', type=int, default=10, help="Heaviest top-level imports to show")
+    parser.add_argument('--json', metavar='PATH', help="Also write the results to a JSON file")
+    args = parser.parse_args(argv)
+
+    run_once()  # warm the bytecode and OS file caches
+    runs = [run_once() for _ in range(args.runs)]
+    wall = statistics.median(r['wall_s'] for r in runs)
+    imports = statistics.median(r['import_s'] for r in runs)
+    top = sorted(runs[-1]['top_level'].items(), key=lambda kv: kv[1], reverse=True)[:args.top]
+
+    print(f"cold start (median of {args.runs}): {wall:.3f}s wall, {imports:.3f}s in imports, "
+          f"{runs[-1]['n_modules']} modules")
+    for name, seconds in top:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+    print("heavy modules loaded at startup: " + (', '.join(runs[-1]['loaded']) or "none"))
+    ok = wall <= args.budget
+    print(f"budget {args.budget:.3f}s: {'OK' if ok else 'EXCEEDED'}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'python': sys.version, 'budget_s': args.budget, 'median_wall_s': wall,
+                       'median_import_s': imports, 'runs': runs}, f, indent=2)
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,164 @@
+"""Headless batch valuation runner.
+
+Reads a CSV or Parquet file with one row per (ticker, assumption set),
+runs the DCF and LBO engines for every row and writes the results to
+Parquet. No Streamlit import is involved:
+
+    python -m modules.batch coverage.csv -o results.parquet --processes 8
+
+Base financials come from a `revenues` column when present, otherwise
+from the columnar financials store, optionally falling back to a live
+Polygon fetch with --fetch. With --comps, rows without an exit multiple
+use the ticker's peer median EV/EBITDA from a saved comps table.
+"""
+import argparse
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from modules import dcf, lbo
+
+# Sidebar defaults, used for any assumption column missing from the input
+DEFAULTS = {
+    'rev_growth': 8.0,
+    'ebitda_margin': 22.0,
+    'discount_rate': 10.0,
+    'exit_multiple': 8.0,
+    'exit_year': 5,
+    'debt_pct': 60.0,
+    'interest_rate': 5.0,
+    'holding_period': 5,
+    'ebitda_growth': 8.0
+}
+
+OUTPUTS = [
+    'enterprise_value', 'equity_value', 'purchase_price', 'exit_value',
+    'equity_invested', 'initial_debt', 'irr', 'irr_converged', 'moic', 'error'
+]
+
+logger = logging.getLogger(__name__)
+
+def load_financials(ticker, revenue, store_root, fetch):
+    """Return the engine-ready financials dict for a ticker, or None."""
+    import pandas as pd
+    if revenue is not None and np.isfinite(revenue):
+        return {'income': pd.DataFrame({'revenues': [float(revenue)]})}
+    from modules.financials_store import FinancialsStore
+    financials = FinancialsStore(store_root).financials(ticker)
+    if financials is None and fetch:
+        from modules import polygon_api
+        financials = polygon_api.fetch_all(ticker)['financials']
+    return financials
+
+def peer_exit_multiples(tickers, path):
+    """Peer median EV/EBITDA per ticker from a saved comps table (NaN where none qualifies)."""
+    import pandas as pd
+    from modules.comps import CompsTable
+    table = CompsTable.load(path)
+    medians = {t: (table.peer_multiple(t) or {}).get('median', np.nan) for t in pd.unique(tickers)}
+    return tickers.map(medians).astype(float)
+
+def value_group(job):
+    """Value every assumption row for one ticker in a single vectorized call per engine."""
+    ticker, columns, net_debt, store_root, fetch = job
+    n = len(columns['exit_multiple'])
+    result = {name: np.full(n, np.nan) for name in OUTPUTS if name not in ('irr_converged', 'error')}
+    result['irr_converged'] = np.zeros(n, dtype=bool)
+    result['error'] = np.full(n, None, dtype=object)
+
+    revenue = columns.get('revenues', [None])[0]
+    try:
+        financials = load_financials(ticker, revenue, store_root, fetch)
+    except Exception as e:
+        financials = None
+        logger.warning("Could not load financials for %s: %s", ticker, e)
+    if financials is None or financials['income'].empty:
+        result['error'][:] = "no financials"
+        return ticker, result
+
+    data = {'financials': financials, 'market_cap_ev': net_debt}
+    dcf_out = dcf.run_batch(
+        data, columns['rev_growth'], columns['ebitda_margin'], columns['discount_rate'],
+        columns['exit_multiple'], columns['exit_year']
+    )
+    lbo_out = lbo.run_batch(
+        data, columns['debt_pct'], columns['interest_rate'], columns['exit_multiple'],
+        columns['holding_period'], ebitda_growth=columns['ebitda_growth']
+    )
+    for name in ('enterprise_value', 'equity_value'):
+        result[name] = dcf_out[name]
+    for name in ('purchase_price', 'exit_value', 'equity_invested', 'initial_debt', 'irr', 'irr_converged', 'moic'):
+        result[name] = lbo_out[name]
+    return ticker, result
+
+def run(df, processes=None, store_root=None, fetch=False, comps_path=None):
+    """Value every row of an assumptions DataFrame and return it with result columns.
+
+    With `comps_path`, a missing exit multiple takes the ticker's peer
+    median EV/EBITDA before falling back to the sidebar default.
+    """
+    import pandas as pd
+    from modules.financials_store import STORE_PATH
+    df = df.reset_index(drop=True).copy()
+    if comps_path:
+        peers = peer_exit_multiples(df['ticker'], comps_path)
+        df['exit_multiple'] = df['exit_multiple'].fillna(peers) if 'exit_multiple' in df else peers
+    for name, default in DEFAULTS.items():
+        if name not in df:
+            df[name] = default
+        df[name] = df[name].fillna(default)
+
+    jobs = []
+    for ticker, rows in df.groupby('ticker', sort=False):
+        columns = {name: rows[name].to_numpy(dtype=float) for name in DEFAULTS}
+        if 'revenues' in rows:
+            columns['revenues'] = rows['revenues'].to_numpy(dtype=float)
+        net_debt = {}
+        if 'market_cap' in rows and 'enterprise_value' in rows:
+            net_debt = {'market_cap': rows['market_cap'].iloc[0], 'enterprise_value': rows['enterprise_value'].iloc[0]}
+        jobs.append((ticker, columns, net_debt, store_root or STORE_PATH, fetch))
+
+    if processes and processes > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = dict(pool.map(value_group, jobs, chunksize=max(1, len(jobs) // (processes * 4))))
+    else:
+        results = dict(map(value_group, jobs))
+
+    out = {name: np.full(len(df), np.nan) for name in OUTPUTS}
+    out['irr_converged'] = np.zeros(len(df), dtype=bool)
+    out['error'] = np.full(len(df), None, dtype=object)
+    for ticker, positions in df.groupby('ticker', sort=False).indices.items():
+        for name, values in results[ticker].items():
+            out[name][positions] = values
+    return pd.concat([df, pd.DataFrame(out, index=df.index)], axis=1)
+
+def read_table(path):
+    import pandas as pd
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run DCF and LBO valuations without the Streamlit UI.")
+    parser.add_argument('input', help="CSV or Parquet file with a 'ticker' column and optional assumption columns")
+    parser.add_argument('-o', '--output', default='valuations.parquet', help="Parquet file to write")
+    parser.add_argument('-p', '--processes', type=int, default=None, help="Worker processes (default: run in-process)")
+    parser.add_argument('--store', default=None, help="Financials store directory")
+    parser.add_argument('--fetch', action='store_true', help="Fetch financials from Polygon when not in the store")
+    parser.add_argument('--comps', metavar='PATH', help="Saved comps table; missing exit multiples use peer medians")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    start = time.perf_counter()
+    df = read_table(args.input)
+    results = run(df, processes=args.processes, store_root=args.store, fetch=args.fetch, comps_path=args.comps)
+    results.to_parquet(args.output, index=False)
+    failed = results['error'].notna().sum()
+    logger.info(
+        "Valued %d rows (%d tickers, %d failed) in %.2fs -> %s",
+        len(results), results['ticker'].nunique(), failed, time.perf_counter() - start, args.output
+    )
+    return 0 if failed < len(results) else 1
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,53 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+class DiskCache:
+    """Persistent TTL cache of JSON payloads in a local SQLite file.
+
+    Entries are keyed by (ticker, endpoint). Expired entries are not
+    deleted, so callers can still fall back to them when offline.
+    """
+
+    def __init__(self, path, ttl=3600):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'ticker TEXT NOT NULL, endpoint TEXT NOT NULL, '
+                'fetched_at REAL NOT NULL, payload TEXT NOT NULL, '
+                'PRIMARY KEY (ticker, endpoint))'
+            )
+
+    def get(self, ticker, endpoint, allow_stale=False):
+        """Return the cached payload, or None if missing or expired."""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT fetched_at, payload FROM responses WHERE ticker = ? AND endpoint = ?',
+                (ticker, endpoint)
+            ).fetchone()
+        if row is None:
+            return None
+        fetched_at, payload = row
+        if not allow_stale and time.time() - fetched_at > self.ttl:
+            return None
+        return json.loads(payload)
+
+    def set(self, ticker, endpoint, payload):
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses (ticker, endpoint, fetched_at, payload) VALUES (?, ?, ?, ?)',
+                (ticker, endpoint, time.time(), json.dumps(payload))
+            )
+
+    def clear(self):
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM responses')
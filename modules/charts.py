@@ -0,0 +1,98 @@
+import numpy as np
+import plotly.graph_objs as go
+from modules.utils import neon_palette
+from modules.instrumentation import timed
+
+COLORS = neon_palette()
+
+# Layout shared by every chart in the app
+LAYOUT = dict(
+    template="plotly_dark",
+    plot_bgcolor="#18181b",
+    paper_bgcolor="#18181b",
+    font=dict(color="#00ffe7")
+)
+
+# Points per trace sent to the browser, and the size above which traces
+# are drawn with WebGL instead of SVG
+MAX_POINTS = 2000
+WEBGL_THRESHOLD = 1000
+
+def lttb(x, y, n_out):
+    """Return indices of `n_out` points chosen by Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last points and, from each bucket in between, the
+    point forming the largest triangle with the previously kept point and
+    the mean of the next bucket, which preserves peaks and troughs.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+def decimate(x, y, max_points=MAX_POINTS):
+    """Downsample a series with LTTB when it has more than `max_points` points."""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(x) <= max_points:
+        return x, y
+    keep = lttb(x, y, max_points)
+    return x[keep], y[keep]
+
+def line(x, y, max_points=MAX_POINTS, **kwargs):
+    """Build a line trace, decimated and switched to WebGL for large series."""
+    x, y = decimate(x, y, max_points)
+    trace = go.Scattergl if len(x) > WEBGL_THRESHOLD else go.Scatter
+    return trace(x=x, y=y, **kwargs)
+
+def paths(x, ys, max_traces=50, color=COLORS[1], **kwargs):
+    """Draw up to `max_traces` paths as one trace, separated by gaps.
+
+    A single trace with NaN breaks is far cheaper to serialize and render
+    than one trace per path.
+    """
+    ys = np.asarray(ys, dtype=float)[:max_traces]
+    x = np.asarray(x, dtype=float)
+    gap = np.full((len(ys), 1), np.nan)
+    xs = np.concatenate([np.broadcast_to(x, ys.shape), gap], axis=1).ravel()
+    return line(xs, np.concatenate([ys, gap], axis=1).ravel(), max_points=np.inf, mode='lines',
+                line=dict(color=color, width=1), opacity=0.4, connectgaps=False, hoverinfo='skip', **kwargs)
+
+def bands(x, band_values, color="0, 255, 231", median_color=COLORS[0]):
+    """Return traces for nested percentile bands plus the median.
+
+    `band_values` maps percentile -> per-x values (it must include 50);
+    percentiles are paired from the outside in, e.g. P5-P95 and P25-P75.
+    """
+    pcts = sorted(band_values)
+    pairs = [(pcts[i], pcts[-1 - i]) for i in range(len(pcts) // 2)]
+    traces = []
+    for i, (lo, hi) in enumerate(pairs):
+        opacity = 0.15 * (i + 1)
+        traces.append(go.Scatter(x=x, y=band_values[hi], mode='lines', line=dict(width=0), showlegend=False,
+                                 hoverinfo='skip'))
+        traces.append(go.Scatter(x=x, y=band_values[lo], mode='lines', line=dict(width=0), fill='tonexty',
+                                 fillcolor=f"rgba({color}, {opacity})", name=f"P{lo}-P{hi}"))
+    if 50 in band_values:
+        traces.append(go.Scatter(x=x, y=band_values[50], name="Median", line=dict(color=median_color, width=3)))
+    return traces
+
+@timed()
+def figure(traces=(), title=None, xaxis_title=None, yaxis_title=None, **layout):
+    """Create a figure with the app's dark neon layout."""
+    fig = go.Figure(data=list(traces))
+    fig.update_layout(title=title, xaxis_title=xaxis_title, yaxis_title=yaxis_title, **{**LAYOUT, **layout})
+    return fig
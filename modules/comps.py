@@ -0,0 +1,253 @@
+"""Comparable-companies table: trading multiples for a peer universe.
+
+One row per ticker holds trailing fundamentals, market cap and the
+EV/EBITDA, EV/Revenue and P/E multiples. Peer statistics (count, median
+and quartiles of each multiple) are precomputed for every combination of
+sector, size band and growth band, including roll-ups, so a peer-set
+query is a dictionary lookup. Updates only recompute the groups whose
+members changed.
+"""
+import os
+import numpy as np
+import pandas as pd
+
+MULTIPLES = ['ev_ebitda', 'ev_revenue', 'pe']
+DIMENSIONS = ['sector', 'size_band', 'growth_band']
+ALL = '*'  # a rolled-up dimension in a stats key
+UNKNOWN = 'n/a'
+
+# (lower bound, label): market cap in $, revenue growth in %
+SIZE_BANDS = [(0, 'micro'), (300e6, 'small'), (2e9, 'mid'), (10e9, 'large'), (200e9, 'mega')]
+GROWTH_BANDS = [(-np.inf, 'declining'), (0, 'low'), (10, 'mid'), (25, 'high')]
+
+FLOWS = ['revenues', 'cost_of_revenue', 'operating_expenses', 'operating_income', 'net_income']
+HISTORY_COLUMNS = ['fiscal_period'] + FLOWS + ['long_term_debt']
+NUMERIC = ['market_cap'] + FLOWS + ['long_term_debt', 'revenue_growth']
+INPUTS = ['name', 'sector', 'period_end'] + NUMERIC
+COLUMNS = INPUTS + ['ebitda', 'enterprise_value'] + MULTIPLES + ['size_band', 'growth_band']
+
+MIN_PEERS = 5
+COMPS_PATH = os.environ.get("COMPS_PATH", os.path.join(".cache", "comps.parquet"))
+
+# Every subset of DIMENSIONS, from the whole universe to the finest grouping
+LEVELS = [tuple(d for i, d in enumerate(DIMENSIONS) if mask >> i & 1) for mask in range(2 ** len(DIMENSIONS))]
+
+def band(values, bands):
+    """Label each value with the band whose lower bound it reaches; NaN gets UNKNOWN."""
+    values = np.asarray(values, dtype=float)
+    labels = np.array([label for _, label in bands] + [UNKNOWN], dtype=object)
+    idx = np.searchsorted([lo for lo, _ in bands], values, side='right') - 1
+    return labels[np.where(np.isfinite(values) & (idx >= 0), idx, len(bands))]
+
+def trailing(history):
+    """Trailing fundamentals per ticker from normalized financials-store rows.
+
+    Flows are the sum of the latest four quarters when they span a year,
+    otherwise the latest annual row, whichever is more recent; debt is the
+    latest balance. Revenue growth compares the latest period with the same
+    fiscal period a year earlier.
+    """
+    h = history.reset_index() if 'ticker' not in history.columns else history
+    h = h.dropna(subset=['period_end']).sort_values(['ticker', 'period_end'], ascending=[True, False])
+    h = h.assign(fiscal_period=h['fiscal_period'].fillna('').astype(str) if 'fiscal_period' in h else '')
+    quarter = h['fiscal_period'].str.fullmatch(r'Q[1-4]')
+
+    quarters = h[quarter].groupby('ticker', sort=False).head(4).groupby('ticker', sort=False)
+    span = quarters['period_end'].max() - quarters['period_end'].min()
+    full_year = (quarters.size() == 4) & (span <= pd.Timedelta(days=300))
+    ttm = quarters[FLOWS].sum(min_count=1)[full_year]
+    ttm['period_end'] = quarters['period_end'].max()[full_year]
+    annual = h[~quarter].groupby('ticker', sort=False).head(1).set_index('ticker')[FLOWS + ['period_end']]
+    flows = pd.concat([ttm, annual]).sort_values('period_end', ascending=False, kind='stable')
+    out = flows[~flows.index.duplicated()]
+
+    latest = h.groupby('ticker', sort=False).head(1)
+    out = out.assign(long_term_debt=latest.set_index('ticker')['long_term_debt'].reindex(out.index))
+
+    current = latest[['ticker', 'period_end', 'fiscal_period', 'revenues']]
+    prior = pd.merge_asof(
+        current.assign(period_end=current['period_end'] - pd.Timedelta(days=365)).sort_values('period_end'),
+        h[['ticker', 'period_end', 'fiscal_period', 'revenues']].sort_values('period_end'),
+        on='period_end', by=['ticker', 'fiscal_period'], direction='nearest', tolerance=pd.Timedelta(days=45),
+        suffixes=('', '_prior')
+    ).set_index('ticker')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.where(prior['revenues_prior'] > 0, (prior['revenues'] / prior['revenues_prior'] - 1) * 100, np.nan)
+    out['revenue_growth'] = pd.Series(growth, index=prior.index).reindex(out.index)
+    return out
+
+def market_fields(results):
+    """Name, sector and market cap from a `polygon_api.fetch_many` results frame."""
+    market_cap = results['market_cap']
+    if 'company_market_cap' in results:
+        market_cap = market_cap.fillna(results['company_market_cap'])
+    out = pd.DataFrame({'market_cap': market_cap.astype(float)}, index=results.index)
+    for column in ('name', 'sector'):
+        if column in results:
+            out[column] = results[column]
+    return out
+
+def derive(rows):
+    """Add EBITDA, enterprise value, multiples and bands to input rows.
+
+    The financials store has no D&A line, so operating income stands in
+    for EBITDA (falling back to revenue less costs). Enterprise value is
+    market cap plus long-term debt. Multiples are NaN where the
+    denominator is not positive.
+    """
+    rows = rows.reindex(columns=INPUTS)
+    rows[NUMERIC] = rows[NUMERIC].astype(float)
+    rows['period_end'] = pd.to_datetime(rows['period_end'])
+    rows['sector'] = rows['sector'].fillna(UNKNOWN)
+    proxy = rows['revenues'] - rows['cost_of_revenue'].fillna(0) - rows['operating_expenses']
+    rows['ebitda'] = rows['operating_income'].fillna(proxy)
+    rows['enterprise_value'] = rows['market_cap'] + rows['long_term_debt'].fillna(0)
+    for name, numerator, denominator in (('ev_ebitda', 'enterprise_value', 'ebitda'),
+                                         ('ev_revenue', 'enterprise_value', 'revenues'),
+                                         ('pe', 'market_cap', 'net_income')):
+        rows[name] = (rows[numerator] / rows[denominator]).where(rows[denominator] > 0)
+    rows['size_band'] = band(rows['market_cap'], SIZE_BANDS)
+    rows['growth_band'] = band(rows['revenue_growth'], GROWTH_BANDS)
+    return rows
+
+def summarize(values):
+    """Peer count plus q1 / median / q3 / count of each multiple in a (companies, multiples) array."""
+    entry = {'peers': len(values)}
+    for m, column in zip(MULTIPLES, values.T):
+        column = column[np.isfinite(column)]
+        q1, median, q3 = np.percentile(column, [25, 50, 75]) if len(column) else (np.nan,) * 3
+        entry[m] = {'q1': float(q1), 'median': float(median), 'q3': float(q3), 'count': len(column)}
+    return entry
+
+def same(a, b):
+    """Row-wise equality of two aligned frames, treating NaN as equal."""
+    return ((a == b) | (a.isna() & b.isna())).all(axis=1)
+
+class CompsTable:
+    """Peer multiples indexed by ticker, with precomputed group statistics."""
+
+    def __init__(self, table=None):
+        self.table = derive(pd.DataFrame(index=pd.Index([], name='ticker')) if table is None else table)
+        self.table.index.name = 'ticker'
+        self.stats = {}
+        self.recompute(self.table[DIMENSIONS])
+
+    def __len__(self):
+        return len(self.table)
+
+    def update(self, market=None, history=None):
+        """Fold fresh market data and/or store history into the table.
+
+        `market` is a `fetch_many` results frame and `history` normalized
+        store rows; either may cover a subset of tickers, and fields not
+        supplied (or missing in the new data) keep their current values. Tickers with no history and no
+        row yet take the latest-period fundamentals in `market`. Returns
+        the tickers whose rows changed.
+        """
+        parts = []
+        fundamentals = trailing(history) if history is not None and len(history) else None
+        if fundamentals is not None:
+            parts.append(fundamentals)
+        if market is not None and len(market):
+            parts.append(market_fields(market))
+            fresh = market.index.difference(self.table.index)
+            if fundamentals is not None:
+                fresh = fresh.difference(fundamentals.index)
+            if len(fresh) and 'revenues' in market:
+                parts.append(market.loc[fresh, FLOWS + ['long_term_debt']])
+        if not parts:
+            return []
+
+        tickers = pd.Index(pd.concat([p.index.to_series() for p in parts]).unique(), name='ticker')
+        rows = self.table.reindex(tickers)[INPUTS]
+        for part in parts:
+            rows = part.combine_first(rows)
+        rows = derive(rows.reindex(tickers))
+
+        old = self.table.reindex(tickers)
+        changed = tickers[~same(rows[COLUMNS], old[COLUMNS]).to_numpy()]
+        if not len(changed):
+            return []
+        affected = pd.concat([old.loc[changed.intersection(self.table.index), DIMENSIONS], rows.loc[changed, DIMENSIONS]])
+        self.table = pd.concat([self.table.drop(changed, errors='ignore'), rows.loc[changed]])
+        self.recompute(affected)
+        return list(changed)
+
+    def remove(self, tickers):
+        """Drop tickers from the universe and refresh their groups."""
+        tickers = self.table.index.intersection(tickers)
+        affected = self.table.loc[tickers, DIMENSIONS]
+        self.table = self.table.drop(tickers)
+        self.recompute(affected)
+
+    def recompute(self, keys):
+        """Recompute the stats of every group touched by `keys` (rows of DIMENSIONS)."""
+        touched = {tuple(k[d] if d in level else ALL for d in DIMENSIONS)
+                   for k in keys.to_dict('records') for level in LEVELS}
+        dims = self.table[DIMENSIONS].to_numpy(dtype=object)
+        values = self.table[MULTIPLES].to_numpy(dtype=float)
+        for key in touched:
+            members = np.ones(len(dims), dtype=bool)
+            for j, value in enumerate(key):
+                if value != ALL:
+                    members &= dims[:, j] == value
+            if members.any():
+                self.stats[key] = summarize(values[members])
+            else:
+                self.stats.pop(key, None)
+
+    def query(self, sector=ALL, size_band=ALL, growth_band=ALL):
+        """Stats for one peer set; pass ALL (the default) to ignore a dimension."""
+        return self.stats.get((sector, size_band, growth_band))
+
+    def peer_multiple(self, ticker=None, multiple='ev_ebitda', min_peers=MIN_PEERS, **filters):
+        """Median and quartiles of `multiple` over the narrowest usable peer set.
+
+        Starts from the ticker's own sector / size / growth bands (overridden
+        by `filters`) and widens by dropping growth, then size, then sector
+        until at least `min_peers` companies have the multiple. The ticker
+        itself is included in its peer set. Returns None if no set
+        qualifies.
+        """
+        key = dict.fromkeys(DIMENSIONS, ALL)
+        if ticker in self.table.index:
+            key.update(self.table.loc[ticker, DIMENSIONS].to_dict())
+        key.update(filters)
+        for widen in range(len(DIMENSIONS) + 1):
+            dropped = DIMENSIONS[len(DIMENSIONS) - widen:]
+            peers = tuple(ALL if d in dropped else key[d] for d in DIMENSIONS)
+            entry = self.stats.get(peers)
+            if entry and entry[multiple]['count'] >= min_peers:
+                return {**entry[multiple], 'peers': dict(zip(DIMENSIONS, peers))}
+        return None
+
+    def refresh(self, tickers, concurrency=16):
+        """Fetch prices and filings for `tickers` and fold them in.
+
+        Returns (changed tickers, fetch failures).
+        """
+        from modules import polygon_api
+        fetched = polygon_api.fetch_many(tickers, concurrency)
+        history = polygon_api.default_store().read(list(fetched['results'].index), columns=HISTORY_COLUMNS)
+        return self.update(fetched['results'], history), fetched['failures']
+
+    def save(self, path=COMPS_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.table[INPUTS].to_parquet(path)
+        return path
+
+    @classmethod
+    def load(cls, path=COMPS_PATH):
+        """Load a saved table, or return an empty one if there is none."""
+        if not os.path.exists(path):
+            return cls()
+        return cls(pd.read_parquet(path))
+
+TABLE = None
+
+def default_table():
+    """The process-wide table, loaded from COMPS_PATH on first use."""
+    global TABLE
+    if TABLE is None:
+        TABLE = CompsTable.load()
+    return TABLE
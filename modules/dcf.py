@@ -1,24 +1,21 @@
-import pandas as pd
 import numpy as np
-import streamlit as st
-import plotly.graph_objs as go
-from modules.utils import neon_palette
+from modules.memo import memoize
+from modules.instrumentation import count, timed
+from modules.operating_model import OperatingModel, base_revenue
 
-def project_fcf(financials, rev_growth, ebitda_margin, years=5):
-    """Project Free Cash Flow for N years based on user assumptions and historicals."""
+@timed()
+def project_fcf(financials, rev_growth, ebitda_margin, years=5, **assumptions):
+    """Project Free Cash Flow for N years based on user assumptions and historicals.
+
+    Extra keyword assumptions (da_pct, capex_pct, nwc_pct, tax_rate) are
+    passed through to the shared operating model.
+    """
     # Use last year as base
-    if financials is None or 'income' not in financials or financials['income'].empty:
+    revenue = base_revenue(financials)
+    if revenue is None:
         return []
-    base_revenue = financials['income'].iloc[0]['revenues']
-    fcf_list = []
-    revenue = base_revenue
-    for i in range(years):
-        revenue *= (1 + rev_growth / 100)
-        ebitda = revenue * (ebitda_margin / 100)
-        # Assume FCF = EBITDA * 0.7 (placeholder, to be refined)
-        fcf = ebitda * 0.7
-        fcf_list.append(fcf)
-    return fcf_list
+    model = OperatingModel(revenue, years, rev_growth=rev_growth, ebitda_margin=ebitda_margin, **assumptions)
+    return model['fcf'].tolist()
 
 def calculate_terminal_value(last_fcf, method, exit_multiple=None, gordon_growth_rate=None, discount_rate=None):
     """Calculate terminal value using either exit multiple or Gordon Growth method."""
@@ -34,6 +31,8 @@ def discount_cash_flows(fcf_list, discount_rate):
     discounted = [fcf / ((1 + discount_rate / 100) ** (i + 1)) for i, fcf in enumerate(fcf_list)]
     return discounted
 
+@memoize(maxsize=256)
+@timed()
 def run(data, rev_growth, ebitda_margin, discount_rate, exit_multiple, exit_year):
     """Run the full DCF model and return all outputs as a dict."""
     financials = data.get('financials', {})
@@ -64,39 +63,52 @@ def run(data, rev_growth, ebitda_margin, discount_rate, exit_multiple, exit_year
         'intrinsic_vs_market_gap': None  # Placeholder
     }
 
-def display(outputs):
-    """Display DCF results and charts in Streamlit."""
-    if not outputs or not outputs.get('fcf_list'):
-        st.warning("No DCF results to display.")
-        return
-    st.subheader("DCF Valuation Summary")
-    col1, col2, col3 = st.columns(3)
-    col1.metric("Enterprise Value", f"${outputs['enterprise_value']:,.0f}")
-    col2.metric("Equity Value", f"${outputs['equity_value']:,.0f}")
-    col3.metric("Terminal Value", f"${outputs['terminal_value']:,.0f}")
-    st.subheader("Discounted Cash Flows")
-    years = list(range(1, len(outputs['fcf_list']) + 1))
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        x=years,
-        y=outputs['discounted_fcfs'],
-        name="Discounted FCF",
-        marker_color=neon_palette()[0]
-    ))
-    fig.add_trace(go.Scatter(
-        x=years,
-        y=outputs['fcf_list'],
-        name="Projected FCF",
-        mode="lines+markers",
-        line=dict(color=neon_palette()[1], width=3)
-    ))
-    fig.update_layout(
-        template="plotly_dark",
-        title="Projected vs Discounted FCF",
-        xaxis_title="Year",
-        yaxis_title="USD",
-        plot_bgcolor="#18181b",
-        paper_bgcolor="#18181b",
-        font=dict(color="#00ffe7")
+@timed()
+def run_batch(data, rev_growth, ebitda_margin, discount_rate, exit_multiple, exit_year):
+    """Run the DCF model for many scenarios at once.
+
+    Assumptions may be scalars or NumPy arrays and are broadcast against
+    each other; every output keeps the broadcast shape, with a trailing
+    year axis for the cash-flow arrays.
+    """
+    revenue = base_revenue(data.get('financials', {}))
+    if revenue is None:
+        return None
+
+    rev_growth, ebitda_margin, discount_rate, exit_multiple, exit_year = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (rev_growth, ebitda_margin, discount_rate, exit_multiple, exit_year))
+    )
+    shape = rev_growth.shape
+    count('dcf.scenarios', rev_growth.size)
+    rev_growth, ebitda_margin, discount_rate, exit_multiple, exit_year = (
+        x.ravel()[:, None] for x in (rev_growth, ebitda_margin, discount_rate, exit_multiple, exit_year)
     )
-    st.plotly_chart(fig, use_container_width=True) 
\ No newline at end of file
+    years = np.arange(1, int(exit_year.max()) + 1)[None, :]
+    in_horizon = years <= exit_year
+
+    model = OperatingModel(revenue, years.shape[1], rev_growth=rev_growth, ebitda_margin=ebitda_margin)
+    fcf = np.where(in_horizon, model['fcf'], 0.0)
+    discount = (1 + discount_rate / 100) ** years
+    discounted_fcfs = fcf / discount
+
+    last_fcf = np.take_along_axis(fcf, exit_year.astype(int) - 1, axis=1)
+    terminal_value = last_fcf * exit_multiple
+    discounted_terminal = terminal_value / (1 + discount_rate / 100) ** exit_year
+    enterprise_value = discounted_fcfs.sum(axis=1, keepdims=True) + discounted_terminal
+
+    market_cap_ev = data.get('market_cap_ev', {})
+    net_debt = 0
+    if market_cap_ev:
+        net_debt = (market_cap_ev.get('enterprise_value') or 0) - (market_cap_ev.get('market_cap') or 0)
+
+    def grid(x, per_year=False):
+        return x.reshape(shape + x.shape[1:]) if per_year else x.reshape(shape)
+
+    return {
+        'fcf': grid(fcf, per_year=True),
+        'discounted_fcfs': grid(discounted_fcfs, per_year=True),
+        'terminal_value': grid(terminal_value),
+        'discounted_terminal': grid(discounted_terminal),
+        'enterprise_value': grid(enterprise_value),
+        'equity_value': grid(enterprise_value - net_debt)
+    }
@@ -0,0 +1,28 @@
+import streamlit as st
+import plotly.graph_objs as go
+from modules import charts
+from modules.memo import memoize
+
+@memoize(maxsize=64)
+def build_figure(outputs):
+    """Build the projected vs discounted FCF chart."""
+    years = list(range(1, len(outputs['fcf_list']) + 1))
+    return charts.figure([
+        go.Bar(x=years, y=outputs['discounted_fcfs'], name="Discounted FCF", marker_color=charts.COLORS[0]),
+        charts.line(years, outputs['fcf_list'], name="Projected FCF", mode="lines+markers",
+                    line=dict(color=charts.COLORS[1], width=3))
+    ], title="Projected vs Discounted FCF", xaxis_title="Year", yaxis_title="USD")
+
+def display(outputs):
+    """Display DCF results and charts in Streamlit."""
+    if not outputs or not outputs.get('fcf_list'):
+        st.warning("No DCF results to display.")
+        return
+    st.subheader("DCF Valuation Summary")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Enterprise Value", f"${outputs['enterprise_value']:,.0f}")
+    col2.metric("Equity Value", f"${outputs['equity_value']:,.0f}")
+    col3.metric("Terminal Value", f"${outputs['terminal_value']:,.0f}")
+    st.subheader("Discounted Cash Flows")
+    fig = build_figure(outputs)
+    st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,139 @@
+import numpy as np
+from modules.instrumentation import timed
+
+def default_tranches(total_debt, interest_rate):
+    """Split total debt into a typical senior / term B / mezz / PIK stack.
+
+    Rates are spreads over the base interest rate (in %); amortization is
+    a % of the original balance repaid each year.
+    """
+    total_debt = np.asarray(total_debt, dtype=float)
+    return [
+        {'name': 'Senior', 'amount': total_debt * 0.50, 'rate': interest_rate, 'amort': 5.0, 'sweep': True},
+        {'name': 'Term B', 'amount': total_debt * 0.30, 'rate': interest_rate + 1.5, 'amort': 1.0, 'sweep': True},
+        {'name': 'Mezz', 'amount': total_debt * 0.15, 'rate': interest_rate + 5.0, 'amort': 0.0},
+        {'name': 'PIK', 'amount': total_debt * 0.05, 'rate': interest_rate + 7.0, 'amort': 0.0, 'pik': True},
+    ]
+
+@timed()
+def run_waterfall(cfads, tranches, sweep_pct=100.0, revolver_limit=np.inf, revolver_rate=None,
+                  ebitda=None, min_dscr=1.25, max_leverage=None, tol=1e-6, max_iter=50):
+    """Run a multi-tranche debt waterfall for many scenarios at once.
+
+    `cfads` is cash flow available for debt service with shape
+    (scenarios, years). Each tranche is a dict with 'amount' (scalar or per
+    scenario), 'rate' and 'amort' in %, and optional 'pik' (interest accrues
+    to principal) and 'sweep' (eligible for excess-cash prepayment, applied
+    in list order). Shortfalls are met from retained cash, then funded by
+    a revolver, which is repaid first from excess cash. Excess cash that is
+    not swept (because `sweep_pct` < 100 or the sweepable tranches are
+    repaid) is retained on balance sheet rather than lost, so
+    `cfads = cash interest + mandatory + sweep + revolver repay - draw
+    - shortfall + change in cash` holds every year.
+
+    Interest is charged on average balances, which depend on the year's
+    repayments; each year is solved by fixed-point iteration over all
+    scenarios together.
+    """
+    cfads = np.atleast_2d(np.asarray(cfads, dtype=float))
+    n_scen, n_years = cfads.shape
+    n_tr = len(tranches)
+    amount = np.stack([np.broadcast_to(np.asarray(t['amount'], dtype=float), (n_scen,)) for t in tranches], axis=1)
+    rate = np.stack([np.broadcast_to(np.asarray(t['rate'], dtype=float), (n_scen,)) for t in tranches], axis=1) / 100
+    amort = np.array([t.get('amort', 0.0) for t in tranches]) / 100
+    pik = np.array([t.get('pik', False) for t in tranches])
+    sweepable = [i for i, t in enumerate(tranches) if t.get('sweep', False) and not t.get('pik', False)]
+    if revolver_rate is None:
+        revolver_rate = tranches[0]['rate'] if tranches else 0.0
+    rev_rate = np.broadcast_to(np.asarray(revolver_rate, dtype=float), (n_scen,)) / 100
+    sweep_share = np.asarray(sweep_pct, dtype=float) / 100
+
+    shape = (n_scen, n_tr, n_years)
+    out = {k: np.zeros(shape) for k in ('beginning', 'interest', 'mandatory', 'sweep', 'ending')}
+    revolver = {k: np.zeros((n_scen, n_years)) for k in ('beginning', 'draw', 'repay', 'interest', 'ending')}
+    shortfall = np.zeros((n_scen, n_years))
+    cash_out = {k: np.zeros((n_scen, n_years)) for k in ('beginning', 'retained', 'used', 'ending')}
+    iterations = np.zeros(n_years, dtype=int)
+
+    balance = amount.copy()
+    rev_balance = np.zeros(n_scen)
+    cash_balance = np.zeros(n_scen)
+    for t in range(n_years):
+        beg = balance
+        rev_beg = rev_balance
+        mandatory = np.where(pik, 0.0, np.minimum(beg, amort * amount))
+        pik_accrual = np.where(pik, beg * rate, 0.0)
+
+        # Start from interest on beginning balances, then iterate on averages
+        end = beg - mandatory + pik_accrual
+        rev_end = rev_beg
+        for it in range(max_iter):
+            cash_interest = np.where(pik, 0.0, rate * (beg + end) / 2).sum(axis=1)
+            rev_interest = rev_rate * (rev_beg + rev_end) / 2
+            cash = cfads[:, t] - cash_interest - rev_interest - mandatory.sum(axis=1)
+
+            # Shortfalls use retained cash, then draw on the revolver; excess repays it, then sweeps
+            used = np.minimum(np.maximum(-cash, 0.0), cash_balance)
+            draw = np.minimum(np.maximum(-cash, 0.0) - used, np.maximum(revolver_limit - rev_beg, 0.0))
+            repay = np.minimum(np.maximum(cash, 0.0), rev_beg)
+            excess = np.maximum(cash, 0.0) - repay
+            available = excess * sweep_share
+            sweep = np.zeros((n_scen, n_tr))
+            for i in sweepable:
+                paid = np.minimum(available, beg[:, i] - mandatory[:, i])
+                sweep[:, i] = paid
+                available = available - paid
+
+            new_end = beg - mandatory - sweep + pik_accrual
+            new_rev_end = rev_beg + draw - repay
+            delta = max(np.abs(new_end - end).max(initial=0.0), np.abs(new_rev_end - rev_end).max(initial=0.0))
+            end, rev_end = new_end, new_rev_end
+            if delta < tol:
+                break
+        iterations[t] = it + 1
+
+        out['beginning'][:, :, t] = beg
+        out['interest'][:, :, t] = np.where(pik, pik_accrual, rate * (beg + end) / 2)
+        out['mandatory'][:, :, t] = mandatory
+        out['sweep'][:, :, t] = sweep
+        out['ending'][:, :, t] = end
+        revolver['beginning'][:, t] = rev_beg
+        revolver['draw'][:, t] = draw
+        revolver['repay'][:, t] = repay
+        revolver['interest'][:, t] = rev_interest
+        revolver['ending'][:, t] = rev_end
+        shortfall[:, t] = np.maximum(-cash, 0.0) - used - draw
+        retained = excess - sweep.sum(axis=1)
+        cash_out['beginning'][:, t] = cash_balance
+        cash_out['retained'][:, t] = retained
+        cash_out['used'][:, t] = used
+        cash_balance = cash_balance + retained - used
+        cash_out['ending'][:, t] = cash_balance
+        balance, rev_balance = end, rev_end
+
+    cash_interest = np.where(pik[None, :, None], 0.0, out['interest']).sum(axis=1) + revolver['interest']
+    debt_service = cash_interest + out['mandatory'].sum(axis=1)
+    total_debt = out['ending'].sum(axis=1) + revolver['ending']
+    result = {
+        'names': [t.get('name', f"Tranche {i + 1}") for i, t in enumerate(tranches)],
+        'tranches': out,
+        'revolver': revolver,
+        'cash': cash_out,
+        'cash_interest': cash_interest,
+        'debt_service': debt_service,
+        'total_debt': total_debt,
+        'shortfall': shortfall,
+        'iterations': iterations
+    }
+    if ebitda is not None:
+        from modules.lbo import calculate_dscr
+        ebitda = np.broadcast_to(np.asarray(ebitda, dtype=float), cfads.shape)
+        dscr = calculate_dscr(ebitda, debt_service)
+        result['dscr'] = dscr
+        result['dscr_breach'] = dscr < min_dscr
+        if max_leverage is not None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                leverage = np.where(ebitda > 0, total_debt / ebitda, np.inf)
+            result['leverage'] = leverage
+            result['leverage_breach'] = leverage > max_leverage
+    return result
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+import plotly.graph_objs as go
+from modules import charts, instrumentation
+
+def build_histogram(stage, samples_ms):
+    """Latency histogram on log-spaced bins, so fast and slow calls both show."""
+    samples = np.asarray(samples_ms, dtype=float)
+    lo, hi = max(samples.min(), 1e-3), max(samples.max(), 1e-3)
+    edges = np.geomspace(lo, hi * 1.0001, 30) if hi > lo else np.array([lo * 0.9, hi * 1.1])
+    counts, edges = np.histogram(samples, bins=edges)
+    centers = np.sqrt(edges[:-1] * edges[1:])
+    return charts.figure([go.Bar(x=centers, y=counts, marker_color=charts.COLORS[0], name=stage)],
+                         title=f"{stage} latency", xaxis_title="ms", yaxis_title="Calls", xaxis_type="log")
+
+def display():
+    """Show per-stage latency, counters and a Prometheus export."""
+    stages, counters = instrumentation.snapshot()
+    if not stages and not counters:
+        st.info("No spans recorded yet. Interact with the app to collect timings.")
+        return
+
+    table = pd.DataFrame({name: {k: v for k, v in s.items() if k != 'recent_ms'} for name, s in stages.items()}).T
+    if not table.empty:
+        table = table.sort_values('total_s', ascending=False)
+        st.dataframe(table.style.format({
+            'calls': "{:,.0f}", 'total_s': "{:,.3f}", 'mean_ms': "{:,.2f}", 'p50_ms': "{:,.2f}",
+            'p95_ms': "{:,.2f}", 'p99_ms': "{:,.2f}", 'max_ms': "{:,.2f}"
+        }), use_container_width=True)
+        stage = st.selectbox("Stage", list(table.index))
+        st.plotly_chart(build_histogram(stage, stages[stage]['recent_ms']), use_container_width=True)
+    if counters:
+        st.dataframe(pd.Series(counters, name="count").sort_index(), use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    col1.download_button("Prometheus metrics", data=instrumentation.prometheus_text, file_name="metrics.prom",
+                         mime="text/plain")
+    if col2.button("Reset timings"):
+        instrumentation.reset()
+        st.rerun()
@@ -0,0 +1,262 @@
+"""Export valuation outputs to Excel, Parquet or CSV.
+
+Workbooks are written with openpyxl's write-only mode: rows are streamed
+to a temporary file as they are appended, so memory does not grow with
+the size of a scenario table. Large tables are also read in fixed-size
+chunks, so Parquet and CSV exports stay bounded too.
+"""
+import csv
+import io
+import os
+import numpy as np
+
+CURRENCY = '"$"#,##0'
+PERCENT = '0.0"%"'
+MULTIPLE = '0.00"x"'
+RATIO = '0.00'
+
+# Number formats for known output and assumption names
+FORMATS = {
+    'enterprise_value': CURRENCY, 'equity_value': CURRENCY, 'terminal_value': CURRENCY,
+    'discounted_terminal': CURRENCY, 'purchase_price': CURRENCY, 'exit_value': CURRENCY,
+    'equity_invested': CURRENCY, 'initial_debt': CURRENCY, 'fcf': CURRENCY, 'discounted_fcfs': CURRENCY,
+    'cash_flows': CURRENCY, 'debt_balance': CURRENCY, 'interest_payment': CURRENCY, 'principal_payment': CURRENCY,
+    'irr': PERCENT, 'rev_growth': PERCENT, 'ebitda_margin': PERCENT, 'discount_rate': PERCENT,
+    'debt_pct': PERCENT, 'interest_rate': PERCENT, 'ebitda_growth': PERCENT,
+    'moic': MULTIPLE, 'exit_multiple': MULTIPLE, 'entry_multiple': MULTIPLE, 'leverage_ratio': MULTIPLE,
+    'dscr': RATIO,
+    'Beginning Balance': CURRENCY, 'Principal Payment': CURRENCY, 'Interest Payment': CURRENCY,
+    'Total Payment': CURRENCY, 'Ending Balance': CURRENCY
+}
+
+CHUNK_SIZE = 50000
+
+def python_value(value):
+    """Convert NumPy scalars to plain Python values; NaN/inf become empty cells."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+def scenario_columns(scenarios):
+    """Return [(name, 1-D array)] for a DataFrame or dict of arrays.
+
+    Arrays with a trailing year axis are split into one column per year,
+    e.g. `cash_flows[0]`, `cash_flows[1]`, ...
+    """
+    if hasattr(scenarios, 'columns'):
+        return [(str(name), scenarios[name].to_numpy()) for name in scenarios.columns]
+    columns = []
+    for name, values in scenarios.items():
+        values = np.asarray(values)
+        if values.ndim <= 1:
+            columns.append((name, np.atleast_1d(values)))
+        else:
+            values = values.reshape(-1, values.shape[-1])
+            columns.extend((f"{name}[{t}]", values[:, t]) for t in range(values.shape[1]))
+    lengths = {len(v) for _, v in columns}
+    if len(lengths) > 1:
+        columns = [(name, np.broadcast_to(v, (max(lengths),))) for name, v in columns]
+    return columns
+
+def iter_chunks(columns, chunk_size=CHUNK_SIZE):
+    """Yield lists of row tuples, `chunk_size` rows at a time."""
+    n_rows = len(columns[0][1]) if columns else 0
+    for start in range(0, n_rows, chunk_size):
+        chunk = [values[start:start + chunk_size].tolist() for _, values in columns]
+        yield list(zip(*chunk))
+
+def number_format(name):
+    return FORMATS.get(name.split('[')[0])
+
+class WorkbookWriter:
+    """Streams formatted sheets into a write-only openpyxl workbook."""
+
+    def __init__(self):
+        from openpyxl import Workbook
+        from openpyxl.styles import Font, PatternFill
+        self.workbook = Workbook(write_only=True)
+        self.header_font = Font(bold=True, color="00FFE7")
+        self.header_fill = PatternFill("solid", fgColor="18181B")
+        self.title_font = Font(bold=True, size=14)
+
+    def cell(self, ws, value, fmt=None, font=None, fill=None):
+        from openpyxl.cell import WriteOnlyCell
+        cell = WriteOnlyCell(ws, value=python_value(value))
+        if fmt:
+            cell.number_format = fmt
+        if font:
+            cell.font = font
+        if fill:
+            cell.fill = fill
+        return cell
+
+    def header(self, ws, labels):
+        ws.append([self.cell(ws, label, font=self.header_font, fill=self.header_fill) for label in labels])
+
+    def sheet(self, title, heading=None, widths=None):
+        ws = self.workbook.create_sheet(title[:31])
+        # Column widths must be set before any row is written in write-only mode
+        for i, width in enumerate(widths or [], start=1):
+            ws.column_dimensions[column_letter(i)].width = width
+        if heading:
+            ws.append([self.cell(ws, heading, font=self.title_font)])
+            ws.append([])
+        return ws
+
+    def summary(self, title, rows, heading=None):
+        """Write a two-column label / value sheet from (label, value, format) rows."""
+        ws = self.sheet(title, heading, widths=[28, 22])
+        self.header(ws, ["Metric", "Value"])
+        for label, value, fmt in rows:
+            ws.append([self.cell(ws, label), self.cell(ws, value, fmt)])
+        return ws
+
+    def table(self, title, columns, heading=None, chunk_size=CHUNK_SIZE):
+        """Stream a [(name, 1-D array)] table into a sheet, chunk by chunk."""
+        ws = self.sheet(title, heading, widths=[16] * len(columns))
+        self.header(ws, [name for name, _ in columns])
+        # Rows are serialized as soon as they are appended, so one styled
+        # cell per column can be reused for every row
+        cells = [self.cell(ws, None, number_format(name)) if number_format(name) else None for name, _ in columns]
+        for rows in iter_chunks(columns, chunk_size):
+            for row in rows:
+                out = []
+                for value, cell in zip(row, cells):
+                    if isinstance(value, float) and value != value:
+                        value = None
+                    if cell is None:
+                        out.append(value)
+                    else:
+                        cell.value = value
+                        out.append(cell)
+                ws.append(out)
+        return ws
+
+    def frame(self, title, df, heading=None, index=True):
+        """Write a DataFrame, optionally with its index as the first columns."""
+        if index:
+            df = df.reset_index()
+        return self.table(title, scenario_columns(df), heading)
+
+    def grid(self, title, df, fmt=None, heading=None):
+        """Write a 2-D sensitivity table with labeled row and column axes."""
+        ws = self.sheet(title, heading, widths=[18] + [14] * df.shape[1])
+        corner = f"{df.index.name} \\ {df.columns.name}" if df.index.name or df.columns.name else ""
+        self.header(ws, [corner] + [python_value(c) for c in df.columns])
+        for label, row in zip(df.index, df.to_numpy()):
+            ws.append([self.cell(ws, label, font=self.header_font)] + [self.cell(ws, v, fmt) for v in row])
+        return ws
+
+    def save(self, target):
+        """Save to a path or a binary file object."""
+        self.workbook.save(target)
+        return target
+
+def column_letter(i):
+    from openpyxl.utils import get_column_letter
+    return get_column_letter(i)
+
+def add_dcf(writer, outputs):
+    writer.summary("DCF", [
+        ("Enterprise Value", outputs['enterprise_value'], CURRENCY),
+        ("Equity Value", outputs['equity_value'], CURRENCY),
+        ("Terminal Value", outputs['terminal_value'], CURRENCY),
+        ("Discounted Terminal Value", outputs['discounted_terminal'], CURRENCY)
+    ], heading="DCF Valuation Summary")
+    years = np.arange(1, len(outputs['fcf_list']) + 1)
+    writer.table("DCF Cash Flows", [
+        ('Year', years), ('fcf', np.asarray(outputs['fcf_list'])), ('discounted_fcfs', np.asarray(outputs['discounted_fcfs']))
+    ])
+
+def add_lbo(writer, outputs):
+    writer.summary("LBO", [
+        ("Purchase Price", outputs['purchase_price'], CURRENCY),
+        ("Exit Value", outputs['exit_value'], CURRENCY),
+        ("Equity Invested", outputs['equity_invested'], CURRENCY),
+        ("Initial Debt", outputs['initial_debt'], CURRENCY),
+        ("IRR", outputs['irr'], PERCENT),
+        ("MOIC", outputs['moic'], MULTIPLE),
+        ("Initial Leverage", outputs['leverage_ratio'], MULTIPLE)
+    ], heading="LBO Returns Summary")
+    cash_flows = np.asarray(outputs['cash_flows'], dtype=float)
+    writer.table("LBO Cash Flows", [('Year', np.arange(len(cash_flows))), ('cash_flows', cash_flows)])
+    if outputs.get('debt_schedule') is not None:
+        writer.frame("Debt Schedule", outputs['debt_schedule'], index=False)
+
+def valuation_workbook(target, dcf_outputs=None, lbo_outputs=None, sensitivities=(), scenarios=None):
+    """Write DCF, LBO, debt schedule, sensitivity and scenario sheets to one workbook.
+
+    `sensitivities` is a sequence of (title, DataFrame, number format);
+    `scenarios` is an optional DataFrame or dict of arrays, streamed row by
+    row. `target` is a path or a binary file object.
+    """
+    writer = WorkbookWriter()
+    if dcf_outputs:
+        add_dcf(writer, dcf_outputs)
+    if lbo_outputs:
+        add_lbo(writer, lbo_outputs)
+    for title, df, fmt in sensitivities:
+        if not df.empty:
+            writer.grid(title, df, fmt, heading=title)
+    if scenarios is not None:
+        writer.table("Scenarios", scenario_columns(scenarios))
+    return writer.save(target)
+
+def workbook_bytes(**sections):
+    """Return `valuation_workbook` output as bytes, for download buttons."""
+    buffer = io.BytesIO()
+    valuation_workbook(buffer, **sections)
+    return buffer.getvalue()
+
+def export_scenarios(scenarios, path, fmt=None, chunk_size=CHUNK_SIZE):
+    """Write a large scenario table to Parquet, CSV or Excel in fixed-size chunks.
+
+    `path` may also be a binary file object, in which case `fmt` is
+    required; otherwise the format follows the file extension. Parquet
+    gets one row group per chunk; CSV and Excel are streamed row by row.
+    """
+    fmt = fmt or os.path.splitext(str(path))[1].lstrip('.').lower()
+    columns = scenario_columns(scenarios)
+    names = [name for name, _ in columns]
+    if fmt == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        n_rows = len(columns[0][1]) if columns else 0
+        writer = None
+        try:
+            for start in range(0, n_rows, chunk_size):
+                batch = pa.table({name: np.asarray(values[start:start + chunk_size]) for name, values in columns})
+                if writer is None:
+                    writer = pq.ParquetWriter(path, batch.schema)
+                writer.write_table(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+    elif fmt == 'csv':
+        is_file = hasattr(path, 'write')
+        f = io.TextIOWrapper(path, newline='') if is_file else open(path, 'w', newline='')
+        try:
+            out = csv.writer(f)
+            out.writerow(names)
+            for rows in iter_chunks(columns, chunk_size):
+                out.writerows([None if v != v else v for v in row] for row in rows)
+        finally:
+            if is_file:
+                f.detach()  # flush, but leave the caller's file open
+            else:
+                f.close()
+    elif fmt == 'xlsx':
+        writer = WorkbookWriter()
+        writer.table("Scenarios", columns, chunk_size=chunk_size)
+        writer.save(path)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt!r}")
+    return path
+
+def scenarios_bytes(scenarios, fmt):
+    """Return `export_scenarios` output as bytes, for download buttons."""
+    buffer = io.BytesIO()
+    export_scenarios(scenarios, buffer, fmt)
+    return buffer.getvalue()
@@ -0,0 +1,49 @@
+import numpy as np
+import streamlit as st
+from modules import dcf, export, lbo, sensitivity
+
+def build_workbook(data, dcf_base, lbo_base, exit_year):
+    """Build the valuation workbook for the current sidebar inputs."""
+    steps = 11
+    irr = sensitivity.lbo_irr_table(
+        data, lbo_base, np.linspace(lbo_base['exit_multiple'] * 0.5, lbo_base['exit_multiple'] * 1.5, steps),
+        np.linspace(0, 90, steps)
+    )
+    ev = sensitivity.dcf_ev_table(
+        data, dcf_base, np.linspace(dcf_base['discount_rate'] * 0.5, dcf_base['discount_rate'] * 1.5, steps),
+        np.linspace(0, 2 * max(dcf_base['rev_growth'], 1), steps)
+    )
+    return export.workbook_bytes(
+        dcf_outputs=dcf.run(data, **dcf_base),
+        lbo_outputs=lbo.run(data, lbo_base['debt_pct'], lbo_base['interest_rate'], lbo_base['exit_multiple'],
+                            exit_year, lbo_base['holding_period']),
+        sensitivities=[("LBO IRR", irr, export.PERCENT), ("DCF EV", ev, export.CURRENCY)]
+    )
+
+def build_scenarios(data, lbo_base, fmt):
+    """Evaluate an LBO grid over debt %, interest rate and exit multiple and serialize it."""
+    debt, rate, multiple = np.meshgrid(
+        np.linspace(0, 90, 46), np.linspace(2, 12, 21), np.linspace(4, 16, 49), indexing='ij'
+    )
+    outputs = lbo.run_batch(data, debt.ravel(), rate.ravel(), multiple.ravel(), lbo_base['holding_period'])
+    scenarios = {
+        'debt_pct': debt.ravel(), 'interest_rate': rate.ravel(), 'exit_multiple': multiple.ravel(),
+        **{name: outputs[name] for name in ('purchase_price', 'exit_value', 'irr', 'moic')}
+    }
+    return export.scenarios_bytes(scenarios, fmt)
+
+def display(data, dcf_base, lbo_base, exit_year):
+    """Offer workbook and scenario-grid downloads; files are built only when clicked."""
+    st.download_button(
+        "Valuation workbook (.xlsx)",
+        data=lambda: build_workbook(data, dcf_base, lbo_base, exit_year),
+        file_name="valuation_analysis.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    fmt = st.radio("Scenario grid format", ["parquet", "csv"], horizontal=True)
+    st.download_button(
+        f"LBO scenario grid (.{fmt})",
+        data=lambda: build_scenarios(data, lbo_base, fmt),
+        file_name=f"lbo_scenarios.{fmt}",
+        mime="application/octet-stream" if fmt == "parquet" else "text/csv"
+    )
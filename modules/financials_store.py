@@ -0,0 +1,128 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+# (column, statement, source keys in priority order)
+SCHEMA = [
+    ('revenues', 'income_statement', ('revenues',)),
+    ('cost_of_revenue', 'income_statement', ('cost_of_revenue',)),
+    ('gross_profit', 'income_statement', ('gross_profit',)),
+    ('operating_expenses', 'income_statement', ('operating_expenses',)),
+    ('operating_income', 'income_statement', ('operating_income_loss',)),
+    ('interest_expense', 'income_statement', ('interest_expense_operating', 'interest_expense')),
+    ('income_tax', 'income_statement', ('income_tax_expense_benefit',)),
+    ('net_income', 'income_statement', ('net_income_loss',)),
+    ('total_assets', 'balance_sheet', ('total_assets', 'assets')),
+    ('current_assets', 'balance_sheet', ('current_assets',)),
+    ('total_liabilities', 'balance_sheet', ('total_liabilities', 'liabilities')),
+    ('current_liabilities', 'balance_sheet', ('current_liabilities',)),
+    ('long_term_debt', 'balance_sheet', ('long_term_debt',)),
+    ('total_equity', 'balance_sheet', ('total_equity', 'equity')),
+    ('operating_cash_flow', 'cash_flow_statement', ('net_cash_flow_from_operating_activities',)),
+    ('investing_cash_flow', 'cash_flow_statement', ('net_cash_flow_from_investing_activities',)),
+    ('financing_cash_flow', 'cash_flow_statement', ('net_cash_flow_from_financing_activities',)),
+    ('net_cash_flow', 'cash_flow_statement', ('net_cash_flow',)),
+]
+
+STATEMENTS = {
+    'income': [c for c, s, _ in SCHEMA if s == 'income_statement'],
+    'balance': [c for c, s, _ in SCHEMA if s == 'balance_sheet'],
+    'cash_flow': [c for c, s, _ in SCHEMA if s == 'cash_flow_statement'],
+}
+
+STORE_PATH = os.environ.get("FINANCIALS_STORE_PATH", os.path.join(".cache", "financials"))
+
+def field_value(statement, keys):
+    """Read a field that may be a bare number or a {'value': ...} dict."""
+    for key in keys:
+        value = statement.get(key)
+        if isinstance(value, dict):
+            value = value.get('value')
+        if value is not None:
+            return value
+    return np.nan
+
+def normalize(ticker, results):
+    """Flatten Polygon financials results into one typed row per period.
+
+    Each record's statement dicts are looked up once, then every column is
+    filled from them. Rows are ordered latest period first, matching the
+    `iloc[0]` convention the engines use for the base year.
+    """
+    columns = {c: np.full(len(results), np.nan) for c, _, _ in SCHEMA}
+    period_end = []
+    fiscal_period = []
+    for i, record in enumerate(results):
+        statements = record.get('financials', {})
+        sections = {name: statements.get(name) or {} for name in ('income_statement', 'balance_sheet', 'cash_flow_statement')}
+        for column, section, keys in SCHEMA:
+            columns[column][i] = field_value(sections[section], keys)
+        period_end.append(record.get('end_date') or record.get('calendarDate') or record.get('reportPeriod'))
+        fiscal_period.append(record.get('fiscal_period') or record.get('period') or '')
+
+    df = pd.DataFrame(columns)
+    df.insert(0, 'fiscal_period', pd.Series(fiscal_period, dtype=str))
+    df.insert(0, 'period_end', pd.to_datetime(pd.Series(period_end, dtype=object), errors='coerce'))
+    df.insert(0, 'ticker', ticker)
+    df = df.sort_values('period_end', ascending=False, kind='stable', na_position='last')
+    return df.reset_index(drop=True)
+
+def to_financials(df):
+    """Split a normalized frame into the {'income', 'balance', 'cash_flow'} dict the engines read."""
+    return {name: df[cols].fillna(0.0).reset_index(drop=True) for name, cols in STATEMENTS.items()}
+
+class FinancialsStore:
+    """One Arrow IPC file per ticker, read back through memory maps."""
+
+    def __init__(self, root=STORE_PATH):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, ticker):
+        return os.path.join(self.root, f"{ticker}.arrow")
+
+    def write(self, df):
+        """Persist normalized rows, replacing each ticker's history.
+
+        Each write goes to its own temporary file and is renamed into place,
+        so concurrent writers of one ticker never share a path; the last
+        rename wins.
+        """
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        for ticker, rows in df.groupby('ticker', sort=False):
+            table = pa.Table.from_pandas(rows.reset_index(drop=True), preserve_index=False)
+            fd, tmp = tempfile.mkstemp(dir=self.root, prefix=f"{ticker}.", suffix=".tmp")
+            os.close(fd)
+            try:
+                feather.write_feather(table, tmp, compression='uncompressed')
+                os.replace(tmp, self.path(ticker))
+            except BaseException:
+                os.remove(tmp)
+                raise
+
+    def tickers(self):
+        return sorted(f[:-len(".arrow")] for f in os.listdir(self.root) if f.endswith(".arrow"))
+
+    def read(self, tickers=None, columns=None):
+        """Load history for the given tickers as a (ticker, period_end)-indexed frame."""
+        import pyarrow as pa
+        tickers = self.tickers() if tickers is None else [t for t in tickers if os.path.exists(self.path(t))]
+        if not tickers:
+            return pd.DataFrame(columns=[c for c, _, _ in SCHEMA])
+        if columns is not None:
+            columns = ['ticker', 'period_end'] + [c for c in columns if c not in ('ticker', 'period_end')]
+        tables = []
+        for ticker in tickers:
+            with pa.memory_map(self.path(ticker), 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+            tables.append(table.select(columns) if columns is not None else table)
+        return pa.concat_tables(tables).to_pandas().set_index(['ticker', 'period_end'])
+
+    def financials(self, ticker):
+        """Return the engine-ready statements dict for one ticker, or None if not stored."""
+        df = self.read([ticker])
+        if df.empty:
+            return None
+        return to_financials(df.reset_index())
@@ -0,0 +1,155 @@
+import numpy as np
+from modules import lbo
+from modules.operating_model import base_revenue
+from modules.irr import npv_and_derivative
+from modules.instrumentation import timed
+
+def brent(f, lower, upper, xtol=1e-8, rtol=1e-12, max_iter=100):
+    """Find a root of f in [lower, upper] for many problems at once (Brent's method).
+
+    `f(x, idx)` evaluates the still-active problems `idx` at points `x`.
+    Each problem keeps its own bracket and step history, mixing inverse
+    quadratic interpolation, secant and bisection steps as in scipy's
+    brentq. Returns (roots, converged, iterations); roots are NaN where
+    the bracket does not contain a sign change.
+    """
+    lower, upper = np.broadcast_arrays(np.asarray(lower, dtype=float), np.asarray(upper, dtype=float))
+    n = lower.size
+    everyone = np.arange(n)
+    xpre, xcur = lower.ravel().copy(), upper.ravel().copy()
+    fpre, fcur = np.asarray(f(xpre, everyone), dtype=float), np.asarray(f(xcur, everyone), dtype=float)
+    xblk, fblk = np.zeros(n), np.zeros(n)
+    spre, scur = np.zeros(n), np.zeros(n)
+    iterations = np.zeros(n, dtype=int)
+
+    bracketed = np.isfinite(fpre) & np.isfinite(fcur) & (np.sign(fpre) * np.sign(fcur) <= 0)
+    converged = bracketed & ((fpre == 0) | (fcur == 0))
+    xcur = np.where(bracketed & (fpre == 0), xpre, xcur)
+    active = bracketed & ~converged
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        i = np.flatnonzero(active)
+        xp, xc, xb = xpre[i], xcur[i], xblk[i]
+        fp, fc, fb = fpre[i], fcur[i], fblk[i]
+        sp, sc = spre[i], scur[i]
+
+        # Keep the root bracketed between xcur and xblk
+        flip = (fp != 0) & (fc != 0) & (np.sign(fp) != np.sign(fc))
+        xb, fb = np.where(flip, xp, xb), np.where(flip, fp, fb)
+        sp = sc = np.where(flip, xc - xp, sc)
+
+        # Make xcur the best estimate so far
+        swap = np.abs(fb) < np.abs(fc)
+        xp, xc, xb = np.where(swap, xc, xp), np.where(swap, xb, xc), np.where(swap, xc, xb)
+        fp, fc, fb = np.where(swap, fc, fp), np.where(swap, fb, fc), np.where(swap, fc, fb)
+
+        delta = (xtol + rtol * np.abs(xc)) / 2
+        sbis = (xb - xc) / 2
+        done = (fc == 0) | (np.abs(sbis) < delta)
+
+        # Try interpolation (secant, or inverse quadratic with three points)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            secant = -fc * (xc - xp) / (fc - fp)
+            dpre = (fp - fc) / (xp - xc)
+            dblk = (fb - fc) / (xb - xc)
+            quadratic = -fc * (fb * dblk - fp * dpre) / (dblk * dpre * (fb - fp))
+        stry = np.where(xp == xb, secant, quadratic)
+        interpolate = (np.abs(sp) > delta) & (np.abs(fc) < np.abs(fp))
+        good = interpolate & np.isfinite(stry) & (2 * np.abs(stry) < np.minimum(np.abs(sp), 3 * np.abs(sbis) - delta))
+        sp, sc = np.where(good, sc, sbis), np.where(good, stry, sbis)
+
+        xp, fp = xc, fc
+        step = np.where(np.abs(sc) > delta, sc, np.where(sbis > 0, delta, -delta))
+        xc_new = np.where(done, xc, xc + step)
+
+        step_rows = i[~done]
+        fc = fc.copy()
+        if step_rows.size:
+            fc[~done] = f(xc_new[~done], step_rows)
+        iterations[step_rows] += 1
+
+        xpre[i], xcur[i], xblk[i] = xp, xc_new, xb
+        fpre[i], fcur[i], fblk[i] = fp, fc, fb
+        spre[i], scur[i] = sp, sc
+        converged[i[done]] = True
+        active[i[done]] = False
+
+    roots = np.where(converged, xcur, np.nan)
+    return roots.reshape(lower.shape), converged.reshape(lower.shape), iterations.reshape(lower.shape)
+
+@timed()
+def entry_multiple_for_irr(data, target_irr, debt_pct, interest_rate, exit_multiple, holding_period,
+                           ebitda_margin=lbo.EBITDA_MARGIN, ebitda_growth=8, lower=0.5, upper=50.0, xtol=1e-6):
+    """Solve the highest entry EBITDA multiple that still earns `target_irr` (%).
+
+    Every argument may be an array; problems are broadcast and solved
+    together. The solver works on the equity NPV at the target rate, which
+    falls monotonically as the price rises and stays finite where the IRR
+    itself would not. Returns the multiple, purchase price, the IRR at the
+    solution, and convergence flags and iteration counts per problem.
+    """
+    if base_revenue(data.get('financials') if data else None) is None:
+        return None
+    args = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (
+        target_irr, debt_pct, interest_rate, exit_multiple, holding_period, ebitda_margin, ebitda_growth)))
+    shape = args[0].shape
+    target_irr, debt_pct, interest_rate, exit_multiple, holding_period, ebitda_margin, ebitda_growth = (
+        a.ravel() for a in args)
+
+    def equity_npv(entry, idx):
+        out = lbo.run_batch(data, debt_pct[idx], interest_rate[idx], exit_multiple[idx], holding_period[idx],
+                            ebitda_margin[idx], ebitda_growth[idx], entry_multiple=entry)
+        return npv_and_derivative(target_irr[idx] / 100, out['cash_flows'])[0] / out['purchase_price']
+
+    lower, upper = np.broadcast_to(lower, target_irr.shape), np.broadcast_to(upper, target_irr.shape)
+    multiple, converged, iterations = brent(equity_npv, lower, upper, xtol=xtol)
+    result = lbo.run_batch(data, debt_pct, interest_rate, exit_multiple, holding_period, ebitda_margin,
+                           ebitda_growth, entry_multiple=np.where(converged, multiple, exit_multiple))
+    return {
+        'entry_multiple': multiple.reshape(shape),
+        'purchase_price': np.where(converged, result['purchase_price'], np.nan).reshape(shape),
+        'irr': np.where(converged, result['irr'], np.nan).reshape(shape),
+        'converged': converged.reshape(shape),
+        'iterations': iterations.reshape(shape)
+    }
+
+@timed()
+def max_debt_for_dscr(data, min_dscr, interest_rate, exit_multiple, holding_period,
+                      ebitda_margin=lbo.EBITDA_MARGIN, ebitda_growth=8, lower=0.01, upper=99.99, xtol=1e-6):
+    """Solve the highest debt % whose minimum DSCR over the hold stays at `min_dscr`.
+
+    Every argument may be an array; problems are broadcast and solved
+    together. Where even `upper` keeps the covenant, the answer is `upper`
+    and `binding` is False; where even `lower` breaches it, the result is
+    NaN and `converged` is False.
+    """
+    if base_revenue(data.get('financials') if data else None) is None:
+        return None
+    args = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (
+        min_dscr, interest_rate, exit_multiple, holding_period, ebitda_margin, ebitda_growth)))
+    shape = args[0].shape
+    min_dscr, interest_rate, exit_multiple, holding_period, ebitda_margin, ebitda_growth = (a.ravel() for a in args)
+
+    def headroom(debt, idx):
+        out = lbo.run_batch(data, debt, interest_rate[idx], exit_multiple[idx], holding_period[idx],
+                            ebitda_margin[idx], ebitda_growth[idx])
+        return np.nanmin(out['dscr'], axis=-1) - min_dscr[idx]
+
+    everyone = np.arange(min_dscr.size)
+    slack = headroom(np.full(min_dscr.shape, upper, dtype=float), everyone) >= 0
+    debt, converged, iterations = brent(headroom, np.full(min_dscr.shape, lower, dtype=float),
+                                        np.full(min_dscr.shape, upper, dtype=float), xtol=xtol)
+    debt = np.where(slack, upper, debt)
+    converged = converged | slack
+    dscr = np.full(min_dscr.shape, np.nan)
+    if converged.any():
+        dscr[converged] = headroom(debt[converged], everyone[converged]) + min_dscr[converged]
+    return {
+        'debt_pct': debt.reshape(shape),
+        'min_dscr': dscr.reshape(shape),
+        'binding': (converged & ~slack).reshape(shape),
+        'converged': converged.reshape(shape),
+        'iterations': iterations.reshape(shape)
+    }
@@ -1,66 +1,60 @@
-import streamlit as st
 import numpy as np
-import plotly.graph_objs as go
-from modules.utils import neon_palette
+from modules.memo import memoize
 
+BAND_PERCENTILES = [5, 25, 50, 75, 95]
+
+def growth_paths(base_value, rates):
+    """Compound a base value along growth-rate paths.
+
+    `rates` (in %) is (years,) or (scenarios, years) and may vary by year;
+    returns values with shape (..., years + 1), starting at `base_value`.
+    """
+    rates = np.asarray(rates, dtype=float)
+    growth = np.cumprod(1 + rates / 100, axis=-1)
+    base = np.broadcast_to(np.asarray(base_value, dtype=float), rates.shape[:-1])[..., None]
+    return np.concatenate([base, base * growth], axis=-1)
+
+def rate_paths(mean, vol, years, n_paths, persistence=0.0, seed=None):
+    """Draw stochastic growth-rate paths (n_paths, years) in %.
+
+    Each year's rate is `mean` plus an AR(1) shock: `persistence` of last
+    year's deviation carries over, so 0 gives independent years and values
+    near 1 give rates that drift and stay away from the mean.
+    """
+    rng = np.random.default_rng(seed)
+    shocks = rng.normal(0.0, vol, size=(n_paths, years))
+    deviation = np.empty_like(shocks)
+    deviation[:, 0] = shocks[:, 0]
+    for t in range(1, years):
+        deviation[:, t] = persistence * deviation[:, t - 1] + shocks[:, t]
+    return np.asarray(mean, dtype=float) + deviation
+
+def percentile_bands(paths, percentiles=BAND_PERCENTILES):
+    """Summarize (paths, years + 1) trajectories as {percentile: per-year values}."""
+    return dict(zip(percentiles, np.percentile(paths, percentiles, axis=0)))
+
+@memoize(maxsize=256)
 def simulate_growth_scenarios(base_value, years, scenarios):
-    """Simulate different growth scenarios."""
-    results = {}
-    for name, growth_rate in scenarios.items():
-        values = [base_value]
-        for _ in range(years):
-            values.append(values[-1] * (1 + growth_rate/100))
-        results[name] = values
-    return results
+    """Simulate different growth scenarios.
+
+    Each scenario's rate may be a constant or a per-year sequence.
+    """
+    rates = np.stack([np.broadcast_to(np.asarray(r, dtype=float), (years,)) for r in scenarios.values()]) \
+        if scenarios else np.zeros((0, years))
+    paths = growth_paths(base_value, rates)
+    return {name: path.tolist() for name, path in zip(scenarios, paths)}
+
+def simulate_paths(base_value, years, mean, vol, n_paths, persistence=0.0, seed=None):
+    """Simulate stochastic growth trajectories and their percentile bands."""
+    paths = growth_paths(base_value, rate_paths(mean, vol, years, n_paths, persistence, seed))
+    return {'paths': paths, 'bands': percentile_bands(paths)}
+
+@memoize(maxsize=64)
+def simulate_bands(base_value, years, mean, vol, n_paths, persistence=0.0, seed=None, sample=50):
+    """Percentile bands plus the first `sample` paths of a simulation.
 
-def display():
-    """Display growth simulation interface and results."""
-    st.subheader("Growth Trajectory Simulator")
-    
-    col1, col2 = st.columns(2)
-    with col1:
-        base_value = st.number_input("Initial Value ($M)", value=100.0, step=10.0)
-        years = st.slider("Projection Years", 1, 10, 5)
-    
-    with col2:
-        bear_growth = st.slider("Bear Case Growth (%)", -20, 20, 0)
-        base_growth = st.slider("Base Case Growth (%)", -10, 30, 8)
-        bull_growth = st.slider("Bull Case Growth (%)", 0, 50, 15)
-    
-    scenarios = {
-        "Bear Case": bear_growth,
-        "Base Case": base_growth,
-        "Bull Case": bull_growth
-    }
-    
-    results = simulate_growth_scenarios(base_value, years, scenarios)
-    
-    # Create plot
-    fig = go.Figure()
-    colors = neon_palette()
-    
-    for i, (scenario, values) in enumerate(results.items()):
-        fig.add_trace(go.Scatter(
-            x=list(range(years + 1)),
-            y=values,
-            name=scenario,
-            line=dict(color=colors[i], width=3),
-            mode='lines+markers'
-        ))
-    
-    fig.update_layout(
-        title="Growth Scenarios",
-        xaxis_title="Year",
-        yaxis_title="Value ($M)",
-        template="plotly_dark",
-        plot_bgcolor="#18181b",
-        paper_bgcolor="#18181b",
-        font=dict(color="#00ffe7")
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Display table of values
-    st.subheader("Projected Values")
-    for scenario, values in results.items():
-        st.write(f"{scenario}: ${values[-1]:.1f}M (Year {years})") 
\ No newline at end of file
+    The full (n_paths, years + 1) array is dropped before caching, so each
+    cache entry stays a few KB however many paths were drawn.
+    """
+    simulation = simulate_paths(base_value, years, mean, vol, n_paths, persistence, seed)
+    return {'n_paths': n_paths, 'paths': simulation['paths'][:sample].copy(), 'bands': simulation['bands']}
@@ -0,0 +1,77 @@
+import streamlit as st
+import plotly.graph_objs as go
+from modules import charts, growth_simulator
+from modules.memo import memoize
+
+# Above this many paths, draw percentile bands instead of the paths themselves
+MAX_PATH_TRACES = 50
+
+@memoize(maxsize=64)
+def build_figure(results, years):
+    """Build the growth scenarios chart."""
+    x = list(range(years + 1))
+    return charts.figure([
+        charts.line(x, values, name=scenario, line=dict(color=charts.COLORS[i % len(charts.COLORS)], width=3),
+                    mode='lines+markers')
+        for i, (scenario, values) in enumerate(results.items())
+    ], title="Growth Scenarios", xaxis_title="Year", yaxis_title="Value ($M)")
+
+@memoize(maxsize=64)
+def build_paths_figure(simulation, years):
+    """Chart stochastic growth paths, as bands when there are too many to draw."""
+    x = list(range(years + 1))
+    paths, bands = simulation['paths'], simulation['bands']
+    if simulation['n_paths'] <= MAX_PATH_TRACES:
+        traces = [charts.paths(x, paths, max_traces=MAX_PATH_TRACES, name="Paths", showlegend=False),
+                  go.Scatter(x=x, y=bands[50], name="Median", line=dict(color=charts.COLORS[0], width=3))]
+    else:
+        traces = charts.bands(x, bands)
+    return charts.figure(traces, title=f"{simulation['n_paths']:,} Simulated Growth Paths", xaxis_title="Year",
+                         yaxis_title="Value ($M)")
+
+def display():
+    """Display growth simulation interface and results."""
+    st.subheader("Growth Trajectory Simulator")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        base_value = st.number_input("Initial Value ($M)", value=100.0, step=10.0)
+        years = st.slider("Projection Years", 1, 10, 5)
+    
+    with col2:
+        bear_growth = st.slider("Bear Case Growth (%)", -20, 20, 0)
+        base_growth = st.slider("Base Case Growth (%)", -10, 30, 8)
+        bull_growth = st.slider("Bull Case Growth (%)", 0, 50, 15)
+    
+    scenarios = {
+        "Bear Case": bear_growth,
+        "Base Case": base_growth,
+        "Bull Case": bull_growth
+    }
+    
+    results = growth_simulator.simulate_growth_scenarios(base_value, years, scenarios)
+    
+    fig = build_figure(results, years)
+    
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Display table of values
+    st.subheader("Projected Values")
+    for scenario, values in results.items():
+        st.write(f"{scenario}: ${values[-1]:.1f}M (Year {years})")
+
+    st.subheader("Stochastic Growth Paths")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        n_paths = st.select_slider("Paths", options=[10, 50, 1000, 10000, 100000], value=1000)
+    with col2:
+        vol = st.slider("Growth Volatility (pts)", 0.0, 30.0, 5.0)
+    with col3:
+        persistence = st.slider("Persistence", 0.0, 0.95, 0.5,
+                                help="Share of last year's growth surprise that carries into the next year")
+
+    simulation = growth_simulator.simulate_bands(base_value, years, base_growth, vol, n_paths, persistence, seed=0,
+                                                 sample=MAX_PATH_TRACES)
+    st.plotly_chart(build_paths_figure(simulation, years), use_container_width=True)
+    final = simulation['bands']
+    st.write(" | ".join(f"P{p}: ${v[-1]:,.1f}M" for p, v in final.items()))
@@ -0,0 +1,189 @@
+"""Timing spans and counters for model stages and data requests.
+
+Off by default. While disabled, `span` returns a shared no-op context
+manager, `count` returns at once, and `timed` functions call straight
+through after one flag check. While enabled, each span's duration goes
+into a per-stage latency histogram (Prometheus-style cumulative buckets)
+and a window of recent samples. Each span can also be logged as one JSON
+line.
+
+    INSTRUMENTATION=1 INSTRUMENTATION_LOG=1 streamlit run app.py
+"""
+import bisect
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+ENABLED = os.environ.get("INSTRUMENTATION", "") not in ("", "0")
+LOG_SPANS = os.environ.get("INSTRUMENTATION_LOG", "") not in ("", "0")
+
+# Upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WINDOW = 1000
+
+logger = logging.getLogger(__name__)
+
+LOCK = threading.Lock()
+STAGES = {}
+COUNTERS = {}
+
+class Stage:
+    """Latency histogram and recent samples for one stage."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=WINDOW)
+
+    def observe(self, seconds):
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+def enable(log_spans=None):
+    """Start recording; optionally also log every span as JSON."""
+    global ENABLED, LOG_SPANS
+    ENABLED = True
+    if log_spans is not None:
+        LOG_SPANS = log_spans
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+def reset():
+    with LOCK:
+        STAGES.clear()
+        COUNTERS.clear()
+
+def observe(name, seconds, **fields):
+    """Record one duration for a stage."""
+    with LOCK:
+        stage = STAGES.get(name)
+        if stage is None:
+            stage = STAGES[name] = Stage()
+        stage.observe(seconds)
+    if LOG_SPANS:
+        logger.info(json.dumps({'span': name, 'ms': round(seconds * 1000, 3), **fields}, default=str))
+
+def count(name, n=1):
+    """Add `n` to a named counter (cache hits, scenarios, ...)."""
+    if not ENABLED:
+        return
+    with LOCK:
+        COUNTERS[name] = COUNTERS.get(name, 0) + n
+
+class Span:
+    __slots__ = ('name', 'fields', 'start')
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start, **self.fields)
+        return False
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_SPAN = NullSpan()
+
+def span(name, **fields):
+    """Time a block: `with span('dcf.run'): ...`. Extra fields go to the JSON log."""
+    if not ENABLED:
+        return NULL_SPAN
+    return Span(name, fields)
+
+def timed(name=None):
+    """Decorator that records every call of a function as a span.
+
+    Stacked under `memoize`, only real computations are timed; cache hits
+    show up in the memo counters instead.
+    """
+    def decorator(func):
+        stage = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def percentile(values, q):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+def snapshot():
+    """Return ({stage: summary}, {counter: value}); latencies are in milliseconds.
+
+    Percentiles come from the most recent WINDOW samples of each stage.
+    """
+    with LOCK:
+        stages = {name: (s.count, s.total, list(s.recent)) for name, s in STAGES.items()}
+        counters = dict(COUNTERS)
+    summary = {}
+    for name, (n, total, recent) in stages.items():
+        summary[name] = {
+            'calls': n,
+            'total_s': total,
+            'mean_ms': total / n * 1000 if n else float('nan'),
+            'p50_ms': percentile(recent, 50) * 1000,
+            'p95_ms': percentile(recent, 95) * 1000,
+            'p99_ms': percentile(recent, 99) * 1000,
+            'max_ms': max(recent) * 1000 if recent else float('nan'),
+            'recent_ms': [s * 1000 for s in recent]
+        }
+    return summary, counters
+
+def label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+def prometheus_text(prefix="valuation"):
+    """Render stage histograms, counters and memo cache stats in Prometheus text format."""
+    from modules import memo
+    with LOCK:
+        stages = {name: (list(s.buckets), s.count, s.total) for name, s in STAGES.items()}
+        counters = dict(COUNTERS)
+    lines = [
+        f"# HELP {prefix}_stage_seconds Time spent per model stage or request.",
+        f"# TYPE {prefix}_stage_seconds histogram"
+    ]
+    for name, (buckets, n, total) in sorted(stages.items()):
+        cumulative = 0
+        for bound, hits in zip(BUCKETS + ('+Inf',), buckets):
+            cumulative += hits
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{label(name)}",le="{bound}"}} {cumulative}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{label(name)}"}} {total}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{label(name)}"}} {n}')
+    lines += [f"# HELP {prefix}_events_total Event counters.", f"# TYPE {prefix}_events_total counter"]
+    for name, value in sorted(counters.items()):
+        lines.append(f'{prefix}_events_total{{event="{label(name)}"}} {value}')
+    lines += [f"# HELP {prefix}_memo_total Memoization cache lookups.", f"# TYPE {prefix}_memo_total counter"]
+    for name, cache in sorted(memo.REGISTRY.items()):
+        stats = cache.stats()
+        for result in ('hits', 'misses', 'evictions'):
+            lines.append(f'{prefix}_memo_total{{function="{label(name)}",result="{result}"}} {stats[result]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,80 @@
+import numpy as np
+from modules.instrumentation import timed
+
+def npv_and_derivative(rates, cash_flows):
+    """Evaluate NPV and dNPV/dr for each row of cash flows at its own rate."""
+    periods = np.arange(cash_flows.shape[1])
+    discount = (1.0 + rates)[:, None] ** -periods
+    npv = np.sum(cash_flows * discount, axis=1)
+    dnpv = np.sum(-periods * cash_flows * discount / (1.0 + rates)[:, None], axis=1)
+    return npv, dnpv
+
+@timed()
+def solve_irr(cash_flows, guess=0.1, lower=-0.99, upper=10.0, tol=1e-10, max_iter=100):
+    """Solve IRR for every row of a 2-D cash-flow array at once.
+
+    Uses Newton steps safeguarded by a per-row bisection bracket. Returns
+    (rates, converged) where rates are decimals and converged is a boolean
+    flag per row. Rows whose NPV has the same sign at `lower` and `upper`
+    get NaN, even if they have roots inside the bracket (e.g. two roots).
+    """
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    n_rows = cash_flows.shape[0]
+    lo = np.full(n_rows, lower)
+    hi = np.full(n_rows, upper)
+    f_lo, _ = npv_and_derivative(lo, cash_flows)
+    f_hi, _ = npv_and_derivative(hi, cash_flows)
+
+    # Rows without a sign change over the bracket have no solvable IRR
+    valid = np.isfinite(f_lo) & np.isfinite(f_hi) & (np.sign(f_lo) != np.sign(f_hi))
+    converged = np.zeros(n_rows, dtype=bool)
+    rates = np.clip(np.full(n_rows, guess), lower, upper)
+    scale = np.maximum(np.abs(cash_flows).max(axis=1), 1.0)
+
+    active = valid.copy()
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        idx = np.flatnonzero(active)
+        r = rates[idx]
+        f, df = npv_and_derivative(r, cash_flows[idx])
+
+        # Rows already sitting on the root keep their current rate
+        on_root = np.abs(f) < tol * scale[idx]
+        converged[idx[on_root]] = True
+        active[idx[on_root]] = False
+        keep = ~on_root
+        idx, r, f, df = idx[keep], r[keep], f[keep], df[keep]
+
+        # Tighten the bracket around the root
+        same_side = np.sign(f) == np.sign(f_lo[idx])
+        lo[idx] = np.where(same_side, r, lo[idx])
+        f_lo[idx] = np.where(same_side, f, f_lo[idx])
+        hi[idx] = np.where(same_side, hi[idx], r)
+
+        # Newton step, falling back to bisection when it leaves the bracket
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = r - f / df
+        inside = np.isfinite(newton) & (newton >= lo[idx]) & (newton <= hi[idx])
+        r_new = np.where(inside, newton, 0.5 * (lo[idx] + hi[idx]))
+        rates[idx] = r_new
+
+        done = np.abs(r_new - r) < tol
+        converged[idx[done]] = True
+        active[idx[done]] = False
+
+    rates[~converged] = np.nan
+    return rates, converged
+
+def solve_moic(cash_flows):
+    """Calculate MOIC for every row of a 2-D cash-flow array at once.
+
+    MOIC is the sum of positive flows over the sum of negative flows, so
+    interim equity injections count as invested capital, not only the
+    year-0 outflow. Rows with no outflows get 0.
+    """
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    inflows = np.where(cash_flows > 0, cash_flows, 0.0).sum(axis=1)
+    outflows = -np.where(cash_flows < 0, cash_flows, 0.0).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(outflows > 0, inflows / outflows, 0.0)
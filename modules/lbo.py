@@ -1,38 +1,70 @@
-import pandas as pd
 import numpy as np
-import streamlit as st
-import plotly.graph_objs as go
-from modules.utils import neon_palette, format_currency, format_percentage
+from modules.irr import solve_irr, solve_moic
+from modules.debt import run_waterfall, default_tranches
+from modules.memo import memoize
+from modules.instrumentation import count, timed
+from modules.operating_model import OperatingModel, base_revenue
+
+# Tax rate that reproduces the LBO engine's 60% EBITDA-to-FCF conversion
+# when D&A, capex and working capital are left at zero
+LBO_TAX_RATE = 40.0
+# EBITDA margin (%) the LBO engines assume unless told otherwise
+EBITDA_MARGIN = 15.0
 
 def project_ebitda(financials, rev_growth, ebitda_margin, years=5):
     """Project EBITDA for N years based on user assumptions and historicals."""
-    if financials is None or 'income' not in financials or financials['income'].empty:
+    revenue = base_revenue(financials)
+    if revenue is None:
         return []
-    base_revenue = financials['income'].iloc[0]['revenues']
-    ebitda_list = []
-    revenue = base_revenue
-    for i in range(years):
-        revenue *= (1 + rev_growth / 100)
-        ebitda = revenue * (ebitda_margin / 100)
-        ebitda_list.append(ebitda)
-    return ebitda_list
-
-def model_debt_equity(entry_ebitda, debt_pct, interest_rate, exit_multiple, years):
-    """Model debt and equity structure, returns, and payoff schedule."""
-    pass
-
-def calculate_irr(cash_flows):
-    """Calculate IRR with error handling."""
-    try:
-        # Add small epsilon to avoid division by zero
-        epsilon = 1e-10
-        # Use numpy's financial functions
-        rate = np.irr(cash_flows)
-        if np.isnan(rate) or np.isinf(rate):
-            return None
-        return rate * 100  # Convert to percentage
-    except:
-        return None
+    model = OperatingModel(revenue, years, rev_growth=rev_growth, ebitda_margin=ebitda_margin)
+    return model['ebitda'].tolist()
+
+@timed()
+def model_debt_equity(entry_ebitda, debt_pct, interest_rate, exit_multiple, years, ebitda_growth=8, sweep_pct=100.0, min_dscr=1.25):
+    """Model debt and equity structure, returns, and payoff schedule.
+
+    Inputs may be scalars or NumPy arrays (one value per scenario). Debt is
+    split into the default senior / term B / mezz / PIK stack and run
+    through the multi-tranche waterfall with a cash sweep.
+    """
+    entry_ebitda, debt_pct, interest_rate, exit_multiple = (
+        np.atleast_1d(np.asarray(x, dtype=float)) for x in np.broadcast_arrays(entry_ebitda, debt_pct, interest_rate, exit_multiple)
+    )
+    purchase_price = entry_ebitda * exit_multiple
+    initial_debt = purchase_price * (debt_pct / 100)
+    equity_invested = purchase_price - initial_debt
+
+    # EBITDA -> unlevered FCF via the shared operating model
+    model = OperatingModel(
+        entry_ebitda * 100 / EBITDA_MARGIN, years,
+        rev_growth=ebitda_growth, ebitda_margin=EBITDA_MARGIN, tax_rate=LBO_TAX_RATE
+    )
+    waterfall = run_waterfall(
+        model['fcf'], default_tranches(initial_debt, interest_rate),
+        sweep_pct=sweep_pct, ebitda=model['ebitda'], min_dscr=min_dscr
+    )
+
+    # Equity receives exit proceeds net of all remaining debt, plus the cash retained after sweeps
+    exit_value = model['ebitda'][:, -1] * exit_multiple
+    exit_equity = exit_value - waterfall['total_debt'][:, -1] + waterfall['cash']['ending'][:, -1]
+    cash_flows = np.zeros((len(entry_ebitda), years + 1))
+    cash_flows[:, 0] = -equity_invested
+    cash_flows[:, -1] = exit_equity
+    rates, converged = solve_irr(cash_flows)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        moic = np.where(equity_invested > 0, exit_equity / equity_invested, np.nan)
+
+    return {
+        'purchase_price': purchase_price,
+        'initial_debt': initial_debt,
+        'equity_invested': equity_invested,
+        'exit_value': exit_value,
+        'exit_equity': exit_equity,
+        'irr': rates * 100,
+        'irr_converged': converged,
+        'moic': moic,
+        'waterfall': waterfall
+    }
 
 def calculate_moic(entry_equity, exit_equity):
     """Calculate MOIC (Multiple on Invested Capital)."""
@@ -42,15 +74,21 @@ def calculate_moic(entry_equity, exit_equity):
 
 def calculate_dscr(ebitda, debt_service):
     """Calculate Debt Service Coverage Ratio over time."""
-    if isinstance(ebitda, list) and isinstance(debt_service, list):
+    if isinstance(ebitda, np.ndarray) or isinstance(debt_service, np.ndarray):
+        ebitda, debt_service = np.broadcast_arrays(np.asarray(ebitda, dtype=float), np.asarray(debt_service, dtype=float))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(debt_service > 0, ebitda / debt_service, np.nan)
+    elif isinstance(ebitda, list) and isinstance(debt_service, list):
         return [e/d if d else None for e, d in zip(ebitda, debt_service)]
     elif debt_service:
         return ebitda / debt_service
     else:
         return None
 
+@timed()
 def calculate_debt_schedule(purchase_price, debt_pct, interest_rate, years):
     """Calculate debt repayment schedule."""
+    import pandas as pd
     initial_debt = purchase_price * (debt_pct / 100)
     annual_payment = initial_debt / years  # Simple straight-line amortization
     
@@ -79,42 +117,41 @@ def calculate_returns(purchase_price, exit_value, equity_invested, holding_perio
     if annual_cash_flows is None:
         annual_cash_flows = [0] * (holding_period - 1)
     
-    # Initial investment (negative cash flow)
-    cash_flows = [-equity_invested]
-    
-    # Add intermediate cash flows
-    cash_flows.extend(annual_cash_flows)
-    
-    # Add exit value
-    cash_flows.append(exit_value)
-    
-    # Calculate IRR
-    irr = calculate_irr(cash_flows)
-    
-    # Calculate MOIC
-    total_inflows = sum(cf for cf in cash_flows if cf > 0)
-    moic = total_inflows / equity_invested if equity_invested > 0 else 0
-    
+    # Initial investment, intermediate cash flows, then exit value
+    cash_flows = [-equity_invested, *annual_cash_flows, exit_value]
+
+    # Same solvers as run_batch, so both paths share one IRR and MOIC definition. MOIC is
+    # total inflows over total outflows, so interim equity injections (negative interim
+    # flows) count as invested capital alongside the entry cheque
+    rates, converged = solve_irr([cash_flows])
     return {
-        'irr': irr,
-        'moic': moic,
+        'irr': rates[0] * 100 if converged[0] else None,
+        'moic': float(solve_moic([cash_flows])[0]),
         'cash_flows': cash_flows
     }
 
+@memoize(maxsize=256)
+@timed()
 def run(data, debt_pct, interest_rate, exit_multiple, exit_year, holding_period):
     """Run LBO analysis and return outputs."""
     if not data or not data.get('financials') or data['financials']['income'].empty:
         return None
     
     # Get initial financials
-    initial_revenue = data['financials']['income'].iloc[0]['revenues']
-    initial_ebitda = initial_revenue * 0.15  # Simplified EBITDA assumption
+    initial_revenue = base_revenue(data['financials'])
+    initial_ebitda = initial_revenue * EBITDA_MARGIN / 100  # Simplified EBITDA assumption
+    
+    # Project operations with the same margin and 8% annual growth
+    model = OperatingModel(
+        initial_revenue, holding_period,
+        rev_growth=8, ebitda_margin=EBITDA_MARGIN, tax_rate=LBO_TAX_RATE
+    )
     
     # Calculate purchase and exit values
     purchase_price = initial_ebitda * exit_multiple
     
     # Project exit EBITDA with growth
-    exit_ebitda = initial_ebitda * (1.08 ** holding_period)  # Assume 8% annual EBITDA growth
+    exit_ebitda = model['ebitda'][-1]
     exit_value = exit_ebitda * exit_multiple
     
     # Calculate equity and debt components
@@ -127,9 +164,8 @@ def run(data, debt_pct, interest_rate, exit_multiple, exit_year, holding_period)
     # Calculate annual free cash flows (simplified)
     annual_cash_flows = []
     for year in range(holding_period - 1):
-        ebitda = initial_ebitda * (1.08 ** (year + 1))
         debt_service = debt_schedule.iloc[year]['Total Payment']
-        fcf = ebitda * 0.6 - debt_service  # Assume 60% EBITDA conversion to FCF
+        fcf = model['fcf'][year] - debt_service
         annual_cash_flows.append(fcf)
     
     # Calculate returns
@@ -153,86 +189,101 @@ def run(data, debt_pct, interest_rate, exit_multiple, exit_year, holding_period)
         'leverage_ratio': initial_debt / initial_ebitda
     }
 
-def display(outputs):
-    """Display LBO analysis results."""
-    if not outputs:
-        st.warning("No LBO analysis results to display.")
-        return
-    
-    # Display key metrics
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Purchase Price", format_currency(outputs['purchase_price']))
-    with col2:
-        st.metric("Exit Value", format_currency(outputs['exit_value']))
-    with col3:
-        st.metric("Initial Leverage", f"{outputs['leverage_ratio']:.1f}x")
-    
-    # Display returns
-    st.subheader("Returns Analysis")
-    col1, col2 = st.columns(2)
-    with col1:
-        irr_value = outputs['irr']
-        if irr_value is not None:
-            st.metric("IRR", format_percentage(irr_value))
-        else:
-            st.metric("IRR", "N/A")
-    with col2:
-        st.metric("MOIC", f"{outputs['moic']:.2f}x")
-    
-    # Display cash flows
-    st.subheader("Cash Flow Summary")
-    cash_flows = outputs['cash_flows']
-    years = list(range(len(cash_flows)))
-    cf_df = pd.DataFrame({
-        'Year': years,
-        'Cash Flow': cash_flows
-    })
-    st.dataframe(cf_df.style.format({
-        'Cash Flow': '${:,.0f}'
-    }))
-
-def display_debt_schedule(outputs):
-    """Display debt repayment schedule."""
-    if not outputs or 'debt_schedule' not in outputs:
-        st.warning("No debt schedule available.")
-        return
-    
-    st.subheader("Debt Repayment Schedule")
-    
-    # Create waterfall chart
-    fig = go.Figure()
-    
-    schedule = outputs['debt_schedule']
-    fig.add_trace(go.Waterfall(
-        name="Debt Balance",
-        orientation="v",
-        measure=["relative"] * len(schedule),
-        x=schedule['Year'],
-        y=-schedule['Principal Payment'],
-        connector={"line": {"color": neon_palette()[0]}},
-        decreasing={"marker": {"color": neon_palette()[1]}},
-        increasing={"marker": {"color": neon_palette()[0]}}
-    ))
-    
-    fig.update_layout(
-        title="Debt Amortization Schedule",
-        showlegend=True,
-        template="plotly_dark",
-        plot_bgcolor="#18181b",
-        paper_bgcolor="#18181b",
-        font=dict(color="#00ffe7")
+@timed()
+def calculate_debt_schedule_batch(purchase_price, debt_pct, interest_rate, years, max_years=None):
+    """Calculate straight-line debt schedules for many scenarios as (scenario, year) arrays.
+
+    Years beyond a scenario's own term are zero-filled so scenarios with
+    different holding periods share one grid.
+    """
+    purchase_price, debt_pct, interest_rate, years = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float).ravel() for x in (purchase_price, debt_pct, interest_rate, years))
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Display detailed schedule
-    st.dataframe(
-        schedule.style.format({
-            'Beginning Balance': '${:,.0f}',
-            'Principal Payment': '${:,.0f}',
-            'Interest Payment': '${:,.0f}',
-            'Total Payment': '${:,.0f}',
-            'Ending Balance': '${:,.0f}'
-        })
-    ) 
\ No newline at end of file
+    if max_years is None:
+        max_years = int(years.max())
+    year_idx = np.arange(max_years)[None, :]
+    in_term = year_idx < years[:, None]
+
+    initial_debt = purchase_price * (debt_pct / 100)
+    principal = np.where(in_term, (initial_debt / years)[:, None], 0.0)
+    beginning = np.where(in_term, initial_debt[:, None] - principal * year_idx, 0.0)
+    interest = beginning * (interest_rate / 100)[:, None]
+    return {
+        'beginning_balance': beginning,
+        'principal_payment': principal,
+        'interest_payment': interest,
+        'total_payment': principal + interest,
+        'ending_balance': beginning - principal
+    }
+
+@timed()
+def run_batch(data, debt_pct, interest_rate, exit_multiple, holding_period, ebitda_margin=EBITDA_MARGIN, ebitda_growth=8,
+              entry_multiple=None):
+    """Run LBO analysis for many scenarios at once.
+
+    Assumptions may be scalars or NumPy arrays and are broadcast against
+    each other; every output keeps the broadcast shape, with a trailing
+    year axis for schedules and cash flows. The entry multiple defaults to
+    the exit multiple, as in `run`.
+    """
+    if not data or not data.get('financials') or data['financials']['income'].empty:
+        return None
+
+    if entry_multiple is None:
+        entry_multiple = exit_multiple
+    assumptions = (debt_pct, interest_rate, exit_multiple, holding_period, ebitda_margin, ebitda_growth, entry_multiple)
+    assumptions = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in assumptions))
+    shape = assumptions[0].shape
+    count('lbo.scenarios', assumptions[0].size)
+    debt_pct, interest_rate, exit_multiple, holding_period, ebitda_margin, ebitda_growth, entry_multiple = (
+        x.ravel() for x in assumptions
+    )
+    max_years = int(holding_period.max())
+
+    initial_revenue = base_revenue(data['financials'])
+    initial_ebitda = initial_revenue * (ebitda_margin / 100)
+    purchase_price = initial_ebitda * entry_multiple
+    model = OperatingModel(
+        initial_revenue, max_years,
+        rev_growth=ebitda_growth[:, None], ebitda_margin=ebitda_margin[:, None], tax_rate=LBO_TAX_RATE
+    )
+    exit_ebitda = np.take_along_axis(model['ebitda'], holding_period.astype(int)[:, None] - 1, axis=1)[:, 0]
+    exit_value = exit_ebitda * exit_multiple
+    equity_invested = purchase_price * (1 - debt_pct / 100)
+    initial_debt = purchase_price * (debt_pct / 100)
+
+    schedule = calculate_debt_schedule_batch(purchase_price, debt_pct, interest_rate, holding_period, max_years)
+
+    # Year x scenario grid: interim flows for years 1..H-1, exit value at year H
+    years = np.arange(1, max_years + 1)[None, :]
+    interim = (model['fcf'] - schedule['total_payment']) * (years < holding_period[:, None])
+    exit_flows = exit_value[:, None] * (years == holding_period[:, None])
+    cash_flows = np.concatenate([-equity_invested[:, None], interim + exit_flows], axis=1)
+
+    in_term = years <= holding_period[:, None]
+    dscr = np.where(in_term, calculate_dscr(model['ebitda'], schedule['total_payment']), np.nan)
+
+    rates, converged = solve_irr(cash_flows)
+    moic = solve_moic(cash_flows)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        leverage_ratio = initial_debt / initial_ebitda
+
+    def grid(x):
+        return x.reshape(shape + x.shape[1:])
+
+    return {
+        'purchase_price': grid(purchase_price),
+        'exit_value': grid(exit_value),
+        'equity_invested': grid(equity_invested),
+        'initial_debt': grid(initial_debt),
+        'debt_balance': grid(schedule['ending_balance']),
+        'interest_payment': grid(schedule['interest_payment']),
+        'principal_payment': grid(schedule['principal_payment']),
+        'irr': grid(rates * 100),
+        'irr_converged': grid(converged),
+        'moic': grid(moic),
+        'cash_flows': grid(cash_flows),
+        'leverage_ratio': grid(leverage_ratio),
+        'ebitda': grid(model['ebitda']),
+        'dscr': grid(dscr)
+    }
@@ -0,0 +1,108 @@
+import pandas as pd
+import streamlit as st
+import plotly.graph_objs as go
+from modules import charts, goal_seek
+from modules.memo import memoize
+from modules.utils import format_currency, format_percentage
+
+def display(outputs):
+    """Display LBO analysis results."""
+    if not outputs:
+        st.warning("No LBO analysis results to display.")
+        return
+    
+    # Display key metrics
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Purchase Price", format_currency(outputs['purchase_price']))
+    with col2:
+        st.metric("Exit Value", format_currency(outputs['exit_value']))
+    with col3:
+        st.metric("Initial Leverage", f"{outputs['leverage_ratio']:.1f}x")
+    
+    # Display returns
+    st.subheader("Returns Analysis")
+    col1, col2 = st.columns(2)
+    with col1:
+        irr_value = outputs['irr']
+        if irr_value is not None:
+            st.metric("IRR", format_percentage(irr_value))
+        else:
+            st.metric("IRR", "N/A")
+    with col2:
+        st.metric("MOIC", f"{outputs['moic']:.2f}x")
+    
+    # Display cash flows
+    st.subheader("Cash Flow Summary")
+    cash_flows = outputs['cash_flows']
+    years = list(range(len(cash_flows)))
+    cf_df = pd.DataFrame({
+        'Year': years,
+        'Cash Flow': cash_flows
+    })
+    st.dataframe(cf_df.style.format({
+        'Cash Flow': '${:,.0f}'
+    }))
+
+def display_goal_seek(data, base):
+    """Solve for the entry multiple hitting a target IRR and the max debt under a DSCR covenant."""
+    st.subheader("Goal Seek")
+    col1, col2 = st.columns(2)
+    with col1:
+        target_irr = st.number_input("Target IRR (%)", value=20.0, step=1.0)
+        price = goal_seek.entry_multiple_for_irr(
+            data, target_irr, base['debt_pct'], base['interest_rate'], base['exit_multiple'], base['holding_period']
+        )
+        if price is not None and price['converged']:
+            st.metric("Max Entry Multiple", f"{float(price['entry_multiple']):.2f}x",
+                      help=f"Purchase price {format_currency(float(price['purchase_price']))}")
+        else:
+            st.metric("Max Entry Multiple", "N/A")
+    with col2:
+        covenant = st.number_input("Minimum DSCR (x)", value=1.25, step=0.05)
+        debt = goal_seek.max_debt_for_dscr(
+            data, covenant, base['interest_rate'], base['exit_multiple'], base['holding_period']
+        )
+        if debt is not None and debt['converged']:
+            st.metric("Max Debt Financing", format_percentage(float(debt['debt_pct'])),
+                      help=f"Minimum DSCR {float(debt['min_dscr']):.2f}x")
+        else:
+            st.metric("Max Debt Financing", "N/A")
+
+@memoize(maxsize=64)
+def build_debt_figure(schedule):
+    """Build the debt amortization waterfall."""
+    return charts.figure([go.Waterfall(
+        name="Debt Balance",
+        orientation="v",
+        measure=["relative"] * len(schedule),
+        x=schedule['Year'],
+        y=-schedule['Principal Payment'],
+        connector={"line": {"color": charts.COLORS[0]}},
+        decreasing={"marker": {"color": charts.COLORS[1]}},
+        increasing={"marker": {"color": charts.COLORS[0]}}
+    )], title="Debt Amortization Schedule", showlegend=True)
+
+def display_debt_schedule(outputs):
+    """Display debt repayment schedule."""
+    if not outputs or 'debt_schedule' not in outputs:
+        st.warning("No debt schedule available.")
+        return
+    
+    st.subheader("Debt Repayment Schedule")
+    
+    schedule = outputs['debt_schedule']
+    fig = build_debt_figure(schedule)
+    
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Display detailed schedule
+    st.dataframe(
+        schedule.style.format({
+            'Beginning Balance': '${:,.0f}',
+            'Principal Payment': '${:,.0f}',
+            'Interest Payment': '${:,.0f}',
+            'Total Payment': '${:,.0f}',
+            'Ending Balance': '${:,.0f}'
+        })
+    )
@@ -0,0 +1,343 @@
+"""Live re-marking of DCF upside and LBO entry-price IRR as prices tick.
+
+A feed pushes (ticker, price) ticks into a `LiveBook`. The book keeps
+only the latest price per name and a background loop reprices the names
+that ticked since its last pass, so a burst of ticks costs one
+recompute. Everything that does not depend on the share price is worked
+out once per name when it is added:
+
+- DCF: equity value from the (memoized) engine; upside is equity value
+  over market cap at the new price.
+- LBO: equity cash flows are linear in the purchase price P (equity
+  invested and straight-line debt service both scale with it), so they
+  are stored as `fixed + P * per_unit`. A tick only rebuilds P from the
+  new price and solves IRR for every repriced name in one batch.
+
+One book (and one feed) can serve many viewers: each registers the names
+it watches with `watch()` and lets go with `release()`, which drops names
+nobody else watches and stops the threads once the book is empty.
+"""
+import threading
+import time
+import numpy as np
+from modules import dcf, lbo
+from modules.instrumentation import count, span
+from modules.irr import solve_irr, solve_moic
+
+# Premium over the market value of equity paid to take a company private (%)
+TAKEOVER_PREMIUM = 25.0
+REPRICE_INTERVAL = 0.25
+
+class PriceFeed:
+    """Base class for price sources.
+
+    Subclasses implement `run()`, which loops until `self.stopped` is set
+    and calls `self.publish(ticker, price)` for every tick.
+    """
+
+    def __init__(self):
+        self.handler = None
+        self.prices = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def subscribe(self, prices):
+        """Add names to the feed, with their last known price ({ticker: price})."""
+        with self.lock:
+            self.prices.update(prices)
+
+    def unsubscribe(self, tickers):
+        with self.lock:
+            for t in tickers:
+                self.prices.pop(t, None)
+
+    def tickers(self):
+        with self.lock:
+            return list(self.prices)
+
+    def publish(self, ticker, price):
+        if self.handler is not None:
+            self.handler(ticker, price, time.time())
+
+    def start(self, handler):
+        self.handler = handler
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name=type(self).__name__, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        raise NotImplementedError
+
+class SimulatedFeed(PriceFeed):
+    """Random-walk prices for testing, delivered in bursts.
+
+    Every `1 / bursts_per_second` seconds, `burst` ticks are drawn for
+    random subscribed names, each moving the price by a lognormal step
+    with standard deviation `volatility`.
+    """
+
+    def __init__(self, burst=50, bursts_per_second=20, volatility=0.002, seed=None):
+        super().__init__()
+        self.burst = burst
+        self.bursts_per_second = bursts_per_second
+        self.volatility = volatility
+        self.rng = np.random.default_rng(seed)
+
+    def step(self):
+        """Generate and publish one burst of ticks."""
+        with self.lock:
+            tickers = list(self.prices)
+            if not tickers:
+                return
+            picks = self.rng.integers(len(tickers), size=self.burst)
+            moves = np.exp(self.rng.normal(0, self.volatility, size=self.burst))
+            ticks = []
+            for i, move in zip(picks, moves):
+                t = tickers[i]
+                self.prices[t] *= move
+                ticks.append((t, self.prices[t]))
+        for t, price in ticks:
+            self.publish(t, price)
+
+    def run(self):
+        while not self.stopped.wait(1 / self.bursts_per_second):
+            self.step()
+
+class PollingFeed(PriceFeed):
+    """Polygon snapshot prices for every subscribed name, one request per poll."""
+
+    def __init__(self, interval=5.0, fetch=None):
+        super().__init__()
+        self.interval = interval
+        self.fetch = fetch
+        self.error = None
+
+    def run(self):
+        from modules import polygon_api
+        fetch = self.fetch or polygon_api.fetch_prices
+        while True:
+            try:
+                for t, price in fetch(self.tickers()).items():
+                    self.publish(t, price)
+                self.error = None
+            except Exception as e:
+                self.error = str(e)
+            if self.stopped.wait(self.interval):
+                break
+
+def net_debt(data):
+    """Enterprise value less market cap, or zero when either is unknown."""
+    market_cap_ev = data.get('market_cap_ev') or {}
+    ev, market_cap = market_cap_ev.get('enterprise_value'), market_cap_ev.get('market_cap')
+    return ev - market_cap if ev and market_cap else 0.0
+
+def reference_price(data):
+    """Snapshot price and implied share count of a fetched ticker."""
+    market_data = data.get('market_data') or {}
+    price = market_data.get('price')
+    market_cap = (data.get('market_cap_ev') or {}).get('market_cap') or market_data.get('market_cap')
+    if not price or not market_cap:
+        return None, None
+    return float(price), float(market_cap) / float(price)
+
+def price_terms(data, assumptions):
+    """Price-independent terms for one name.
+
+    Returns (equity_value, net_debt, fixed, per_unit) where the LBO equity
+    cash flows at purchase price P are `fixed + P * per_unit`.
+    """
+    a = assumptions
+    dcf_outputs = dcf.run(data, a['rev_growth'], a['ebitda_margin'], a['discount_rate'], a['exit_multiple'],
+                          a['exit_year'])
+    lbo_outputs = lbo.run(data, a['debt_pct'], a['interest_rate'], a['exit_multiple'], a['exit_year'],
+                          a['holding_period'])
+    if not dcf_outputs or not lbo_outputs:
+        return None
+    debt = net_debt(data)
+    holding_period = int(a['holding_period'])
+    schedule = lbo.calculate_debt_schedule_batch(1.0, a['debt_pct'], a['interest_rate'], holding_period)
+    per_unit = np.concatenate([
+        [-(1 - a['debt_pct'] / 100)], -schedule['total_payment'][0, :holding_period - 1], [0.0]
+    ])
+    fixed = np.asarray(lbo_outputs['cash_flows'], dtype=float) - lbo_outputs['purchase_price'] * per_unit
+    return dcf_outputs['enterprise_value'] - debt, debt, fixed, per_unit
+
+class LiveBook:
+    """Latest marks for a watchlist, repriced from coalesced ticks."""
+
+    def __init__(self, premium=TAKEOVER_PREMIUM):
+        self.premium = premium
+        self.names = []
+        self.rows = {}
+        self.shares = np.zeros(0)
+        self.equity_value = np.zeros(0)
+        self.net_debt = np.zeros(0)
+        self.fixed = np.zeros((0, 1))
+        self.per_unit = np.zeros((0, 1))
+        self.price = np.zeros(0)
+        self.upside = np.zeros(0)
+        self.entry_irr = np.zeros(0)
+        self.entry_moic = np.zeros(0)
+        self.updated = np.zeros(0)
+        self.ticks = np.zeros(0, dtype=int)
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.marks_lock = threading.Lock()
+        self.feed = None
+        self.stopped = threading.Event()
+        self.thread = None
+        self.version = 0
+        self.watchers = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, ticker, data, assumptions):
+        """Add or replace a name; returns False if it cannot be marked (no price or financials)."""
+        price, shares = reference_price(data)
+        terms = price_terms(data, assumptions) if price else None
+        if terms is None:
+            return False
+        equity_value, debt, fixed, per_unit = terms
+        with self.marks_lock:
+            if ticker not in self.rows:
+                self.rows[ticker] = len(self.names)
+                self.names.append(ticker)
+                for name in ('shares', 'equity_value', 'net_debt', 'price', 'upside', 'entry_irr', 'entry_moic',
+                             'updated', 'ticks'):
+                    setattr(self, name, np.pad(getattr(self, name), (0, 1)))
+                self.fixed = np.pad(self.fixed, ((0, 1), (0, 0)))
+                self.per_unit = np.pad(self.per_unit, ((0, 1), (0, 0)))
+            width = max(self.fixed.shape[1], len(fixed))
+            if width > self.fixed.shape[1]:
+                # Trailing zero flows leave IRR and MOIC unchanged
+                extra = ((0, 0), (0, width - self.fixed.shape[1]))
+                self.fixed, self.per_unit = np.pad(self.fixed, extra), np.pad(self.per_unit, extra)
+            row = self.rows[ticker]
+            self.shares[row], self.equity_value[row], self.net_debt[row] = shares, equity_value, debt
+            self.fixed[row], self.per_unit[row] = 0.0, 0.0
+            self.fixed[row, :len(fixed)], self.per_unit[row, :len(per_unit)] = fixed, per_unit
+            self.reprice_rows(np.array([row]), np.array([price]), time.time())
+        if self.feed is not None:
+            self.feed.subscribe({ticker: price})
+        return True
+
+    def remove(self, tickers):
+        if self.feed is not None:
+            self.feed.unsubscribe(tickers)
+        with self.marks_lock:
+            keep = np.ones(len(self.names), dtype=bool)
+            keep[[self.rows[t] for t in tickers if t in self.rows]] = False
+            self.names = [n for n, k in zip(self.names, keep) if k]
+            self.rows = {n: i for i, n in enumerate(self.names)}
+            for name in ('shares', 'equity_value', 'net_debt', 'fixed', 'per_unit', 'price', 'upside', 'entry_irr',
+                         'entry_moic', 'updated', 'ticks'):
+                setattr(self, name, getattr(self, name)[keep])
+
+    def watch(self, owner, tickers):
+        """Record that `owner` (e.g. a session) watches `tickers`, replacing its previous list."""
+        with self.lock:
+            self.watchers[owner] = list(tickers)
+
+    def release(self, owner):
+        """Forget `owner`'s watchlist, drop names no one else watches and stop once nothing is left."""
+        with self.lock:
+            self.watchers.pop(owner, None)
+            watched = {t for tickers in self.watchers.values() for t in tickers}
+        self.remove([t for t in self.names if t not in watched])
+        if not len(self):
+            self.stop()
+
+    def on_tick(self, ticker, price, timestamp):
+        """Feed handler: remember the latest price; repricing happens on the next pass."""
+        with self.lock:
+            if ticker in self.pending:
+                count('live.coalesced')
+            self.pending[ticker] = (price, timestamp)
+        count('live.ticks')
+
+    def reprice_rows(self, rows, prices, timestamps):
+        """Re-mark the given rows at new prices (caller holds `marks_lock`)."""
+        market_cap = self.shares[rows] * prices
+        purchase_price = market_cap * (1 + self.premium / 100) + self.net_debt[rows]
+        cash_flows = self.fixed[rows] + purchase_price[:, None] * self.per_unit[rows]
+        rates, converged = solve_irr(cash_flows)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.upside[rows] = (self.equity_value[rows] / market_cap - 1) * 100
+        # Same MOIC definition as `lbo.run`
+        self.entry_moic[rows] = solve_moic(cash_flows)
+        self.entry_irr[rows] = np.where(converged, rates * 100, np.nan)
+        self.price[rows] = prices
+        self.updated[rows] = timestamps
+        self.version += 1
+
+    def reprice(self):
+        """Re-mark every name that ticked since the last call; returns how many were repriced."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        with self.marks_lock:
+            pending = {t: v for t, v in pending.items() if t in self.rows}
+            if not pending:
+                return 0
+            with span('live.reprice', names=len(pending)):
+                rows = np.array([self.rows[t] for t in pending])
+                prices, timestamps = np.array(list(pending.values()), dtype=float).T
+                self.ticks[rows] += 1
+                self.reprice_rows(rows, prices, timestamps)
+        return len(pending)
+
+    def set_premium(self, premium):
+        """Change the takeover premium and re-mark every name at its last price."""
+        with self.marks_lock:
+            self.premium = premium
+            if len(self.names):
+                self.reprice_rows(np.arange(len(self.names)), self.price.copy(), self.updated.copy())
+
+    def start(self, feed, interval=REPRICE_INTERVAL):
+        """Subscribe `feed` to every name and reprice every `interval` seconds until `stop()`."""
+        self.stop()
+        self.feed = feed
+        with self.marks_lock:
+            feed.subscribe(dict(zip(self.names, self.price.tolist())))
+        self.stopped.clear()
+        feed.start(self.on_tick)
+        self.thread = threading.Thread(target=self.loop, args=(interval,), name="LiveBook", daemon=True)
+        self.thread.start()
+
+    def loop(self, interval):
+        while not self.stopped.wait(interval):
+            self.reprice()
+
+    def stop(self):
+        if self.feed is not None:
+            self.feed.stop()
+            self.feed = None
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.reprice()
+
+    @property
+    def running(self):
+        return self.thread is not None
+
+    def marks(self):
+        """Current marks as a DataFrame, one row per name."""
+        import pandas as pd
+        with self.marks_lock:
+            return pd.DataFrame({
+                'price': self.price,
+                'dcf_upside': self.upside,
+                'entry_irr': self.entry_irr,
+                'entry_moic': self.entry_moic,
+                'ticks': self.ticks,
+                'updated': pd.to_datetime(self.updated, unit='s')
+            }, index=pd.Index(list(self.names), name='ticker'))
@@ -0,0 +1,79 @@
+import re
+import uuid
+import streamlit as st
+from modules import live, polygon_api
+
+FEEDS = {
+    "Simulated": lambda: live.SimulatedFeed(),
+    "Polygon snapshots": lambda: live.PollingFeed()
+}
+
+@st.cache_resource
+def shared_book():
+    """One book, and so one feed and reprice thread, for every session in the process."""
+    return live.LiveBook()
+
+def session_id():
+    return st.session_state.setdefault('live_session', uuid.uuid4().hex)
+
+def set_premium():
+    shared_book().set_premium(st.session_state['live_premium'])
+
+@st.fragment(run_every=1.0)
+def display_marks(book, tickers):
+    """Redraw this session's rows every second while the feed runs, without rerunning the page."""
+    marks = book.marks()
+    marks = marks.loc[[t for t in tickers if t in marks.index]]
+    if marks.empty:
+        st.info("Start the feed to mark the watchlist.")
+        return
+    st.dataframe(marks.style.format({
+        'price': "{:,.2f}", 'dcf_upside': "{:+,.1f}%", 'entry_irr': "{:,.1f}%", 'entry_moic': "{:,.2f}x",
+        'ticks': "{:,.0f}"
+    }, na_rep="—"), use_container_width=True)
+    error = getattr(book.feed, 'error', None)
+    if error:
+        st.warning(f"Price feed error: {error}")
+
+def display(ticker, data, assumptions):
+    """Watchlist controls and live DCF upside / entry-price IRR marks.
+
+    The book is shared by every session; this session only watches (and
+    shows) its own tickers, and Stop releases them rather than stopping
+    the feed for everyone.
+    """
+    book = shared_book()
+    watching = st.session_state.get('live_tickers', [])
+    col1, col2 = st.columns([3, 1])
+    watchlist = col1.text_area("Watchlist", value=ticker, help="Tickers separated by commas or spaces")
+    feed = col2.radio("Price feed", list(FEEDS), disabled=book.running,
+                      help="Chosen by whichever session starts the shared feed")
+    st.slider("Takeover premium (%)", 0, 100, int(book.premium), key="live_premium", on_change=set_premium,
+              help="Premium over market cap paid at entry, for the entry-price IRR (shared by all sessions)")
+
+    start, stop = st.columns(2)
+    if start.button("Start", disabled=bool(watching)):
+        tickers = list(dict.fromkeys(t.upper() for t in re.split(r"[\s,]+", watchlist) if t))
+        skipped = []
+        with st.spinner("Loading watchlist..."):
+            for t in tickers:
+                name_data = data if t == ticker and data else polygon_api.fetch_all(t)
+                if not book.add(t, name_data, assumptions):
+                    skipped.append(t)
+        watching = [t for t in tickers if t not in skipped]
+        if watching:
+            book.watch(session_id(), watching)
+            if not book.running:
+                book.start(FEEDS[feed]())
+        st.session_state['live_tickers'] = watching
+        st.session_state['live_skipped'] = skipped
+        st.rerun()
+    if stop.button("Stop", disabled=not watching):
+        book.release(session_id())
+        st.session_state['live_tickers'] = []
+        st.rerun()
+    if st.session_state.get('live_skipped'):
+        st.warning(f"No price or financials for: {', '.join(st.session_state['live_skipped'])}")
+    st.caption("Marks use the sidebar assumptions; upside compares DCF equity value with market cap at the "
+               "latest price, and entry IRR buys the company at that price plus the premium.")
+    display_marks(book, watching)
@@ -0,0 +1,125 @@
+import functools
+import hashlib
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+
+def update_hash(h, obj):
+    """Feed a stable, type-tagged encoding of obj into a hashlib object."""
+    # pandas is only consulted if something has already imported it
+    pd = sys.modules.get('pandas')
+    if isinstance(obj, dict):
+        h.update(b'd')
+        for key in sorted(obj, key=repr):
+            update_hash(h, key)
+            update_hash(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update(b'l' if isinstance(obj, list) else b't')
+        h.update(str(len(obj)).encode())
+        for item in obj:
+            update_hash(h, item)
+    elif pd is not None and isinstance(obj, pd.DataFrame):
+        h.update(b'f')
+        update_hash(h, [str(c) for c in obj.columns])
+        h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+    elif pd is not None and isinstance(obj, pd.Series):
+        h.update(b's')
+        h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(b'a')
+        h.update(str(obj.dtype).encode() + str(obj.shape).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif obj is None or isinstance(obj, (bool, int, float, str, bytes, np.generic)):
+        # repr keeps 1 and 1.0 distinct, which matters for typed results
+        h.update(b'v' + type(obj).__name__.encode() + repr(obj).encode())
+    else:
+        h.update(b'p' + pickle.dumps(obj))
+
+def stable_hash(*objs):
+    """Return a hex digest that is stable across processes and sessions."""
+    h = hashlib.blake2b(digest_size=16)
+    for obj in objs:
+        update_hash(h, obj)
+    return h.hexdigest()
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU cache with hit/miss counters."""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key in self.data:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return self.data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self.data),
+                'maxsize': self.maxsize,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+# Every memoized function in the process, for reporting
+REGISTRY = {}
+
+MISSING = object()
+
+def memoize(maxsize=128):
+    """Cache a function's results keyed on a stable hash of its arguments.
+
+    The cache lives at module level, so it is shared by every Streamlit
+    session in the server process. Cached results are shared objects and
+    must not be mutated by callers.
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        cache = LRUCache(maxsize)
+        REGISTRY[name] = cache
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = stable_hash(name, args, kwargs)
+            result = cache.get(key, MISSING)
+            if result is MISSING:
+                result = func(*args, **kwargs)
+                cache.set(key, result)
+            return result
+
+        wrapper.cache = cache
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+def stats():
+    """Return hit/miss metrics for every memoized function as a DataFrame."""
+    import pandas as pd
+    return pd.DataFrame({name: cache.stats() for name, cache in REGISTRY.items()}).T
@@ -0,0 +1,172 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from modules import dcf, lbo
+from modules.instrumentation import timed
+
+ENGINES = {
+    'dcf': (dcf.run_batch, ['enterprise_value', 'equity_value']),
+    'lbo': (lbo.run_batch, ['irr', 'moic'])
+}
+
+PERCENTILES = [5, 10, 25, 50, 75, 90, 95]
+
+def default_distributions(model, base):
+    """Return a distribution spec centred on the sidebar assumptions.
+
+    Each entry maps an engine argument to (numpy Generator method, *params).
+    """
+    if model == 'dcf':
+        return {
+            'rev_growth': ('normal', base['rev_growth'], 3.0),
+            'ebitda_margin': ('normal', base['ebitda_margin'], 3.0),
+            'exit_multiple': ('triangular', base['exit_multiple'] - 2, base['exit_multiple'], base['exit_multiple'] + 2)
+        }
+    return {
+        # With a fixed margin, EBITDA grows at the revenue growth rate
+        'ebitda_growth': ('normal', base.get('ebitda_growth', 8), 3.0),
+        'ebitda_margin': ('normal', base.get('ebitda_margin', 15), 2.0),
+        'exit_multiple': ('triangular', base['exit_multiple'] - 2, base['exit_multiple'], base['exit_multiple'] + 2),
+        'interest_rate': ('normal', base['interest_rate'], 1.0)
+    }
+
+def sample(rng, distributions, size):
+    """Draw `size` values for every assumption in a distribution spec."""
+    return {name: getattr(rng, spec[0])(*spec[1:], size=size) for name, spec in distributions.items()}
+
+class StreamingHistogram:
+    """Fixed-edge histogram with running moments and approximate quantiles.
+
+    Values outside the edges are counted in underflow/overflow bins bounded
+    by the running min/max, so memory stays constant however many values
+    are added. Histograms with identical edges can be merged.
+    """
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.missing = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        finite = np.isfinite(values)
+        self.missing += int((~finite).sum())
+        values = values[finite]
+        if values.size == 0:
+            return self
+        self.counts += np.histogram(values, self.edges)[0]
+        self.underflow += int((values < self.edges[0]).sum())
+        self.overflow += int((values > self.edges[-1]).sum())
+        self._merge_moments(values.size, values.mean(), ((values - values.mean()) ** 2).sum())
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        return self
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.missing += other.missing
+        if other.count:
+            self._merge_moments(other.count, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _merge_moments(self, n, mean, m2):
+        # Chan et al. parallel update of count, mean and sum of squares
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    def quantile(self, q):
+        """Approximate quantiles (q in [0, 1]) by interpolating within bins."""
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan)
+        counts = np.concatenate([[self.underflow], self.counts, [self.overflow]])
+        bounds = np.concatenate([[min(self.min, self.edges[0])], self.edges, [max(self.max, self.edges[-1])]])
+        cumulative = np.concatenate([[0], np.cumsum(counts)]) / self.count
+        return np.interp(q, cumulative, bounds)
+
+    def summary(self, percentiles=PERCENTILES):
+        return {
+            'count': self.count,
+            'missing': self.missing,
+            'mean': self.mean,
+            'std': np.sqrt(self.m2 / self.count) if self.count else np.nan,
+            'min': self.min,
+            'max': self.max,
+            'percentiles': dict(zip(percentiles, self.quantile(np.asarray(percentiles) / 100)))
+        }
+
+def make_edges(values, bins):
+    """Choose histogram edges from a pilot sample, padded to catch the tails."""
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return np.linspace(0, 1, bins + 1)
+    lo, hi = np.quantile(values, [0.001, 0.999])
+    span = max(hi - lo, abs(hi) * 1e-6, 1e-9)
+    return np.linspace(lo - 0.5 * span, hi + 0.5 * span, bins + 1)
+
+def run_chunk(model, data, base, distributions, seed_seq, size, edges):
+    """Evaluate one chunk of paths and fold it into fresh histograms."""
+    run_batch, metrics = ENGINES[model]
+    draws = sample(np.random.default_rng(seed_seq), distributions, size)
+    outputs = run_batch(data, **{**base, **draws})
+    return {m: StreamingHistogram(edges[m]).update(outputs[m]) for m in metrics}
+
+def run_chunk_star(args):
+    return run_chunk(*args)
+
+@timed()
+def simulate(model, data, base, distributions=None, n_paths=100000, chunk_size=50000, seed=None, processes=None, bins=200):
+    """Run a Monte Carlo valuation and return streaming summaries per metric.
+
+    Paths are evaluated in fixed-size chunks so memory is bounded by
+    `chunk_size`, not `n_paths`. Each chunk gets its own spawned seed, so a
+    given seed produces the same result with or without a process pool.
+    """
+    run_batch, metrics = ENGINES[model]
+    if distributions is None:
+        distributions = default_distributions(model, base)
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    # The first chunk fixes the histogram edges shared by every other chunk
+    draws = sample(np.random.default_rng(seeds[0]), distributions, sizes[0])
+    pilot = run_batch(data, **{**base, **draws})
+    if pilot is None:
+        return None
+    edges = {m: make_edges(np.asarray(pilot[m], dtype=float).ravel(), bins) for m in metrics}
+    hists = {m: StreamingHistogram(edges[m]).update(pilot[m]) for m in metrics}
+    del pilot, draws
+
+    jobs = [(model, data, base, distributions, s, n, edges) for s, n in zip(seeds[1:], sizes[1:])]
+    if processes and processes > 1 and jobs:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = pool.map(run_chunk_star, jobs)
+            for result in results:
+                for m in metrics:
+                    hists[m].merge(result[m])
+    else:
+        for job in jobs:
+            result = run_chunk(*job)
+            for m in metrics:
+                hists[m].merge(result[m])
+
+    return {
+        'n_paths': n_paths,
+        'distributions': distributions,
+        'summaries': {m: hists[m].summary() for m in metrics},
+        'histograms': hists
+    }
@@ -0,0 +1,49 @@
+import streamlit as st
+import plotly.graph_objs as go
+from modules import charts, monte_carlo
+from modules.memo import memoize
+
+@memoize(maxsize=64)
+def build_figure(edges, counts, percentiles, label):
+    """Build a histogram of simulated values with P5/P50/P95 markers."""
+    colors = charts.COLORS
+    centers = (edges[:-1] + edges[1:]) / 2
+    fig = charts.figure([go.Bar(x=centers, y=counts, marker_color=colors[0], name=label)],
+                        title=f"{label} Distribution", xaxis_title=label, yaxis_title="Paths")
+    for p, color in [(5, colors[4]), (50, colors[2]), (95, colors[3])]:
+        fig.add_vline(x=percentiles[p], line=dict(color=color, dash="dash"), annotation_text=f"P{p}")
+    return fig
+
+@memoize(maxsize=16)
+def run_simulation(model, data, base, n_paths, seed):
+    """Cached simulation, so reruns that don't change its inputs don't redo up to 1M paths.
+
+    Only the histograms and summaries are kept, not the paths themselves.
+    """
+    return monte_carlo.simulate(model, data, base, n_paths=n_paths, seed=seed)
+
+def display(data, dcf_base, lbo_base):
+    """Display Monte Carlo valuation distributions in Streamlit."""
+    st.subheader("Monte Carlo Valuation")
+    col1, col2 = st.columns(2)
+    with col1:
+        n_paths = st.select_slider("Paths", options=[10000, 100000, 1000000], value=100000)
+    with col2:
+        seed = st.number_input("Seed", value=42, step=1)
+
+    for model, base, metric, label in [
+        ('dcf', dcf_base, 'enterprise_value', "DCF Enterprise Value ($)"),
+        ('lbo', lbo_base, 'irr', "LBO IRR (%)")
+    ]:
+        results = run_simulation(model, data, base, n_paths, int(seed))
+        if results is None:
+            continue
+        hist = results['histograms'][metric]
+        summary = results['summaries'][metric]
+        fig = build_figure(hist.edges, hist.counts, summary['percentiles'], label)
+        st.plotly_chart(fig, use_container_width=True)
+        cols = st.columns(4)
+        cols[0].metric("Mean", f"{summary['mean']:,.1f}")
+        cols[1].metric("P5", f"{summary['percentiles'][5]:,.1f}")
+        cols[2].metric("P50", f"{summary['percentiles'][50]:,.1f}")
+        cols[3].metric("P95", f"{summary['percentiles'][95]:,.1f}")
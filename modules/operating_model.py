@@ -0,0 +1,133 @@
+import numpy as np
+
+# Assumptions are percentages, like the sidebar inputs. The default tax
+# rate with zero D&A, capex and working capital gives FCF = 0.7 x EBITDA,
+# the conversion the DCF engine has always used.
+DEFAULT_ASSUMPTIONS = {
+    'rev_growth': 8.0,
+    'ebitda_margin': 22.0,
+    'da_pct': 0.0,
+    'capex_pct': 0.0,
+    'nwc_pct': 0.0,
+    'tax_rate': 30.0
+}
+
+def compute_revenue(m, s):
+    prev = m.base_revenue if s == 0 else m.values['revenue'][..., s - 1]
+    growth = np.cumprod(1 + m.assumptions['rev_growth'][..., s:] / 100, axis=-1)
+    m.values['revenue'][..., s:] = np.asarray(prev)[..., None] * growth
+
+def compute_ebitda(m, s):
+    m.values['ebitda'][..., s:] = m.values['revenue'][..., s:] * m.assumptions['ebitda_margin'][..., s:] / 100
+
+def compute_da(m, s):
+    m.values['da'][..., s:] = m.values['revenue'][..., s:] * m.assumptions['da_pct'][..., s:] / 100
+
+def compute_ebit(m, s):
+    m.values['ebit'][..., s:] = m.values['ebitda'][..., s:] - m.values['da'][..., s:]
+
+def compute_taxes(m, s):
+    m.values['taxes'][..., s:] = np.maximum(m.values['ebit'][..., s:], 0) * m.assumptions['tax_rate'][..., s:] / 100
+
+def compute_capex(m, s):
+    m.values['capex'][..., s:] = m.values['revenue'][..., s:] * m.assumptions['capex_pct'][..., s:] / 100
+
+def compute_nwc(m, s):
+    m.values['nwc'][..., s:] = m.values['revenue'][..., s:] * m.assumptions['nwc_pct'][..., s:] / 100
+
+def compute_delta_nwc(m, s):
+    if s == 0:
+        prev = np.asarray(m.base_revenue)[..., None] * m.assumptions['nwc_pct'][..., :1] / 100
+    else:
+        prev = m.values['nwc'][..., s - 1:s]
+    m.values['delta_nwc'][..., s:] = np.diff(np.concatenate([prev, m.values['nwc'][..., s:]], axis=-1), axis=-1)
+
+def compute_fcf(m, s):
+    v = m.values
+    v['fcf'][..., s:] = v['ebitda'][..., s:] - v['taxes'][..., s:] - v['capex'][..., s:] - v['delta_nwc'][..., s:]
+
+# Line items in dependency order: name -> (inputs, rule)
+LINE_ITEMS = {
+    'revenue': (('rev_growth',), compute_revenue),
+    'ebitda': (('revenue', 'ebitda_margin'), compute_ebitda),
+    'da': (('revenue', 'da_pct'), compute_da),
+    'ebit': (('ebitda', 'da'), compute_ebit),
+    'taxes': (('ebit', 'tax_rate'), compute_taxes),
+    'capex': (('revenue', 'capex_pct'), compute_capex),
+    'nwc': (('revenue', 'nwc_pct'), compute_nwc),
+    'delta_nwc': (('nwc', 'nwc_pct'), compute_delta_nwc),
+    'fcf': (('ebitda', 'taxes', 'capex', 'delta_nwc'), compute_fcf)
+}
+
+class OperatingModel:
+    """Projection engine for revenue through FCF, modelled as a dependency graph.
+
+    The base revenue and the assumptions may be scalars or arrays with
+    leading scenario axes; assumptions may also carry a trailing year
+    axis. Changing an assumption with `update` recomputes only the line
+    items downstream of it, and only from the first year whose value
+    actually changed.
+    """
+
+    def __init__(self, base_revenue, years, **assumptions):
+        self.base_revenue = np.asarray(base_revenue, dtype=float)
+        self.years = years
+        merged = {**DEFAULT_ASSUMPTIONS, **assumptions}
+        arrays = np.broadcast_arrays(np.zeros(self.base_revenue.shape + (years,)), *(self.per_year(v) for v in merged.values()))[1:]
+        self.shape = arrays[0].shape
+        self.assumptions = {name: np.array(a) for name, a in zip(merged, arrays)}
+        self.values = {name: np.zeros(self.shape) for name in LINE_ITEMS}
+        self.recomputed = []
+        self.recompute({name: 0 for name in LINE_ITEMS})
+
+    def per_year(self, value):
+        """Give a value a trailing year axis (length 1 or `years`)."""
+        value = np.asarray(value, dtype=float)
+        if value.ndim == 0 or value.shape[-1] not in (1, self.years):
+            value = value[..., None]
+        return value
+
+    def update(self, **changes):
+        """Change assumptions and recompute only the affected cells."""
+        dirty = {}
+        for name, value in changes.items():
+            new = np.broadcast_to(self.per_year(value), self.shape)
+            changed = np.any(new != self.assumptions[name], axis=tuple(range(new.ndim - 1)))
+            if not changed.any():
+                continue
+            start = int(np.argmax(changed))
+            self.assumptions[name] = np.array(new)
+            for item, (inputs, _) in LINE_ITEMS.items():
+                if name in inputs:
+                    dirty[item] = min(dirty.get(item, start), start)
+        self.recomputed = []
+        self.recompute(dirty)
+        return self
+
+    def recompute(self, dirty):
+        for item, (_, rule) in LINE_ITEMS.items():
+            if item not in dirty:
+                continue
+            start = dirty[item]
+            rule(self, start)
+            self.recomputed.append((item, start))
+            for downstream, (inputs, _) in LINE_ITEMS.items():
+                if item in inputs:
+                    dirty[downstream] = min(dirty.get(downstream, start), start)
+
+    def __getitem__(self, item):
+        return self.values[item]
+
+    def frame(self):
+        """Return a single-scenario projection as a Year-indexed DataFrame."""
+        import pandas as pd
+        return pd.DataFrame(
+            {name: np.asarray(v).reshape(-1, self.years)[0] for name, v in self.values.items()},
+            index=pd.Index(range(1, self.years + 1), name='Year')
+        )
+
+def base_revenue(financials):
+    """Return the latest-period revenue the projections start from, or None."""
+    if financials is None or 'income' not in financials or financials['income'].empty:
+        return None
+    return financials['income'].iloc[0]['revenues']
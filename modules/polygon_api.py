@@ -1,113 +1,377 @@
+import asyncio
+import logging
+import os
+import random
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
 import pandas as pd
-import streamlit as st
+from requests.adapters import HTTPAdapter
+from modules.cache import DiskCache
+from modules import financials_store, instrumentation
 
-# Try to get API key from secrets, fallback to demo if not found
-try:
-    API_KEY = st.secrets["POLYGON_API_KEY"]
-except (KeyError, FileNotFoundError):
-    API_KEY = "DEMO_API_KEY"
-    st.warning("⚠️ Using demo API key. Please add your Polygon.io API key to .streamlit/secrets.toml")
+DEMO_API_KEY = "DEMO_API_KEY"
 
-BASE_URL = "https://api.polygon.io"
+# Resolved on first use, so importing this module has no UI side effects
+API_KEY = os.environ.get("POLYGON_API_KEY")
+
+logger = logging.getLogger(__name__)
+
+def get_api_key():
+    """Return the Polygon API key from the environment or Streamlit secrets, else the demo key."""
+    global API_KEY
+    if API_KEY is None:
+        try:
+            import streamlit as st
+            API_KEY = st.secrets["POLYGON_API_KEY"]
+        except (ImportError, KeyError, FileNotFoundError):
+            API_KEY = DEMO_API_KEY
+    return API_KEY
+
+def notify(level, message):
+    """Log a message, and surface it in the UI when running under Streamlit."""
+    getattr(logger, level)(message)
+    if 'streamlit' in sys.modules:
+        import streamlit as st
+        from streamlit import runtime
+        if runtime.exists():
+            getattr(st, level)(message)
+
+BASE_URL = os.environ.get("POLYGON_BASE_URL", "https://api.polygon.io")
+CACHE_PATH = os.environ.get("POLYGON_CACHE_PATH", os.path.join(".cache", "polygon.sqlite"))
+CACHE_TTL = float(os.environ.get("POLYGON_CACHE_TTL", 6 * 3600))
+TIMEOUT = 10
+
+# One pooled session shared by every request in the process
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+# Created on first use, so importing this module touches no files
+CACHE = None
+STORE = None
+SETUP_LOCK = threading.Lock()
+
+# Requests currently on the wire, so concurrent sessions share one call
+IN_FLIGHT = {}
+IN_FLIGHT_LOCK = threading.Lock()
+
+class RateLimited(Exception):
+    """Raised when Polygon answers 429 and no cached payload is available."""
+
+    def __init__(self, retry_after=None):
+        super().__init__("Rate limited by Polygon.io")
+        self.retry_after = retry_after
+
+def default_cache():
+    """The process-wide response cache at CACHE_PATH, created on first use."""
+    global CACHE
+    with SETUP_LOCK:
+        if CACHE is None:
+            CACHE = DiskCache(CACHE_PATH, ttl=CACHE_TTL)
+        return CACHE
+
+def default_store():
+    """The process-wide financials store, created on first use."""
+    global STORE
+    with SETUP_LOCK:
+        if STORE is None:
+            STORE = financials_store.FinancialsStore()
+        return STORE
+
+def configure(base_url=None, api_key=None, cache_path=None, cache_ttl=None):
+    """Point the data layer at another server, key or cache (e.g. a local stub)."""
+    global BASE_URL, API_KEY, CACHE
+    if base_url is not None:
+        BASE_URL = base_url.rstrip("/")
+    if api_key is not None:
+        API_KEY = api_key
+    if cache_path is not None or cache_ttl is not None:
+        path = cache_path or (CACHE.path if CACHE is not None else CACHE_PATH)
+        CACHE = DiskCache(path, ttl=CACHE_TTL if cache_ttl is None else cache_ttl)
+
+def get_json(ticker, endpoint, path):
+    """GET a Polygon endpoint through the TTL cache.
+
+    Fresh cache entries are served without touching the network; if the
+    request fails, a stale entry is served instead so warm tickers keep
+    working offline. Only successful ('OK') payloads are cached.
+    """
+    cached = default_cache().get(ticker, endpoint)
+    if cached is not None:
+        instrumentation.count('polygon.cache_hit')
+        return cached
+    instrumentation.count('polygon.cache_miss')
+    key = (ticker, endpoint)
+    with IN_FLIGHT_LOCK:
+        waiter = IN_FLIGHT.get(key)
+        if waiter is None:
+            IN_FLIGHT[key] = threading.Event()
+    if waiter is not None:
+        instrumentation.count('polygon.shared_request')
+        waiter.wait(TIMEOUT)
+        cached = default_cache().get(ticker, endpoint, allow_stale=True)
+        if cached is not None:
+            return cached
+        return get_json(ticker, endpoint, path)
+    try:
+        return request_json(ticker, endpoint, path)
+    finally:
+        with IN_FLIGHT_LOCK:
+            IN_FLIGHT.pop(key).set()
+
+def request_json(ticker, endpoint, path):
+    """Hit the network for one endpoint and store successful payloads."""
+    try:
+        with instrumentation.span(f"polygon.{endpoint}", ticker=ticker):
+            response = SESSION.get(f"{BASE_URL}{path}", params={"apiKey": get_api_key()}, timeout=TIMEOUT)
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After")
+            raise RateLimited(float(retry_after) if retry_after else None)
+        data = response.json()
+    except (requests.RequestException, ValueError, RateLimited):
+        stale = default_cache().get(ticker, endpoint, allow_stale=True)
+        if stale is not None:
+            instrumentation.count('polygon.stale_served')
+            return stale
+        raise
+    if data.get('status') == 'OK':
+        default_cache().set(ticker, endpoint, data)
+    return data
+
+ENDPOINTS = {
+    'financials': "/v2/reference/financials/{ticker}",
+    'company_info': "/v3/reference/tickers/{ticker}",
+    'market_data': "/v2/snapshot/locale/us/markets/stocks/tickers/{ticker}"
+}
+# Multi-ticker snapshot, used for live prices rather than cached like the endpoints above
+SNAPSHOTS = "/v2/snapshot/locale/us/markets/stocks/tickers"
+
+def parse_financials(data, ticker=None):
+    """Build the statement DataFrames (plus the normalized history) from a financials payload."""
+    results = data.get('results', [])
+    if ticker is None:
+        ticker = results[0].get('ticker', '') if results else ''
+    history = financials_store.normalize(ticker, results)
+    financials = financials_store.to_financials(history)
+    financials['history'] = history
+    return financials
+
+def parse_company_info(data):
+    results = data.get('results', {})
+    return {
+        'name': results.get('name'),
+        'market_cap': results.get('market_cap'),
+        'description': results.get('description'),
+        'sector': results.get('sic_description')
+    }
+
+def parse_market_data(data):
+    ticker_data = data.get('ticker', {})
+    return {
+        'price': ticker_data.get('lastTrade', {}).get('p'),
+        'volume': ticker_data.get('day', {}).get('v'),
+        'market_cap': ticker_data.get('market_cap')
+    }
+
+def fetch_prices(tickers):
+    """Latest trade price for many tickers in one snapshot request, bypassing the cache.
+
+    Returns {ticker: price}; tickers without a trade are left out.
+    """
+    if get_api_key() == DEMO_API_KEY or not tickers:
+        return {}
+    with instrumentation.span("polygon.snapshots", tickers=len(tickers)):
+        response = SESSION.get(f"{BASE_URL}{SNAPSHOTS}", params={"tickers": ",".join(tickers), "apiKey": get_api_key()},
+                               timeout=TIMEOUT)
+    if response.status_code == 429:
+        retry_after = response.headers.get("Retry-After")
+        raise RateLimited(float(retry_after) if retry_after else None)
+    data = response.json()
+    prices = {}
+    for item in data.get('tickers') or []:
+        price = (item.get('lastTrade') or {}).get('p')
+        if price:
+            prices[item.get('ticker')] = price
+    return prices
 
 def fetch_financials(ticker):
     """Fetch financial statements from Polygon.io."""
-    url = f"{BASE_URL}/v2/reference/financials/{ticker}?apiKey={API_KEY}"
     try:
-        response = requests.get(url)
-        data = response.json()
+        data = get_json(ticker, 'financials', ENDPOINTS['financials'].format(ticker=ticker))
         if data.get('status') == 'OK':
-            financials = data.get('results', [])
-            income_df = pd.DataFrame([{
-                'revenues': f.get('financials', {}).get('income_statement', {}).get('revenues', 0),
-                'operating_expenses': f.get('financials', {}).get('income_statement', {}).get('operating_expenses', 0),
-                'net_income': f.get('financials', {}).get('income_statement', {}).get('net_income_loss', 0)
-            } for f in financials])
-            balance_df = pd.DataFrame([{
-                'total_assets': f.get('financials', {}).get('balance_sheet', {}).get('total_assets', 0),
-                'total_liabilities': f.get('financials', {}).get('balance_sheet', {}).get('total_liabilities', 0),
-                'total_equity': f.get('financials', {}).get('balance_sheet', {}).get('total_equity', 0)
-            } for f in financials])
-            return {'income': income_df, 'balance': balance_df}
+            financials = parse_financials(data, ticker)
+            default_store().write(financials['history'])
+            return financials
     except Exception as e:
-        st.error(f"Error fetching financials: {str(e)}")
+        notify('error', f"Error fetching financials: {str(e)}")
     return {'income': pd.DataFrame(), 'balance': pd.DataFrame()}
 
 def fetch_company_info(ticker):
     """Fetch company information from Polygon.io."""
-    url = f"{BASE_URL}/v3/reference/tickers/{ticker}?apiKey={API_KEY}"
     try:
-        response = requests.get(url)
-        data = response.json()
+        data = get_json(ticker, 'company_info', ENDPOINTS['company_info'].format(ticker=ticker))
         if data.get('status') == 'OK':
-            results = data.get('results', {})
-            return {
-                'name': results.get('name'),
-                'market_cap': results.get('market_cap'),
-                'description': results.get('description')
-            }
+            return parse_company_info(data)
     except Exception as e:
-        st.error(f"Error fetching company info: {str(e)}")
+        notify('error', f"Error fetching company info: {str(e)}")
     return {}
 
 def fetch_market_data(ticker):
     """Fetch current market data from Polygon.io."""
-    url = f"{BASE_URL}/v2/snapshot/locale/us/markets/stocks/tickers/{ticker}?apiKey={API_KEY}"
     try:
-        response = requests.get(url)
-        data = response.json()
+        data = get_json(ticker, 'market_data', ENDPOINTS['market_data'].format(ticker=ticker))
         if data.get('status') == 'OK':
-            ticker_data = data.get('ticker', {})
-            return {
-                'price': ticker_data.get('lastTrade', {}).get('p'),
-                'volume': ticker_data.get('day', {}).get('v'),
-                'market_cap': ticker_data.get('market_cap')
-            }
+            return parse_market_data(data)
     except Exception as e:
-        st.error(f"Error fetching market data: {str(e)}")
+        notify('error', f"Error fetching market data: {str(e)}")
     return {}
 
+def demo_data():
+    """Return sample data for demo purposes."""
+    return {
+        'financials': {
+            'income': pd.DataFrame({
+                'revenues': [100000000],
+                'operating_expenses': [70000000],
+                'net_income': [20000000]
+            }),
+            'balance': pd.DataFrame({
+                'total_assets': [500000000],
+                'total_liabilities': [300000000],
+                'total_equity': [200000000]
+            })
+        },
+        'company_info': {
+            'name': 'Demo Company',
+            'market_cap': 1000000000,
+            'description': 'This is demo data. Please add your Polygon.io API key to use real data.'
+        },
+        'market_data': {
+            'price': 100,
+            'volume': 1000000,
+            'market_cap': 1000000000
+        },
+        'market_cap_ev': {
+            'market_cap': 1000000000,
+            'enterprise_value': 1200000000
+        }
+    }
+
+@instrumentation.timed()
 def fetch_all(ticker):
     """Fetch all relevant data for a given ticker."""
-    if API_KEY == "DEMO_API_KEY":
-        st.warning("Using demo data since no API key is provided")
-        # Return sample data for demo purposes
-        return {
-            'financials': {
-                'income': pd.DataFrame({
-                    'revenues': [100000000],
-                    'operating_expenses': [70000000],
-                    'net_income': [20000000]
-                }),
-                'balance': pd.DataFrame({
-                    'total_assets': [500000000],
-                    'total_liabilities': [300000000],
-                    'total_equity': [200000000]
-                })
-            },
-            'company_info': {
-                'name': 'Demo Company',
-                'market_cap': 1000000000,
-                'description': 'This is demo data. Please add your Polygon.io API key to use real data.'
-            },
-            'market_data': {
-                'price': 100,
-                'volume': 1000000,
-                'market_cap': 1000000000
-            },
-            'market_cap_ev': {
-                'market_cap': 1000000000,
-                'enterprise_value': 1200000000
-            }
-        }
-    
+    if get_api_key() == DEMO_API_KEY:
+        notify('warning', "Using demo data since no API key is provided")
+        return demo_data()
+
+    market_data = fetch_market_data(ticker)
     return {
         'financials': fetch_financials(ticker),
         'company_info': fetch_company_info(ticker),
-        'market_data': fetch_market_data(ticker),
+        'market_data': market_data,
         'market_cap_ev': {
-            'market_cap': fetch_market_data(ticker).get('market_cap', 0),
+            'market_cap': market_data.get('market_cap', 0),
             'enterprise_value': None  # Would need additional calculation
         }
-    } 
\ No newline at end of file
+    } 
+
+PARSERS = {
+    'company_info': parse_company_info,
+    'market_data': parse_market_data
+}
+
+async def fetch_endpoint_async(loop, executor, semaphore, ticker, endpoint, retries, backoff):
+    """Fetch one endpoint, backing off exponentially while rate limited."""
+    path = ENDPOINTS[endpoint].format(ticker=ticker)
+    for attempt in range(retries + 1):
+        async with semaphore:
+            try:
+                data = await loop.run_in_executor(executor, get_json, ticker, endpoint, path)
+                break
+            except RateLimited as e:
+                if attempt == retries:
+                    raise
+                delay = e.retry_after or backoff * 2 ** attempt
+        # Sleep outside the semaphore so other tickers keep the slots busy
+        await asyncio.sleep(delay * (1 + 0.25 * random.random()))
+    if data.get('status') != 'OK':
+        raise ValueError(data.get('error') or data.get('message') or f"status {data.get('status')}")
+    if endpoint == 'financials':
+        return parse_financials(data, ticker)
+    return PARSERS[endpoint](data)
+
+async def fetch_many_async(tickers, concurrency=16, retries=5, backoff=0.5):
+    """Fetch every endpoint for every ticker concurrently.
+
+    Returns {ticker: {endpoint: parsed result or Exception}}.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    tickers = list(dict.fromkeys(tickers))
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        jobs = [(t, e) for t in tickers for e in ENDPOINTS]
+        results = await asyncio.gather(
+            *(fetch_endpoint_async(loop, executor, semaphore, t, e, retries, backoff) for t, e in jobs),
+            return_exceptions=True
+        )
+    out = {t: {} for t in tickers}
+    for (t, e), result in zip(jobs, results):
+        out[t][e] = result
+    return out
+
+@instrumentation.timed()
+def fetch_many(tickers, concurrency=16, retries=5, backoff=0.5):
+    """Fetch financials, company info and market data for many tickers.
+
+    Returns a dict with a 'results' DataFrame (one row per ticker, latest
+    period financials plus company and market fields) and a 'failures'
+    dict of {ticker: {endpoint: error message}} for anything that failed.
+    """
+    if get_api_key() == DEMO_API_KEY:
+        raw = {}
+        demo = demo_data()
+        for t in dict.fromkeys(tickers):
+            raw[t] = {
+                'financials': demo['financials'],
+                'company_info': demo['company_info'],
+                'market_data': demo['market_data']
+            }
+    else:
+        raw = asyncio.run(fetch_many_async(tickers, concurrency, retries, backoff))
+
+    histories = [
+        endpoints['financials']['history'] for endpoints in raw.values()
+        if isinstance(endpoints.get('financials'), dict) and 'history' in endpoints['financials']
+    ]
+    if histories:
+        default_store().write(pd.concat(histories, ignore_index=True))
+
+    rows = []
+    failures = {}
+    for ticker, endpoints in raw.items():
+        row = {'ticker': ticker}
+        for endpoint, result in endpoints.items():
+            if isinstance(result, Exception):
+                failures.setdefault(ticker, {})[endpoint] = str(result)
+            elif endpoint == 'financials':
+                for statement in ('income', 'balance', 'cash_flow'):
+                    if statement in result and not result[statement].empty:
+                        row.update(result[statement].iloc[0].to_dict())
+            elif endpoint == 'company_info':
+                row.update({
+                    'name': result.get('name'),
+                    'sector': result.get('sector'),
+                    'company_market_cap': result.get('market_cap')
+                })
+            else:
+                row.update(result)
+        rows.append(row)
+
+    columns = [
+        'ticker', 'name', 'sector', 'price', 'volume', 'market_cap', 'company_market_cap'
+    ] + [c for c, _, _ in financials_store.SCHEMA]
+    results = pd.DataFrame(rows).reindex(columns=columns).set_index('ticker')
+    numeric = columns[3:]
+    results[numeric] = results[numeric].astype(float)
+    return {'results': results, 'failures': failures}
@@ -0,0 +1,222 @@
+"""Fund-level aggregation of many LBO deals on a common time axis.
+
+Each deal's annual equity cash flows are placed into calendar buckets
+(quarters by default) counted from the fund's start, giving one row per
+deal of contributions, distributions and NAV. Fund metrics are column
+sums over those rows, so changing one deal only rebuilds its own rows
+before re-summing.
+"""
+import numpy as np
+from modules import lbo
+from modules.irr import solve_irr
+
+PERIODS_PER_YEAR = 4
+
+def to_months(dates):
+    """Months since 1970-01 for dates, strings or datetime64 values."""
+    return np.asarray(dates, dtype='datetime64[M]').astype(int)
+
+def pad(cash_flows):
+    """Stack ragged per-deal cash-flow lists into a zero-padded (deals, years + 1) array."""
+    if isinstance(cash_flows, np.ndarray):
+        return np.atleast_2d(cash_flows.astype(float))
+    rows = [np.asarray(cf, dtype=float) for cf in cash_flows]
+    out = np.zeros((len(rows), max((len(r) for r in rows), default=1)))
+    for i, r in enumerate(rows):
+        out[i, :len(r)] = r
+    return out
+
+def deal_cash_flows(revenue, debt_pct, interest_rate, exit_multiple, holding_period, ebitda_margin=lbo.EBITDA_MARGIN,
+                    ebitda_growth=8, entry_multiple=None):
+    """Annual equity cash flows (deals, years + 1) for many deals in one LBO batch.
+
+    Every LBO output is proportional to base revenue, so all deals run
+    together at unit revenue and are scaled by their own `revenue`.
+    Revenue and the assumptions are broadcast against each other first,
+    so any one of them may be the only input that varies per deal.
+    """
+    import pandas as pd
+    if entry_multiple is None:
+        entry_multiple = exit_multiple
+    inputs = [np.asarray(x, dtype=float) for x in (revenue, debt_pct, interest_rate, exit_multiple, holding_period,
+                                                   ebitda_margin, ebitda_growth, entry_multiple)]
+    shape = np.broadcast_shapes(*(x.shape for x in inputs))
+    revenue, *assumptions = (np.broadcast_to(x, shape) for x in inputs)
+    *assumptions, entry_multiple = assumptions
+    unit = {'financials': {'income': pd.DataFrame({'revenues': [1.0]})}}
+    out = lbo.run_batch(unit, *assumptions, entry_multiple=entry_multiple)
+    return np.atleast_2d(out['cash_flows'] * revenue[..., None])
+
+def bucket_deals(entry_month, cash_flows, start_month, months_per_period, n_periods):
+    """Place deals on the fund axis.
+
+    Returns (contributions, distributions, nav), each (deals, n_periods).
+    Year t's flow lands in the period containing entry + 12t months. NAV
+    at a period's end is the deal's remaining flows discounted at its own
+    IRR, i.e. invested equity accreting at the deal's return; deals with
+    no IRR carry their remaining flows undiscounted.
+    """
+    n, years = cash_flows.shape
+    flow_month = entry_month[:, None] + 12 * np.arange(years)
+    period = (flow_month - start_month) // months_per_period
+    index = (np.arange(n)[:, None] * n_periods + period).ravel()
+    size = n * n_periods
+    contributions = np.bincount(index, np.maximum(-cash_flows, 0).ravel(), minlength=size).reshape(n, n_periods)
+    distributions = np.bincount(index, np.maximum(cash_flows, 0).ravel(), minlength=size).reshape(n, n_periods)
+
+    rates, converged = solve_irr(cash_flows)
+    rates = np.where(converged, rates, 0.0)
+    period_end = start_month + (np.arange(n_periods) + 1) * months_per_period
+    # (deals, periods, years): years from each period end to each flow
+    ahead = (flow_month[:, None, :] - period_end[None, :, None]) / 12
+    remaining = ahead >= 0
+    discount = (1 + rates)[:, None, None] ** -np.where(remaining, ahead, 0)
+    nav = np.where(remaining, cash_flows[:, None, :] * discount, 0).sum(axis=2)
+    nav = np.where(entry_month[:, None] < period_end[None, :], nav, 0)
+    return contributions, distributions, nav
+
+def annualize(rates, periods_per_year):
+    with np.errstate(invalid='ignore'):
+        return (1 + rates) ** periods_per_year - 1
+
+class Portfolio:
+    """Deals bucketed onto one fund time axis, with fund-level metrics."""
+
+    def __init__(self, start, periods_per_year=PERIODS_PER_YEAR):
+        if 12 % periods_per_year:
+            raise ValueError("periods_per_year must divide 12")
+        self.start_month = int(to_months(start))
+        self.periods_per_year = periods_per_year
+        self.months_per_period = 12 // periods_per_year
+        self.names = []
+        self.rows = {}
+        self.entry_month = np.zeros(0, dtype=int)
+        self.cash_flows = np.zeros((0, 1))
+        self.contributions = np.zeros((0, 0))
+        self.distributions = np.zeros((0, 0))
+        self.nav = np.zeros((0, 0))
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def n_periods(self):
+        return self.contributions.shape[1]
+
+    def dates(self):
+        """Start date of every period on the fund axis."""
+        months = self.start_month + np.arange(self.n_periods) * self.months_per_period
+        return months.astype('datetime64[M]').astype('datetime64[D]')
+
+    def resize(self, n_periods, years):
+        """Grow the period axis and the cash-flow year axis to fit new deals."""
+        if n_periods > self.n_periods:
+            extra = n_periods - self.n_periods
+            for name in ('contributions', 'distributions', 'nav'):
+                setattr(self, name, np.pad(getattr(self, name), ((0, 0), (0, extra))))
+        if years > self.cash_flows.shape[1]:
+            self.cash_flows = np.pad(self.cash_flows, ((0, 0), (0, years - self.cash_flows.shape[1])))
+
+    def add_deals(self, names, entry_dates, cash_flows):
+        """Add or replace deals from annual equity cash flows (year 0 = entry).
+
+        Only the given deals are bucketed; everything else is left as is.
+        """
+        names = list(names)
+        entry_month = np.broadcast_to(to_months(entry_dates), (len(names),))
+        cash_flows = pad(cash_flows)
+        if (entry_month < self.start_month).any():
+            raise ValueError("Deals cannot enter before the fund start")
+        last = entry_month + 12 * (cash_flows.shape[1] - 1)
+        self.resize(int((last.max() - self.start_month) // self.months_per_period) + 1, cash_flows.shape[1])
+        cash_flows = np.pad(cash_flows, ((0, 0), (0, self.cash_flows.shape[1] - cash_flows.shape[1])))
+
+        new = [n for n in dict.fromkeys(names) if n not in self.rows]
+        if new:
+            for n in new:
+                self.rows[n] = len(self.names)
+                self.names.append(n)
+            grow = ((0, len(new)), (0, 0))
+            self.entry_month = np.pad(self.entry_month, (0, len(new)))
+            for name in ('cash_flows', 'contributions', 'distributions', 'nav'):
+                setattr(self, name, np.pad(getattr(self, name), grow))
+
+        rows = np.array([self.rows[n] for n in names], dtype=int)
+        self.entry_month[rows] = entry_month
+        self.cash_flows[rows] = cash_flows
+        self.contributions[rows], self.distributions[rows], self.nav[rows] = bucket_deals(
+            entry_month, cash_flows, self.start_month, self.months_per_period, self.n_periods)
+
+    def model_deals(self, names, entry_dates, revenue, debt_pct, interest_rate, exit_multiple, holding_period,
+                    ebitda_margin=lbo.EBITDA_MARGIN, ebitda_growth=8, entry_multiple=None):
+        """Run the LBO engine for the given deals only and add or replace them."""
+        names = list(names)
+        # One row per deal even when every input is a scalar
+        revenue = np.broadcast_to(np.asarray(revenue, dtype=float), (len(names),))
+        cash_flows = deal_cash_flows(revenue, debt_pct, interest_rate, exit_multiple, holding_period,
+                                     ebitda_margin, ebitda_growth, entry_multiple)
+        self.add_deals(names, entry_dates, cash_flows.reshape(len(names), -1))
+
+    def remove(self, names):
+        keep = np.ones(len(self.names), dtype=bool)
+        keep[[self.rows[n] for n in names if n in self.rows]] = False
+        self.names = [n for n, k in zip(self.names, keep) if k]
+        self.rows = {n: i for i, n in enumerate(self.names)}
+        for name in ('entry_month', 'cash_flows', 'contributions', 'distributions', 'nav'):
+            setattr(self, name, getattr(self, name)[keep])
+
+    def metrics(self, deals=None):
+        """Fund cash flows and return metrics per period.
+
+        Returns period start dates, contributions, distributions, NAV, the
+        cumulative net cash flow (J-curve), DPI, RVPI, TVPI, the IRR to date
+        (NAV treated as a final distribution) and the fund's final IRR,
+        TVPI and DPI. `deals` limits the aggregation to a subset of names.
+        """
+        rows = slice(None) if deals is None else [self.rows[n] for n in deals]
+        contributions = self.contributions[rows].sum(axis=0)
+        distributions = self.distributions[rows].sum(axis=0)
+        nav = self.nav[rows].sum(axis=0)
+        net = distributions - contributions
+        paid_in = np.cumsum(contributions)
+        distributed = np.cumsum(distributions)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dpi = np.where(paid_in > 0, distributed / paid_in, np.nan)
+            rvpi = np.where(paid_in > 0, nav / paid_in, np.nan)
+
+        # Row p holds net flows up to period p plus that period's NAV
+        n = len(net)
+        to_date = np.tril(np.broadcast_to(net, (n, n)))
+        to_date[np.arange(n), np.arange(n)] += nav
+        rates, converged = solve_irr(to_date)
+        irr_to_date = annualize(np.where(converged, rates, np.nan), self.periods_per_year) * 100
+
+        final_rate, final_converged = solve_irr(net[None, :]) if n else (np.array([np.nan]), np.array([False]))
+        return {
+            'dates': self.dates(),
+            'contributions': contributions,
+            'distributions': distributions,
+            'nav': nav,
+            'net_cash_flow': net,
+            'j_curve': np.cumsum(net),
+            'dpi': dpi,
+            'rvpi': rvpi,
+            'tvpi': dpi + rvpi,
+            'irr_to_date': irr_to_date,
+            'irr': float(annualize(final_rate[0], self.periods_per_year) * 100) if final_converged[0] else None,
+            'final_tvpi': float((distributed[-1] + nav[-1]) / paid_in[-1]) if n and paid_in[-1] > 0 else None,
+            'final_dpi': float(dpi[-1]) if n and paid_in[-1] > 0 else None
+        }
+
+    def deals(self):
+        """One row per deal: entry date, paid-in capital, distributions, IRR and MOIC."""
+        import pandas as pd
+        from modules.irr import solve_moic
+        rates, converged = solve_irr(self.cash_flows) if len(self) else (np.zeros(0), np.zeros(0, dtype=bool))
+        return pd.DataFrame({
+            'entry_date': self.entry_month.astype('datetime64[M]'),
+            'paid_in': self.contributions.sum(axis=1),
+            'distributions': self.distributions.sum(axis=1),
+            'irr': np.where(converged, rates * 100, np.nan),
+            'moic': solve_moic(self.cash_flows) if len(self) else np.zeros(0)
+        }, index=pd.Index(self.names, name='deal'))
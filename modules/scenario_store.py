@@ -0,0 +1,204 @@
+"""Versioned store of valuation scenarios.
+
+Every save appends a version (deal, case name, assumptions and headline
+outputs) to a small Arrow catalog. Year-by-year outputs (FCFs, LBO cash
+flows, debt schedule) go to one compressed Arrow file per distinct input,
+named by a stable hash of the financials and assumptions. Saving the
+same inputs again stores their outputs once, and reloading a version
+reads that file back without rerunning the engines.
+"""
+import os
+import threading
+import numpy as np
+from modules import dcf, lbo
+from modules.memo import stable_hash
+
+STORE_PATH = os.environ.get("SCENARIO_STORE_PATH", os.path.join(".cache", "scenarios"))
+
+ASSUMPTIONS = [
+    'rev_growth', 'ebitda_margin', 'discount_rate', 'exit_multiple', 'exit_year',
+    'debt_pct', 'interest_rate', 'holding_period'
+]
+DCF_SCALARS = ['enterprise_value', 'equity_value', 'terminal_value', 'discounted_terminal']
+LBO_SCALARS = ['purchase_price', 'exit_value', 'equity_invested', 'initial_debt', 'irr', 'moic', 'leverage_ratio']
+HEADLINES = [f"dcf_{n}" for n in DCF_SCALARS] + [f"lbo_{n}" for n in LBO_SCALARS]
+CATALOG = ['id', 'deal', 'name', 'version', 'saved_at', 'input_hash'] + ASSUMPTIONS + HEADLINES
+
+def input_hash(data, assumptions):
+    """Hash of everything the engines read, so equal inputs share stored outputs."""
+    return stable_hash(data.get('financials'), data.get('market_cap_ev'),
+                       {k: float(assumptions[k]) for k in ASSUMPTIONS})
+
+def evaluate(data, assumptions):
+    """Run the (memoized) DCF and LBO engines for one assumption set."""
+    a = assumptions
+    return {
+        'dcf': dcf.run(data, a['rev_growth'], a['ebitda_margin'], a['discount_rate'], a['exit_multiple'],
+                       a['exit_year']),
+        'lbo': lbo.run(data, a['debt_pct'], a['interest_rate'], a['exit_multiple'], a['exit_year'],
+                       a['holding_period'])
+    }
+
+def year_table(outputs):
+    """Pack the per-year outputs into one Arrow table, padding shorter series with nulls."""
+    import pyarrow as pa
+    d, l = outputs['dcf'], outputs['lbo']
+    columns = {'dcf.fcf': d['fcf_list'], 'dcf.discounted_fcfs': d['discounted_fcfs'], 'lbo.cash_flows': l['cash_flows']}
+    for column in l['debt_schedule'].columns:
+        columns[f"lbo.debt_schedule.{column}"] = l['debt_schedule'][column].tolist()
+    n = max(len(v) for v in columns.values())
+    return pa.table({
+        name: pa.array([float(x) for x in values] + [None] * (n - len(values)), type=pa.float64())
+        for name, values in columns.items()
+    })
+
+def scalar(value):
+    return None if value is None or (isinstance(value, float) and np.isnan(value)) else float(value)
+
+class ScenarioStore:
+    """Catalog of saved cases plus content-addressed output files."""
+
+    def __init__(self, root=STORE_PATH):
+        self.root = root
+        self.lock = threading.Lock()
+        self.catalog = None
+        self.catalog_mtime = None
+        os.makedirs(os.path.join(root, "outputs"), exist_ok=True)
+
+    @property
+    def catalog_path(self):
+        return os.path.join(self.root, "catalog.arrow")
+
+    def output_path(self, digest):
+        return os.path.join(self.root, "outputs", f"{digest}.arrow")
+
+    def read_catalog(self):
+        """Return the catalog DataFrame, re-reading it only when the file changed."""
+        import pandas as pd
+        import pyarrow.feather as feather
+        mtime = os.path.getmtime(self.catalog_path) if os.path.exists(self.catalog_path) else None
+        if self.catalog is None or mtime != self.catalog_mtime:
+            self.catalog = feather.read_table(self.catalog_path).to_pandas() if mtime else pd.DataFrame(columns=CATALOG)
+            self.catalog_mtime = mtime
+        return self.catalog
+
+    def write_catalog(self, df):
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        tmp = self.catalog_path + ".tmp"
+        feather.write_feather(pa.Table.from_pandas(df, preserve_index=False).combine_chunks(), tmp, compression='zstd')
+        os.replace(tmp, self.catalog_path)
+        self.catalog = df
+        self.catalog_mtime = os.path.getmtime(self.catalog_path)
+
+    def save(self, deal, name, data, assumptions, outputs=None):
+        """Save a case as a new version and return its catalog row as a dict.
+
+        `outputs` defaults to running the memoized engines. If outputs for
+        the same inputs are already stored, they are reused and nothing is
+        recomputed or rewritten; the returned row has `deduplicated` set.
+        """
+        import pandas as pd
+        import pyarrow.feather as feather
+        digest = input_hash(data, assumptions)
+        with self.lock:
+            catalog = self.read_catalog()
+            earlier = catalog[catalog['input_hash'] == digest]
+            deduplicated = len(earlier) > 0 and os.path.exists(self.output_path(digest))
+            if not deduplicated:
+                outputs = outputs or evaluate(data, assumptions)
+                if not outputs['dcf'] or not outputs['lbo']:
+                    raise ValueError("No model outputs to save; fetch data first")
+                tmp = self.output_path(digest) + ".tmp"
+                feather.write_feather(year_table(outputs), tmp, compression='zstd')
+                os.replace(tmp, self.output_path(digest))
+
+            previous = catalog[(catalog['deal'] == deal) & (catalog['name'] == name)]
+            row = {
+                'id': int(catalog['id'].max()) + 1 if len(catalog) else 1,
+                'deal': deal,
+                'name': name,
+                'version': int(previous['version'].max()) + 1 if len(previous) else 1,
+                'saved_at': pd.Timestamp.now(tz='UTC').floor('s'),
+                'input_hash': digest,
+                **{k: float(assumptions[k]) for k in ASSUMPTIONS}
+            }
+            if deduplicated:
+                # Headline outputs depend only on the inputs, so copy them from the earlier version
+                row.update(earlier.iloc[-1][HEADLINES].to_dict())
+            else:
+                row.update({f"dcf_{n}": scalar(outputs['dcf'][n]) for n in DCF_SCALARS})
+                row.update({f"lbo_{n}": scalar(outputs['lbo'][n]) for n in LBO_SCALARS})
+            new = pd.DataFrame([row], columns=CATALOG)
+            self.write_catalog(new if catalog.empty else pd.concat([catalog, new], ignore_index=True))
+        return {**row, 'deduplicated': deduplicated}
+
+    def list(self, deal=None, name=None):
+        """Saved versions, newest first, optionally for one deal and case name."""
+        catalog = self.read_catalog()
+        if deal is not None:
+            catalog = catalog[catalog['deal'] == deal]
+        if name is not None:
+            catalog = catalog[catalog['name'] == name]
+        return catalog.sort_values('id', ascending=False).set_index('id')
+
+    def load(self, version_id):
+        """Return a saved version's assumptions and engine-shaped outputs, without recomputing."""
+        import pandas as pd
+        import pyarrow.feather as feather
+        catalog = self.read_catalog()
+        matches = catalog[catalog['id'] == version_id]
+        if matches.empty:
+            raise KeyError(f"No saved scenario with id {version_id}")
+        row = matches.iloc[0]
+        years = feather.read_table(self.output_path(row['input_hash'])).to_pandas()
+
+        def series(column):
+            return years[column].dropna().tolist()
+
+        schedule = pd.DataFrame({
+            c[len("lbo.debt_schedule."):]: years[c].dropna().to_numpy()
+            for c in years.columns if c.startswith("lbo.debt_schedule.")
+        })
+        if 'Year' in schedule:
+            schedule['Year'] = schedule['Year'].astype(int)
+        dcf_outputs = {n: row[f"dcf_{n}"] for n in DCF_SCALARS}
+        dcf_outputs.update({
+            'fcf_list': series('dcf.fcf'), 'discounted_fcfs': series('dcf.discounted_fcfs'),
+            'fair_value_per_share': None, 'intrinsic_vs_market_gap': None
+        })
+        lbo_outputs = {n: scalar(row[f"lbo_{n}"]) for n in LBO_SCALARS}
+        lbo_outputs.update({'cash_flows': series('lbo.cash_flows'), 'debt_schedule': schedule})
+        assumptions = {k: row[k] for k in ASSUMPTIONS}
+        for k in ('exit_year', 'holding_period'):
+            assumptions[k] = int(assumptions[k])
+        return {
+            'id': int(row['id']), 'deal': row['deal'], 'name': row['name'], 'version': int(row['version']),
+            'saved_at': row['saved_at'], 'assumptions': assumptions, 'dcf': dcf_outputs, 'lbo': lbo_outputs
+        }
+
+    def compare(self, version_ids):
+        """Assumptions and headline outputs of several versions side by side."""
+        catalog = self.read_catalog().set_index('id')
+        rows = catalog.loc[list(version_ids)]
+        table = rows[ASSUMPTIONS + HEADLINES].T.astype(float)
+        table.columns = [f"{r['name']} v{r['version']} (#{i})" for i, r in rows.iterrows()]
+        return table
+
+    def diff(self, a, b, changed_only=True):
+        """Compare two versions: both values plus the change from `a` to `b`."""
+        table = self.compare([a, b])
+        table['change'] = table.iloc[:, 1] - table.iloc[:, 0]
+        if changed_only:
+            first, second = table.iloc[:, 0], table.iloc[:, 1]
+            table = table[~np.isclose(first, second, equal_nan=True)]
+        return table
+
+STORE = None
+
+def default_store():
+    """The process-wide store at STORE_PATH, created on first use."""
+    global STORE
+    if STORE is None:
+        STORE = ScenarioStore()
+    return STORE
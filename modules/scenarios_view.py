@@ -0,0 +1,37 @@
+import streamlit as st
+from modules import dcf_view, lbo_view, scenario_store
+
+def display(deal, data, assumptions):
+    """Save the current case, browse and diff saved versions, and reload one without recomputing."""
+    store = scenario_store.default_store()
+    col1, col2 = st.columns([3, 1])
+    name = col1.text_input("Case name", value="Base")
+    if col2.button("Save case", disabled=not data):
+        saved = store.save(deal, name, data, assumptions)
+        note = " (same inputs as an earlier version, outputs reused)" if saved['deduplicated'] else ""
+        st.success(f"Saved {deal} / {name} v{saved['version']}{note}")
+
+    versions = store.list(deal=deal)
+    if versions.empty:
+        st.info(f"No saved cases for {deal} yet.")
+        return
+    st.dataframe(
+        versions[['name', 'version', 'saved_at'] + scenario_store.ASSUMPTIONS + ['dcf_enterprise_value', 'lbo_irr', 'lbo_moic']],
+        use_container_width=True
+    )
+
+    labels = {i: f"#{i} {r['name']} v{r['version']}" for i, r in versions.iterrows()}
+    st.subheader("Compare")
+    chosen = st.multiselect("Versions", list(labels), default=list(labels)[:2], format_func=labels.get)
+    if len(chosen) == 2:
+        st.dataframe(store.diff(chosen[1], chosen[0]).style.format("{:,.2f}"), use_container_width=True)
+    elif len(chosen) > 2:
+        st.dataframe(store.compare(chosen).style.format("{:,.2f}"), use_container_width=True)
+
+    st.subheader("Reload")
+    version_id = st.selectbox("Saved version", list(labels), format_func=labels.get)
+    loaded = store.load(version_id)
+    st.caption(", ".join(f"{k} = {v:g}" for k, v in loaded['assumptions'].items()))
+    dcf_view.display(loaded['dcf'])
+    lbo_view.display(loaded['lbo'])
+    lbo_view.display_debt_schedule(loaded['lbo'])
@@ -0,0 +1,82 @@
+import numpy as np
+from modules import dcf, lbo
+from modules.memo import memoize
+from modules.instrumentation import timed
+
+ENGINES = {
+    'dcf': dcf.run_batch,
+    'lbo': lbo.run_batch
+}
+
+AXIS_LABELS = {
+    'debt_pct': "Debt %",
+    'interest_rate': "Interest Rate (%)",
+    'exit_multiple': "Exit Multiple",
+    'holding_period': "Holding Period",
+    'ebitda_margin': "EBITDA Margin (%)",
+    'ebitda_growth': "EBITDA Growth (%)",
+    'rev_growth': "Revenue Growth (%)",
+    'discount_rate': "Discount Rate (%)",
+    'exit_year': "Exit Year"
+}
+
+@memoize(maxsize=256)
+@timed()
+def build_grid(engine, data, base, axes, metric):
+    """Evaluate an engine once over the outer product of the given axes.
+
+    `axes` is an ordered list of (assumption, values) pairs; the remaining
+    assumptions are taken from `base`. Returns the metric as an ndarray
+    with one dimension per axis.
+    """
+    run_batch = ENGINES[engine]
+    kwargs = dict(base)
+    n_axes = len(axes)
+    for i, (name, values) in enumerate(axes):
+        shape = [1] * n_axes
+        shape[i] = -1
+        kwargs[name] = np.asarray(values, dtype=float).reshape(shape)
+    outputs = run_batch(data, **kwargs)
+    if outputs is None:
+        return None
+    values = outputs[metric]
+    # Broadcast in case the chosen axes do not affect the metric
+    return np.broadcast_to(values, tuple(len(v) for _, v in axes))
+
+def table(engine, data, base, rows, cols, metric):
+    """Build a labeled 2-D sensitivity table as a DataFrame."""
+    import pandas as pd
+    (row_name, row_values), (col_name, col_values) = rows, cols
+    values = build_grid(engine, data, base, [rows, cols], metric)
+    if values is None:
+        return pd.DataFrame()
+    return pd.DataFrame(
+        values,
+        index=pd.Index(row_values, name=row_name),
+        columns=pd.Index(col_values, name=col_name)
+    )
+
+def cube(engine, data, base, axes, metric):
+    """Build a labeled 3-D (or higher) sensitivity table.
+
+    The last axis becomes the columns and the others a MultiIndex.
+    """
+    import pandas as pd
+    values = build_grid(engine, data, base, axes, metric)
+    if values is None:
+        return pd.DataFrame()
+    index = pd.MultiIndex.from_product([v for _, v in axes[:-1]], names=[n for n, _ in axes[:-1]])
+    col_name, col_values = axes[-1]
+    return pd.DataFrame(
+        values.reshape(len(index), len(col_values)),
+        index=index,
+        columns=pd.Index(col_values, name=col_name)
+    )
+
+def lbo_irr_table(data, base, exit_multiples, debt_pcts):
+    """IRR over exit multiple x debt %."""
+    return table('lbo', data, base, ('exit_multiple', exit_multiples), ('debt_pct', debt_pcts), 'irr')
+
+def dcf_ev_table(data, base, discount_rates, rev_growths):
+    """Enterprise value over discount rate x revenue growth."""
+    return table('dcf', data, base, ('discount_rate', discount_rates), ('rev_growth', rev_growths), 'enterprise_value')
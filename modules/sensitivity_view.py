@@ -0,0 +1,41 @@
+import numpy as np
+import streamlit as st
+import plotly.graph_objs as go
+from modules import charts, sensitivity
+from modules.memo import memoize
+
+@memoize(maxsize=64)
+def build_heatmap(df, title, fmt):
+    """Build a sensitivity heatmap from a table with named axes."""
+    x_label, y_label = sensitivity.AXIS_LABELS[df.columns.name], sensitivity.AXIS_LABELS[df.index.name]
+    return charts.figure([go.Heatmap(
+        z=df.values,
+        x=np.round(df.columns.values, 2),
+        y=np.round(df.index.values, 2),
+        colorscale="Viridis",
+        hovertemplate=f"{x_label}: %{{x}}<br>{y_label}: %{{y}}<br>Value: %{{z:{fmt}}}<extra></extra>"
+    )], title=title, xaxis_title=x_label, yaxis_title=y_label)
+
+def display(data, dcf_base, lbo_base):
+    """Display sensitivity heatmaps in Streamlit."""
+    st.subheader("Sensitivity Tables")
+    col1, col2 = st.columns(2)
+    with col1:
+        steps = st.slider("Grid Size", 5, 50, 11)
+    with col2:
+        spread = st.slider("Range (± % of base)", 10, 100, 50)
+
+    def around(value):
+        return np.linspace(value * (1 - spread / 100), value * (1 + spread / 100), steps)
+
+    irr = sensitivity.lbo_irr_table(data, lbo_base, around(lbo_base['exit_multiple']), np.linspace(0, 90, steps))
+    ev = sensitivity.dcf_ev_table(data, dcf_base, around(dcf_base['discount_rate']), around(max(dcf_base['rev_growth'], 1)))
+
+    for df, title, fmt in [
+        (irr, "LBO IRR (%)", ".1f"),
+        (ev, "DCF Enterprise Value ($)", ",.0f")
+    ]:
+        if df.empty:
+            continue
+        fig = build_heatmap(df, title, fmt)
+        st.plotly_chart(fig, use_container_width=True)
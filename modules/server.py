@@ -0,0 +1,436 @@
+"""Local HTTP/JSON service for the DCF, LBO and growth models.
+
+Standard library only (asyncio for HTTP, a thread or process pool for
+compute):
+
+    python -m modules.server --port 8765 --workers 4
+
+    POST /dcf     {"revenue": 1e9, "rev_growth": 8, "discount_rate": 10, ...}
+    POST /lbo     {"ticker": "AAPL", "debt_pct": 60, "holding_period": 5, ...}
+    POST /growth  {"base_value": 100, "years": 5, "rate": 8}
+    GET  /health, /stats (JSON latency per endpoint), /metrics (Prometheus)
+
+A POST body is one request object or a list of them. Requests are queued
+per endpoint; whatever has queued up by the time a worker is free (plus
+up to `max_wait` while the endpoint is busy) is valued in one vectorized
+engine call on the worker pool, so the event loop only parses and routes. Every engine output is proportional to base revenue, so
+requests for different companies share a batch: the engines run at unit
+revenue and each result is scaled by its own revenue. `ticker` looks up
+revenue in the local financials store; nothing is fetched from the network.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+import numpy as np
+from modules import instrumentation
+from modules.batch import DEFAULTS
+from modules.lbo import EBITDA_MARGIN
+
+HOST = "127.0.0.1"
+PORT = 8765
+MAX_BATCH = 512
+MAX_WAIT = 0.002
+MAX_BODY = 4 * 1024 * 1024
+MAX_YEARS = 30
+
+DCF_FIELDS = {name: DEFAULTS[name] for name in ('rev_growth', 'ebitda_margin', 'discount_rate', 'exit_multiple',
+                                                 'exit_year')}
+# The LBO margin follows lbo.run / lbo.run_batch rather than the DCF sidebar default
+LBO_FIELDS = {**{name: DEFAULTS[name] for name in ('debt_pct', 'interest_rate', 'exit_multiple', 'holding_period',
+                                                    'ebitda_growth')},
+              'ebitda_margin': EBITDA_MARGIN, 'entry_multiple': None}
+COMPANY_FIELDS = ('revenue', 'ticker', 'market_cap', 'enterprise_value')
+GROWTH_FIELDS = {'base_value': None, 'years': 5, 'rate': DEFAULTS['ebitda_growth'], 'vol': 0.0, 'n_paths': 1000,
+                 'persistence': 0.0, 'seed': None}
+INTEGERS = ('exit_year', 'holding_period', 'years', 'n_paths', 'seed')
+
+logger = logging.getLogger(__name__)
+
+def number(name, value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not np.isfinite(value):
+        raise ValueError(f"'{name}' must be a finite number")
+    if name in INTEGERS:
+        if value != int(value):
+            raise ValueError(f"'{name}' must be a whole number")
+        return int(value)
+    return float(value)
+
+def parse(endpoint, item):
+    """Validate one request object and fill in defaults; raises ValueError."""
+    if not isinstance(item, dict):
+        raise ValueError("Each request must be a JSON object")
+    fields = {'dcf': {**DCF_FIELDS, **dict.fromkeys(COMPANY_FIELDS)},
+              'lbo': {**LBO_FIELDS, **dict.fromkeys(COMPANY_FIELDS)},
+              'growth': GROWTH_FIELDS}[endpoint]
+    unknown = set(item) - set(fields)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    out = dict(fields)
+    for name, value in item.items():
+        if value is None:
+            continue
+        if name == 'ticker':
+            if not isinstance(value, str) or not value.strip():
+                raise ValueError("'ticker' must be a non-empty string")
+            out[name] = value.strip().upper()
+        elif name == 'rate' and isinstance(value, list):
+            out[name] = [number(name, v) for v in value]
+        else:
+            out[name] = number(name, value)
+
+    if endpoint == 'growth':
+        if out['base_value'] is None:
+            raise ValueError("'base_value' is required")
+        if not 1 <= out['years'] <= MAX_YEARS:
+            raise ValueError(f"'years' must be between 1 and {MAX_YEARS}")
+        if isinstance(out['rate'], list) and len(out['rate']) != out['years']:
+            raise ValueError("'rate' must be a number or a list with one rate per year")
+        if not 1 <= out['n_paths'] <= 100000:
+            raise ValueError("'n_paths' must be between 1 and 100000")
+        return out
+
+    if out['revenue'] is None and out['ticker'] is None:
+        raise ValueError("Either 'revenue' or 'ticker' is required")
+    horizon = 'exit_year' if endpoint == 'dcf' else 'holding_period'
+    if not 1 <= out[horizon] <= MAX_YEARS:
+        raise ValueError(f"'{horizon}' must be between 1 and {MAX_YEARS}")
+    if endpoint == 'lbo' and out['entry_multiple'] is None:
+        out['entry_multiple'] = out['exit_multiple']
+    return out
+
+def resolve_revenue(items):
+    """Base revenue per request, from the request itself or the local financials store.
+
+    Returns (revenue array, error per item or None).
+    """
+    from modules.financials_store import FinancialsStore
+    from modules.operating_model import base_revenue
+    store = None
+    found = {}
+    revenue = np.full(len(items), np.nan)
+    errors = [None] * len(items)
+    for i, item in enumerate(items):
+        if item['revenue'] is not None:
+            revenue[i] = item['revenue']
+            continue
+        ticker = item['ticker']
+        if ticker not in found:
+            store = store or FinancialsStore()
+            found[ticker] = base_revenue(store.financials(ticker))
+        if found[ticker] is None:
+            errors[i] = f"No stored financials for {ticker}"
+        else:
+            revenue[i] = found[ticker]
+    return revenue, errors
+
+def unit_data():
+    import pandas as pd
+    return {'financials': {'income': pd.DataFrame({'revenues': [1.0]})}}
+
+def clean(values):
+    """JSON-safe list or scalar: NaN and inf become None."""
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 0:
+        return float(values) if np.isfinite(values) else None
+    return [float(v) if np.isfinite(v) else None for v in values]
+
+def batch_dcf(items):
+    """Value many DCF requests in one `dcf.run_batch` call."""
+    from modules import dcf
+    revenue, errors = resolve_revenue(items)
+    results = list(errors)
+    ok = [i for i, e in enumerate(errors) if e is None]
+    if not ok:
+        return [{'error': e} for e in results]
+    columns = {name: np.array([items[i][name] for i in ok], dtype=float) for name in DCF_FIELDS}
+    out = dcf.run_batch(unit_data(), **columns)
+    scale = revenue[ok]
+    for row, i in enumerate(ok):
+        item, s = items[i], scale[row]
+        years = item['exit_year']
+        net_debt = item['enterprise_value'] - item['market_cap'] if item['enterprise_value'] and item['market_cap'] \
+            else 0.0
+        enterprise_value = out['enterprise_value'][row] * s
+        results[i] = {
+            'enterprise_value': clean(enterprise_value),
+            'equity_value': clean(enterprise_value - net_debt),
+            'terminal_value': clean(out['terminal_value'][row] * s),
+            'discounted_terminal': clean(out['discounted_terminal'][row] * s),
+            'fcf': clean(out['fcf'][row, :years] * s),
+            'discounted_fcfs': clean(out['discounted_fcfs'][row, :years] * s)
+        }
+    return [r if isinstance(r, dict) else {'error': r} for r in results]
+
+def batch_lbo(items):
+    """Value many LBO requests in one `lbo.run_batch` call."""
+    from modules import lbo
+    revenue, errors = resolve_revenue(items)
+    results = list(errors)
+    ok = [i for i, e in enumerate(errors) if e is None]
+    if not ok:
+        return [{'error': e} for e in results]
+    columns = {name: np.array([items[i][name] for i in ok], dtype=float) for name in LBO_FIELDS}
+    out = lbo.run_batch(unit_data(), **columns)
+    scale = revenue[ok]
+    for row, i in enumerate(ok):
+        s, years = scale[row], items[i]['holding_period']
+        results[i] = {
+            **{name: clean(out[name][row] * s)
+               for name in ('purchase_price', 'exit_value', 'equity_invested', 'initial_debt')},
+            'irr': clean(out['irr'][row]) if out['irr_converged'][row] else None,
+            'moic': clean(out['moic'][row]),
+            'leverage_ratio': clean(out['leverage_ratio'][row]),
+            'cash_flows': clean(out['cash_flows'][row, :years + 1] * s),
+            'dscr': clean(out['dscr'][row, :years])
+        }
+    return [r if isinstance(r, dict) else {'error': r} for r in results]
+
+def batch_growth(items):
+    """Deterministic paths in one stacked call; stochastic requests return percentile bands."""
+    from modules import growth_simulator
+    results = [None] * len(items)
+    fixed = [i for i, item in enumerate(items) if not item['vol']]
+    if fixed:
+        width = max(items[i]['years'] for i in fixed)
+        rates = np.zeros((len(fixed), width))
+        for row, i in enumerate(fixed):
+            rates[row, :items[i]['years']] = items[i]['rate']
+        paths = growth_simulator.growth_paths([items[i]['base_value'] for i in fixed], rates)
+        for row, i in enumerate(fixed):
+            results[i] = {'path': clean(paths[row, :items[i]['years'] + 1])}
+    for i, item in enumerate(items):
+        if item['vol']:
+            mean = np.asarray(item['rate'], dtype=float)
+            paths = growth_simulator.growth_paths(item['base_value'], growth_simulator.rate_paths(
+                mean, item['vol'], item['years'], item['n_paths'], item['persistence'], item['seed']))
+            results[i] = {'bands': {str(p): clean(v) for p, v in growth_simulator.percentile_bands(paths).items()}}
+    return results
+
+ENDPOINTS = {'dcf': batch_dcf, 'lbo': batch_lbo, 'growth': batch_growth}
+# Run once per endpoint at startup so engine imports don't land on the first real request
+WARMUP = {'dcf': {'revenue': 1.0}, 'lbo': {'revenue': 1.0}, 'growth': {'base_value': 1.0}}
+
+class Batcher:
+    """Queue of pending requests for one endpoint, flushed to the pool in batches."""
+
+    def __init__(self, name, compute, executor, slots, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        self.name = name
+        self.compute = compute
+        self.executor = executor
+        self.slots = slots
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.running = 0
+        self.task = None
+
+    def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((item, future))
+        return future
+
+    async def run(self):
+        """Collect a batch and hand it to a free worker.
+
+        While another batch of this endpoint is computing, wait up to
+        `max_wait` for more requests to join; an idle endpoint sends a lone
+        request straight away.
+        """
+        while True:
+            batch = [await self.queue.get()]
+            if self.max_wait and self.running and self.queue.qsize() < self.max_batch:
+                await asyncio.sleep(self.max_wait)
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            await self.slots.acquire()
+            asyncio.create_task(self.execute(batch))
+
+    async def execute(self, batch):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        self.running += 1
+        try:
+            results = await loop.run_in_executor(self.executor, self.compute, [item for item, _ in batch])
+        except Exception as e:
+            logger.exception("%s batch of %d failed", self.name, len(batch))
+            results = [e] * len(batch)
+        finally:
+            self.running -= 1
+            self.slots.release()
+        instrumentation.observe(f"server.{self.name}.batch", time.perf_counter() - start, size=len(batch))
+        instrumentation.count(f"server.{self.name}.batches")
+        instrumentation.count(f"server.{self.name}.requests", len(batch))
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+class Server:
+    """HTTP/1.1 front end: parses requests, routes them to batchers and writes JSON responses."""
+
+    def __init__(self, workers=None, processes=False, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        workers = workers or min(4, os.cpu_count() or 1)
+        self.executor = ProcessPoolExecutor(workers) if processes else ThreadPoolExecutor(workers)
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batchers = {}
+        self.server = None
+
+    async def start(self, host=HOST, port=PORT):
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, compute, [parse(name, WARMUP[name])])
+                               for name, compute in ENDPOINTS.items()))
+        slots = asyncio.Semaphore(self.workers)
+        for name, compute in ENDPOINTS.items():
+            batcher = Batcher(name, compute, self.executor, slots, self.max_batch, self.max_wait)
+            batcher.task = asyncio.create_task(batcher.run())
+            self.batchers[name] = batcher
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for batcher in self.batchers.values():
+            batcher.task.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def handle(self, reader, writer):
+        """Serve one keep-alive connection."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, target, version = line.decode('latin-1').split()
+                except ValueError:
+                    await self.respond(writer, HTTPStatus.BAD_REQUEST, {'error': "Malformed request line"}, False)
+                    break
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = header.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get('content-length') or 0)
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    await self.respond(writer, HTTPStatus.BAD_REQUEST, {'error': "Malformed Content-Length"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self.respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': "Body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                status, payload = await self.dispatch(method, target.split('?', 1)[0], body)
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload, allow_nan=False).encode(), "application/json"
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def dispatch(self, method, path, body):
+        """Return (status, payload) for one request and record its latency."""
+        endpoint = path.strip('/')
+        start = time.perf_counter()
+        if method == 'GET' and endpoint in ('health', 'stats', 'metrics'):
+            return HTTPStatus.OK, self.info(endpoint)
+        if endpoint not in ENDPOINTS:
+            return HTTPStatus.NOT_FOUND, {'error': f"Unknown endpoint {path}"}
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': "Use POST"}
+        try:
+            request = json.loads(body or b'null')
+            many = isinstance(request, list)
+            items = [parse(endpoint, item) for item in (request if many else [request])]
+            if not items:
+                raise ValueError("Empty request list")
+        except ValueError as e:
+            instrumentation.count(f"server.{endpoint}.rejected")
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        batcher = self.batchers[endpoint]
+        try:
+            results = await asyncio.gather(*(batcher.submit(item) for item in items))
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+        finally:
+            instrumentation.observe(f"server.{endpoint}", time.perf_counter() - start)
+        if not many and 'error' in results[0]:
+            return HTTPStatus.UNPROCESSABLE_ENTITY, results[0]
+        return HTTPStatus.OK, results if many else results[0]
+
+    def info(self, endpoint):
+        if endpoint == 'metrics':
+            return instrumentation.prometheus_text()
+        if endpoint == 'health':
+            return {'status': 'ok', 'workers': self.workers, 'endpoints': sorted(ENDPOINTS)}
+        stages, counters = instrumentation.snapshot()
+        return {
+            'stages': {
+                name: {k: (v if np.isfinite(v) else None) for k, v in s.items() if k != 'recent_ms'}
+                for name, s in stages.items() if name.startswith('server.')
+            },
+            'counters': {name: v for name, v in counters.items() if name.startswith('server.')}
+        }
+
+async def serve(host=HOST, port=PORT, **options):
+    server = Server(**options)
+    await server.start(host, port)
+    logger.info("Serving %s on http://%s:%d with %d workers", ", ".join(f"/{e}" for e in ENDPOINTS), host,
+                server.port, server.workers)
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the DCF, LBO and growth models over local HTTP/JSON.")
+    parser.add_argument('--host', default=HOST, help="Interface to bind (default: localhost only)")
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Compute workers (default: up to 4)")
+    parser.add_argument('--processes', action='store_true', help="Use worker processes instead of threads")
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH, help="Most requests per engine call")
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT * 1000,
+                        help="How long to hold a request for others to batch with")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    # Latency and batch counters are the point of a service, so record them
+    instrumentation.enable()
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers, processes=args.processes,
+                          max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
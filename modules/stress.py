@@ -0,0 +1,250 @@
+"""Macro stress tests for a book of LBO deals.
+
+Every deal is re-run under every named shock set in one vectorized pass
+over a deal x shock x year grid. Entry terms (purchase price, debt and
+equity) stay as underwritten; shocks hit what happens after closing:
+
+- rate_bp:        basis points added to the interest rate on the debt
+- exit_multiple:  turns added to the exit EV/EBITDA multiple
+- ebitda_pct:     % change to projected EBITDA in every year
+- growth_pct:     percentage points added to annual EBITDA growth
+
+Each deal x shock cell is checked against DSCR, leverage and IRR
+hurdles. Large books can be split into shards of deals run in worker
+processes:
+
+    python -m modules.stress book.csv -o stress.parquet --processes 8
+"""
+import argparse
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from modules.batch import DEFAULTS, read_table
+from modules.instrumentation import count, timed
+from modules.irr import solve_irr, solve_moic
+from modules.lbo import LBO_TAX_RATE, calculate_debt_schedule_batch, calculate_dscr
+from modules.operating_model import OperatingModel
+
+SHOCK_FIELDS = ('rate_bp', 'exit_multiple', 'ebitda_pct', 'growth_pct')
+
+SHOCKS = {
+    'base': {},
+    'rates +300bp': {'rate_bp': 300},
+    'exit -2x': {'exit_multiple': -2},
+    'ebitda -20%': {'ebitda_pct': -20},
+    'combined': {'rate_bp': 300, 'exit_multiple': -2, 'ebitda_pct': -20}
+}
+
+HURDLES = {'min_dscr': 1.25, 'max_leverage': 6.0, 'min_irr': 15.0}
+
+# Deal columns read from the book; missing ones take the batch defaults
+DEAL_COLUMNS = ['revenues', 'debt_pct', 'interest_rate', 'exit_multiple', 'entry_multiple', 'holding_period',
+                'ebitda_margin', 'ebitda_growth']
+
+SHARD_SIZE = 20000
+
+logger = logging.getLogger(__name__)
+
+def shock_arrays(shocks):
+    """Turn {name: {field: value}} into one array per shock field, in name order."""
+    for name, shock in shocks.items():
+        unknown = set(shock) - set(SHOCK_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown shock field(s) in {name!r}: {', '.join(sorted(unknown))}")
+    return {field: np.array([float(s.get(field, 0)) for s in shocks.values()]) for field in SHOCK_FIELDS}
+
+@timed()
+def stress(deals, shocks, max_years, min_dscr=HURDLES['min_dscr'], max_leverage=HURDLES['max_leverage'],
+           min_irr=HURDLES['min_irr'], detail=True):
+    """Run every deal under every shock.
+
+    `deals` maps DEAL_COLUMNS to (deals,) arrays and `shocks` maps
+    SHOCK_FIELDS to (shocks,) arrays. Per-year outputs are
+    (deals, shocks, max_years), with NaN after a deal's holding period,
+    and are left out when `detail` is False; everything else is
+    (deals, shocks).
+    """
+    d = {name: np.asarray(deals[name], dtype=float)[:, None] for name in DEAL_COLUMNS}
+    s = {name: np.asarray(shocks[name], dtype=float)[None, :] for name in SHOCK_FIELDS}
+    shape = np.broadcast_shapes(d['revenues'].shape, s['rate_bp'].shape)
+    count('stress.scenarios', shape[0] * shape[1])
+
+    # Entry as underwritten, identical across shocks
+    entry_ebitda = d['revenues'] * d['ebitda_margin'] / 100
+    purchase_price = np.broadcast_to(entry_ebitda * d['entry_multiple'], shape)
+    equity_invested = purchase_price * (1 - d['debt_pct'] / 100)
+
+    model = OperatingModel(
+        d['revenues'], max_years,
+        rev_growth=(d['ebitda_growth'] + s['growth_pct'])[..., None],
+        ebitda_margin=(d['ebitda_margin'] * (1 + s['ebitda_pct'] / 100))[..., None],
+        tax_rate=LBO_TAX_RATE
+    )
+    ebitda, fcf = model['ebitda'], model['fcf']
+    holding_period = np.broadcast_to(d['holding_period'], shape)
+    interest_rate = d['interest_rate'] + s['rate_bp'] / 100
+    schedule = {
+        name: values.reshape(shape + (max_years,))
+        for name, values in calculate_debt_schedule_batch(
+            purchase_price, np.broadcast_to(d['debt_pct'], shape), np.broadcast_to(interest_rate, shape),
+            holding_period, max_years).items()
+    }
+
+    years = np.arange(1, max_years + 1)
+    in_term = years <= holding_period[..., None]
+    exit_index = holding_period.astype(int)[..., None] - 1
+    exit_value = np.take_along_axis(ebitda, exit_index, axis=-1)[..., 0] * (d['exit_multiple'] + s['exit_multiple'])
+    interim = (fcf - schedule['total_payment']) * (years < holding_period[..., None])
+    exit_flows = exit_value[..., None] * (years == holding_period[..., None])
+    cash_flows = np.concatenate([-equity_invested[..., None], interim + exit_flows], axis=-1)
+
+    dscr = np.where(in_term, calculate_dscr(ebitda, schedule['total_payment']), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        leverage = np.where(in_term, schedule['beginning_balance'] / ebitda, np.nan)
+        leverage = np.where(in_term & (ebitda <= 0) & (schedule['beginning_balance'] > 0), np.inf, leverage)
+
+    rates, converged = solve_irr(cash_flows.reshape(-1, max_years + 1))
+    irr = np.where(converged, rates * 100, np.nan).reshape(shape)
+    moic = solve_moic(cash_flows.reshape(-1, max_years + 1)).reshape(shape)
+
+    # NaN DSCR (no debt service) never breaches; a missing IRR counts as missing the hurdle
+    dscr_breach = in_term & (dscr < min_dscr)
+    leverage_breach = in_term & (leverage > max_leverage)
+    any_breach = dscr_breach | leverage_breach
+    first_breach_year = np.where(any_breach.any(axis=-1), any_breach.argmax(axis=-1) + 1, 0)
+    with np.errstate(all='ignore'):
+        min_dscr_seen = np.fmin.reduce(dscr, axis=-1)
+        max_leverage_seen = np.fmax.reduce(leverage, axis=-1)
+    result = {
+        'exit_value': exit_value,
+        'irr': irr,
+        'moic': moic,
+        'min_dscr': min_dscr_seen,
+        'max_leverage': max_leverage_seen,
+        'dscr_breach': dscr_breach.any(axis=-1),
+        'leverage_breach': leverage_breach.any(axis=-1),
+        'irr_breach': ~(irr >= min_irr),
+        'first_breach_year': first_breach_year
+    }
+    if detail:
+        result.update({
+            'ebitda': np.where(in_term, ebitda, np.nan),
+            'debt_balance': np.where(in_term, schedule['ending_balance'], np.nan),
+            'debt_service': np.where(in_term, schedule['total_payment'], np.nan),
+            'dscr': dscr,
+            'leverage': leverage,
+            'cash_flows': cash_flows
+        })
+    return result
+
+def stress_shard(job):
+    """Process-pool entry point: stress one slice of the book."""
+    deals, shocks, max_years, options = job
+    return stress(deals, shocks, max_years, **options)
+
+def deal_columns(book):
+    """Engine-ready (deals,) arrays from a book DataFrame, filling missing assumptions with defaults."""
+    if 'revenues' not in book or book['revenues'].isna().any():
+        raise ValueError("Every deal needs a 'revenues' value")
+    columns = {'revenues': book['revenues'].to_numpy(dtype=float)}
+    for name in DEAL_COLUMNS[1:]:
+        if name == 'entry_multiple':
+            continue
+        values = book[name].fillna(DEFAULTS[name]) if name in book else DEFAULTS[name]
+        columns[name] = np.broadcast_to(np.asarray(values, dtype=float), (len(book),)).copy()
+    # Entry multiple falls back to the exit multiple, as in lbo.run_batch
+    entry = book['entry_multiple'].to_numpy(dtype=float) if 'entry_multiple' in book else np.nan
+    columns['entry_multiple'] = np.where(np.isnan(entry), columns['exit_multiple'], entry)
+    holding_period = columns['holding_period']
+    if not np.all((holding_period >= 1) & (holding_period == np.round(holding_period))):
+        raise ValueError("'holding_period' must be a whole number of at least 1 for every deal")
+    return columns
+
+def run(book, shocks=None, processes=None, shard_size=SHARD_SIZE, detail=True, **hurdles):
+    """Stress a book of deals (one row per deal) under named shock sets.
+
+    Returns the `stress` outputs for the whole book plus the deal and
+    shock names. Deals are processed `shard_size` at a time, in worker
+    processes when `processes` > 1; every shard shares one year axis so
+    the results concatenate along the deal axis. Pass `detail=False` to
+    skip the per-year tensors when only breaches and returns are needed.
+    """
+    shocks = SHOCKS if shocks is None else shocks
+    options = {**HURDLES, **hurdles, 'detail': detail}
+    columns = deal_columns(book)
+    arrays = shock_arrays(shocks)
+    max_years = int(columns['holding_period'].max()) if len(book) else 1
+    jobs = [
+        ({name: values[i:i + shard_size] for name, values in columns.items()}, arrays, max_years, options)
+        for i in range(0, len(book), shard_size)
+    ]
+    if processes and processes > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = list(pool.map(stress_shard, jobs))
+    else:
+        parts = [stress_shard(job) for job in jobs]
+    if not parts:
+        parts = [stress({name: values[:0] for name, values in columns.items()}, arrays, max_years, **options)]
+    result = {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+    deals = book['deal'] if 'deal' in book else book.get('ticker', book.index)
+    result['deals'] = list(deals)
+    result['shocks'] = list(shocks)
+    return result
+
+def breach_table(result):
+    """One row per deal and shock with IRR, MOIC, worst DSCR / leverage and breach flags."""
+    import pandas as pd
+    n_deals, n_shocks = len(result['deals']), len(result['shocks'])
+    index = pd.MultiIndex.from_product([result['deals'], result['shocks']], names=['deal', 'shock'])
+    names = ['irr', 'moic', 'min_dscr', 'max_leverage', 'dscr_breach', 'leverage_breach', 'irr_breach',
+             'first_breach_year']
+    table = pd.DataFrame({name: result[name].reshape(n_deals * n_shocks) for name in names}, index=index)
+    table['any_breach'] = table['dscr_breach'] | table['leverage_breach'] | table['irr_breach']
+    return table
+
+def summary(result):
+    """Per-shock totals: deals breaching each hurdle and the IRR distribution."""
+    import pandas as pd
+    irr = result['irr']
+    with np.errstate(all='ignore'):
+        return pd.DataFrame({
+            'deals': len(result['deals']),
+            'dscr_breaches': result['dscr_breach'].sum(axis=0),
+            'leverage_breaches': result['leverage_breach'].sum(axis=0),
+            'irr_breaches': result['irr_breach'].sum(axis=0),
+            'any_breach': (result['dscr_breach'] | result['leverage_breach'] | result['irr_breach']).sum(axis=0),
+            'median_irr': np.nanmedian(irr, axis=0) if irr.size else np.nan,
+            'p10_irr': np.nanpercentile(irr, 10, axis=0) if irr.size else np.nan,
+            'mean_moic': result['moic'].mean(axis=0) if irr.size else np.nan
+        }, index=pd.Index(result['shocks'], name='shock'))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress a book of LBO deals under named macro shocks.")
+    parser.add_argument('input', help="CSV or Parquet file with one row per deal and a 'revenues' column")
+    parser.add_argument('-o', '--output', default='stress.parquet', help="Parquet file for the deal x shock table")
+    parser.add_argument('-p', '--processes', type=int, default=None, help="Worker processes (default: run in-process)")
+    parser.add_argument('--shocks', metavar='JSON', help="JSON file of {name: {field: value}} shock sets")
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE, help="Deals per shard")
+    parser.add_argument('--min-dscr', type=float, default=HURDLES['min_dscr'])
+    parser.add_argument('--max-leverage', type=float, default=HURDLES['max_leverage'])
+    parser.add_argument('--min-irr', type=float, default=HURDLES['min_irr'])
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    start = time.perf_counter()
+    shocks = None
+    if args.shocks:
+        with open(args.shocks) as f:
+            shocks = json.load(f)
+    result = run(read_table(args.input), shocks, processes=args.processes, shard_size=args.shard_size, detail=False,
+                 min_dscr=args.min_dscr, max_leverage=args.max_leverage, min_irr=args.min_irr)
+    breach_table(result).reset_index().to_parquet(args.output, index=False)
+    print(summary(result).to_string(float_format=lambda x: f"{x:,.2f}"))
+    logger.info("Stressed %d deals x %d shocks in %.2fs -> %s", len(result['deals']), len(result['shocks']),
+                time.perf_counter() - start, args.output)
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
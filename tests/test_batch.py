@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+from modules import batch, dcf, financials_store, lbo
+
+def stored(root, ticker, revenue):
+    store = financials_store.FinancialsStore(str(root))
+    store.write(financials_store.normalize(ticker, [
+        {'end_date': '2024-12-31', 'fiscal_period': 'FY', 'financials': {'income_statement': {'revenues': revenue}}}
+    ]))
+
+def test_rows_match_the_engines(tmp_path):
+    stored(tmp_path, 'AAA', 1e8)
+    df = pd.DataFrame({'ticker': ['AAA', 'AAA', 'BBB'], 'debt_pct': [50.0, None, 60.0],
+                       'revenues': [None, None, 3e8]})
+    out = batch.run(df, store_root=str(tmp_path))
+    assert out['error'].isna().all()
+    data = {'financials': {'income': pd.DataFrame({'revenues': [1e8]})}}
+    d = batch.DEFAULTS
+    expected = dcf.run(data, d['rev_growth'], d['ebitda_margin'], d['discount_rate'], d['exit_multiple'], d['exit_year'])
+    assert out.loc[0, 'enterprise_value'] == pytest.approx(expected['enterprise_value'])
+    for row, debt_pct in ((0, 50.0), (1, d['debt_pct'])):
+        single = lbo.run(data, debt_pct, d['interest_rate'], d['exit_multiple'], d['exit_year'], d['holding_period'])
+        assert out.loc[row, 'irr'] == pytest.approx(single['irr'])
+    assert out.loc[2, 'purchase_price'] == pytest.approx(3 * lbo.run(data, 60.0, 5.0, 8.0, 5, 5)['purchase_price'])
+
+def test_missing_financials_are_flagged_not_fatal(tmp_path):
+    out = batch.run(pd.DataFrame({'ticker': ['ZZZ', 'YYY'], 'revenues': [None, 1e8]}), store_root=str(tmp_path))
+    assert out.loc[0, 'error'] == 'no financials' and pd.isna(out.loc[1, 'error'])
+    assert pd.isna(out.loc[0, 'irr']) and out.loc[1, 'irr'] > 0
+
+def test_cli_writes_parquet(tmp_path):
+    source, target = tmp_path / "in.csv", tmp_path / "out.parquet"
+    pd.DataFrame({'ticker': ['AAA', 'BBB'], 'revenues': [1e8, 2e8]}).to_csv(source, index=False)
+    assert batch.main([str(source), '-o', str(target), '--store', str(tmp_path / "store")]) == 0
+    written = pd.read_parquet(target)
+    assert written['equity_value'].iloc[1] == pytest.approx(2 * written['equity_value'].iloc[0])
@@ -0,0 +1,32 @@
+import importlib.util
+import json
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+spec = importlib.util.spec_from_file_location('bench_models', os.path.join(ROOT, 'benchmarks', 'models.py'))
+models = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(models)
+
+def result(name, size, rate):
+    return {'name': name, 'size': size, 'scenarios_per_s': rate}
+
+def test_compare_flags_only_drops_beyond_tolerance():
+    baseline = {'results': [result('a', 1, 100.0), result('b', 1, 100.0), result('c', 1, 100.0)]}
+    current = [result('a', 1, 85.0), result('b', 1, 70.0), result('c', 10, 1.0), result('new', 1, 1.0)]
+    assert models.compare(current, baseline, 0.2) == [('b', 1, 100.0, 70.0)]
+
+def test_report_and_regression_exit_code(tmp_path):
+    output = tmp_path / "run.json"
+    args = ['--sizes', '10', '--only', 'lbo.run_batch', 'irr.solve_irr', '--repeats', '1', '-o', str(output)]
+    assert models.main(args) == 0
+    report = json.loads(output.read_text())
+    assert [r['name'] for r in report['results']] == ['lbo.run_batch', 'irr.solve_irr']
+    assert all(r['scenarios_per_s'] > 0 for r in report['results'])
+
+    # A baseline that is impossibly fast makes the comparison fail
+    for r in report['results']:
+        r['scenarios_per_s'] *= 1e6
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(report))
+    assert models.main(args + ['--compare', str(baseline)]) == 1
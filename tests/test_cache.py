@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+import pytest
+import requests
+from modules import polygon_api
+from modules.cache import DiskCache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+class FakeSession:
+    """Counts GETs; fails while `down` is set and can hold requests at a gate."""
+
+    def __init__(self, gate=None):
+        self.calls = 0
+        self.down = False
+        self.gate = gate
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.down:
+            raise requests.ConnectionError("offline")
+        return FakeResponse({'status': 'OK', 'url': url, 'n': self.calls})
+
+@pytest.fixture
+def session(monkeypatch, tmp_path):
+    fake = FakeSession()
+    monkeypatch.setattr(polygon_api, 'SESSION', fake)
+    monkeypatch.setattr(polygon_api, 'CACHE', DiskCache(str(tmp_path / "responses.sqlite"), ttl=3600))
+    return fake
+
+def test_ttl_and_stale_reads(tmp_path):
+    cache = DiskCache(str(tmp_path / "c.sqlite"), ttl=0.05)
+    cache.set('AAA', 'company_info', {'status': 'OK'})
+    assert cache.get('AAA', 'company_info') == {'status': 'OK'}
+    time.sleep(0.1)
+    assert cache.get('AAA', 'company_info') is None
+    assert cache.get('AAA', 'company_info', allow_stale=True) == {'status': 'OK'}
+    assert cache.get('BBB', 'company_info', allow_stale=True) is None
+
+def test_fresh_entries_skip_the_network(session):
+    first = polygon_api.get_json('AAA', 'company_info', '/x')
+    second = polygon_api.get_json('AAA', 'company_info', '/x')
+    assert first == second and session.calls == 1
+
+def test_stale_entry_served_when_offline(session):
+    polygon_api.get_json('AAA', 'company_info', '/x')
+    polygon_api.CACHE.ttl = 0
+    session.down = True
+    assert polygon_api.get_json('AAA', 'company_info', '/x')['n'] == 1
+    with pytest.raises(requests.ConnectionError):
+        polygon_api.get_json('BBB', 'company_info', '/y')
+
+def test_concurrent_requests_share_one_call(session):
+    session.gate = threading.Event()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(polygon_api.get_json('AAA', 'market_data', '/m')))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    session.gate.set()
+    for t in threads:
+        t.join()
+    assert session.calls == 1
+    assert len(results) == 8 and all(r['n'] == 1 for r in results)
+
+def test_import_creates_no_files(tmp_path):
+    env = {**os.environ, 'PYTHONPATH': ROOT}
+    subprocess.run([sys.executable, '-c', 'from modules import polygon_api, comps'], cwd=tmp_path, env=env, check=True)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,33 @@
+import numpy as np
+from modules import charts
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x = np.arange(10000)
+    y = np.sin(x / 500.0)
+    y[4321] = 5.0
+    keep = charts.lttb(x, y, 200)
+    assert len(keep) == 200
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert (np.diff(keep) > 0).all()
+    assert 4321 in keep
+
+def test_small_series_pass_through():
+    x, y = charts.decimate([1, 2, 3], [4, 5, 6], max_points=10)
+    assert list(x) == [1, 2, 3] and list(y) == [4, 5, 6]
+    assert len(charts.lttb(np.arange(5), np.arange(5), 2)) == 5
+
+def test_large_lines_are_decimated_and_use_webgl():
+    small = charts.line(np.arange(100), np.arange(100))
+    large = charts.line(np.arange(50000), np.random.default_rng(0).normal(size=50000))
+    assert small.type == 'scatter' and large.type == 'scattergl'
+    assert len(large.x) == charts.MAX_POINTS
+
+def test_paths_become_one_trace_with_gaps():
+    trace = charts.paths(np.arange(4), np.ones((80, 4)), max_traces=50)
+    assert len(trace.y) == 50 * 5
+    assert np.isnan(np.asarray(trace.y, dtype=float)[4::5]).all()
+
+def test_bands_pair_percentiles_outside_in():
+    values = {p: np.full(3, float(p)) for p in (5, 25, 50, 75, 95)}
+    traces = charts.bands(np.arange(3), values)
+    assert [t.name for t in traces if t.name] == ["P5-P95", "P25-P75", "Median"]
@@ -0,0 +1,29 @@
+from modules import comps, financials_store, polygon_api
+
+def payloads(ticker, sector, revenue):
+    return {
+        'financials': {'status': 'OK', 'results': [{
+            'ticker': ticker, 'end_date': '2024-12-31', 'fiscal_period': 'FY',
+            'financials': {'income_statement': {'revenues': {'value': revenue},
+                                                'operating_income': {'value': revenue / 5},
+                                                'net_income': {'value': revenue / 10}}}
+        }]},
+        'company_info': {'status': 'OK', 'results': {'name': f"{ticker} Inc", 'market_cap': revenue * 3,
+                                                     'sic_description': sector}},
+        'market_data': {'status': 'OK', 'ticker': {'lastTrade': {'p': 10.0}, 'day': {'v': 1000}}}
+    }
+
+def test_fetched_company_lands_in_its_sector(monkeypatch, tmp_path):
+    universe = {'AAA': payloads('AAA', 'Semiconductors', 5e9), 'BBB': payloads('BBB', 'Retail', 8e9)}
+    monkeypatch.setattr(polygon_api, 'API_KEY', 'test-key')
+    monkeypatch.setattr(polygon_api, 'STORE', financials_store.FinancialsStore(str(tmp_path)))
+    monkeypatch.setattr(polygon_api, 'get_json', lambda ticker, endpoint, path: universe[ticker][endpoint])
+
+    table = comps.CompsTable()
+    changed, failures = table.refresh(list(universe))
+
+    assert failures == {}
+    assert sorted(changed) == ['AAA', 'BBB']
+    assert table.table.loc['AAA', 'sector'] == 'Semiconductors'
+    assert table.query(sector='Semiconductors')['peers'] == 1
+    assert table.query(sector=comps.UNKNOWN) is None
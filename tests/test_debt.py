@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from modules.debt import default_tranches, run_waterfall
+from modules.lbo import model_debt_equity
+
+def cash_identity(result, cfads):
+    """Left and right sides of the waterfall's per-year cash identity."""
+    uses = (result['cash_interest'] + result['tranches']['mandatory'].sum(axis=1)
+            + result['tranches']['sweep'].sum(axis=1) + result['revolver']['repay'] - result['revolver']['draw']
+            - result['shortfall'] + result['cash']['ending'] - result['cash']['beginning'])
+    return cfads, uses
+
+@pytest.mark.parametrize('sweep_pct', [0.0, 50.0, 100.0])
+def test_waterfall_conserves_cash(sweep_pct):
+    cfads = np.array([[5e6, -8e6, 30e6, 40e6, 60e6], [1e6, 2e6, 3e6, 4e6, 5e6], [-5e6, -5e6, 20e6, 0.0, 50e6]])
+    result = run_waterfall(cfads, default_tranches([20e6, 60e6, 10e6], 5.0), sweep_pct=sweep_pct, revolver_limit=6e6)
+    expected, actual = cash_identity(result, cfads)
+    assert np.allclose(expected, actual)
+    assert (result['cash']['ending'] >= 0).all()
+
+def test_unswept_cash_reaches_equity():
+    result = model_debt_equity(15e6, [20, 60], 5, 8, 5)
+    # Once the low-debt deal has repaid its sweepable tranches, the rest of its cash is retained
+    assert result['waterfall']['cash']['ending'][0, -1] > 0
+    expected = result['exit_value'] - result['waterfall']['total_debt'][:, -1] + result['waterfall']['cash']['ending'][:, -1]
+    assert np.allclose(result['exit_equity'], expected)
+    assert result['moic'][0] > 2.0
+
+def test_partial_sweep_keeps_the_rest():
+    full = model_debt_equity(15e6, 60, 5, 8, 5, sweep_pct=100)
+    half = model_debt_equity(15e6, 60, 5, 8, 5, sweep_pct=50)
+    assert half['waterfall']['cash']['ending'][0, -1] > 0
+    # Cash retained instead of repaying debt only changes equity by the interest it would have saved
+    assert abs(half['exit_equity'][0] - full['exit_equity'][0]) < 0.1 * full['exit_equity'][0]
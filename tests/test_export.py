@@ -0,0 +1,48 @@
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+from modules import export, lbo
+
+DATA = {'financials': {'income': pd.DataFrame({'revenues': [1e8]})}}
+
+def test_scenario_columns_split_year_axes():
+    columns = dict(export.scenario_columns({'irr': np.array([10.0, 20.0]), 'cash_flows': np.arange(6.0).reshape(2, 3)}))
+    assert list(columns) == ['irr', 'cash_flows[0]', 'cash_flows[1]', 'cash_flows[2]']
+    assert list(columns['cash_flows[2]']) == [2.0, 5.0]
+
+def test_valuation_workbook_is_readable_and_formatted():
+    outputs = lbo.run.uncached(DATA, 60.0, 5.0, 8.0, 5, 5)
+    sensitivity = pd.DataFrame([[10.0, 12.0], [14.0, np.nan]], index=pd.Index([7, 8], name='exit_multiple'),
+                               columns=pd.Index([50, 60], name='debt_pct'))
+    wb = load_workbook(io.BytesIO(export.workbook_bytes(lbo_outputs=outputs,
+                                                        sensitivities=[("IRR Grid", sensitivity, export.PERCENT)])))
+    assert wb.sheetnames == ["LBO", "LBO Cash Flows", "Debt Schedule", "IRR Grid"]
+    summary = {row[0].value: row[1] for row in wb["LBO"].iter_rows(min_row=4)}
+    assert summary["IRR"].value == pytest.approx(outputs['irr'])
+    assert summary["IRR"].number_format == export.PERCENT
+    grid = list(wb["IRR Grid"].values)
+    assert grid[2] == ('exit_multiple \\ debt_pct', 50, 60)
+    assert grid[4] == (8, 14.0, None)
+
+@pytest.mark.parametrize('fmt', ['parquet', 'csv', 'xlsx'])
+def test_export_scenarios_round_trips_across_chunks(tmp_path, fmt):
+    scenarios = {'debt_pct': np.linspace(30, 80, 25), 'irr': np.where(np.arange(25) == 3, np.nan, np.arange(25.0))}
+    path = export.export_scenarios(scenarios, str(tmp_path / f"scenarios.{fmt}"), chunk_size=7)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        assert pq.ParquetFile(path).num_row_groups == 4
+        back = pd.read_parquet(path)
+    elif fmt == 'csv':
+        back = pd.read_csv(path)
+    else:
+        back = pd.read_excel(path, sheet_name="Scenarios")
+    assert list(back.columns) == ['debt_pct', 'irr']
+    np.testing.assert_allclose(back['debt_pct'], scenarios['debt_pct'])
+    np.testing.assert_allclose(back['irr'], scenarios['irr'])
+
+def test_scenarios_bytes_needs_a_known_format():
+    assert export.scenarios_bytes({'irr': np.arange(3.0)}, 'csv').decode().splitlines() == ['irr', '0.0', '1.0', '2.0']
+    with pytest.raises(ValueError):
+        export.scenarios_bytes({'irr': np.arange(3.0)}, 'json')
@@ -0,0 +1,30 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from modules import financials_store
+
+def history(ticker, revenue):
+    return financials_store.normalize(ticker, [
+        {'end_date': '2024-12-31', 'fiscal_period': 'FY',
+         'financials': {'income_statement': {'revenues': {'value': revenue}}}},
+        {'end_date': '2023-12-31', 'fiscal_period': 'FY',
+         'financials': {'income_statement': {'revenues': revenue * 0.9}}}
+    ])
+
+def test_round_trip_keeps_latest_period_first(tmp_path):
+    store = financials_store.FinancialsStore(str(tmp_path))
+    store.write(history('AAA', 100.0))
+    financials = store.financials('AAA')
+    assert financials['income']['revenues'].tolist() == [100.0, 90.0]
+    assert store.financials('ZZZ') is None
+
+def test_concurrent_writes_of_one_ticker(tmp_path):
+    store = financials_store.FinancialsStore(str(tmp_path))
+
+    def write(i):
+        store.write(history('AAA', float(i)))
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(write, range(200)))
+    assert os.listdir(tmp_path) == ['AAA.arrow']
+    assert np.isfinite(store.financials('AAA')['income']['revenues'][0])
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules import goal_seek, lbo
+
+DATA = {'financials': {'income': pd.DataFrame({'revenues': [1e8]})}}
+
+def test_brent_solves_many_problems_and_flags_unbracketed():
+    targets = np.array([2.0, 9.0, 30.0, -1.0])
+    roots, converged, iterations = goal_seek.brent(lambda x, idx: x ** 2 - targets[idx], np.zeros(4), np.full(4, 5.0))
+    assert list(converged) == [True, True, False, False]
+    assert roots[:2] == pytest.approx(np.sqrt(targets[:2]), abs=1e-8)
+    assert np.isnan(roots[2:]).all()
+    assert (iterations[:2] < 20).all()
+
+def test_entry_multiple_hits_the_target_irr():
+    out = goal_seek.entry_multiple_for_irr(DATA, np.array([15.0, 20.0, 25.0]), 60.0, 5.0, 8.0, 5)
+    assert out['converged'].all()
+    assert out['irr'] == pytest.approx([15.0, 20.0, 25.0], abs=1e-4)
+    # A higher hurdle means paying less
+    assert (np.diff(out['entry_multiple']) < 0).all()
+    check = lbo.run_batch(DATA, 60.0, 5.0, 8.0, 5, entry_multiple=out['entry_multiple'][1])
+    assert float(check['irr']) == pytest.approx(20.0, abs=1e-4)
+
+def test_max_debt_binds_at_the_covenant():
+    out = goal_seek.max_debt_for_dscr(DATA, np.array([1.25, 2.0, 0.01]), 5.0, 8.0, 5)
+    assert out['converged'].all()
+    assert out['min_dscr'][:2] == pytest.approx([1.25, 2.0], abs=1e-4)
+    assert list(out['binding']) == [True, True, False]
+    assert out['debt_pct'][1] < out['debt_pct'][0] and out['debt_pct'][2] == pytest.approx(99.99)
+
+def test_no_financials_returns_none():
+    assert goal_seek.entry_multiple_for_irr({}, 20.0, 60.0, 5.0, 8.0, 5) is None
+    assert goal_seek.max_debt_for_dscr(None, 1.25, 5.0, 8.0, 5) is None
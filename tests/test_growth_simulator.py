@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+from modules import growth_simulator
+
+def test_deterministic_scenarios():
+    out = growth_simulator.simulate_growth_scenarios(100.0, 3, {'Flat': 0, 'Base': 10, 'Ramp': [0, 10, 20]})
+    assert out['Flat'] == pytest.approx([100.0] * 4)
+    assert out['Base'] == pytest.approx([100.0, 110.0, 121.0, 133.1])
+    assert out['Ramp'] == pytest.approx([100.0, 100.0, 110.0, 132.0])
+
+def test_zero_vol_paths_equal_the_mean_path():
+    sim = growth_simulator.simulate_paths(100.0, 5, 8.0, 0.0, 20, seed=1)
+    assert sim['paths'].shape == (20, 6)
+    assert np.allclose(sim['paths'], 100 * 1.08 ** np.arange(6))
+
+def test_persistence_widens_the_spread():
+    independent = growth_simulator.rate_paths(5.0, 2.0, 10, 20000, persistence=0.0, seed=0)
+    persistent = growth_simulator.rate_paths(5.0, 2.0, 10, 20000, persistence=0.9, seed=0)
+    assert independent[:, -1].std() == pytest.approx(2.0, rel=0.05)
+    # AR(1) variance after 10 years: sum of 0.81^k for k < 10
+    assert persistent[:, -1].std() == pytest.approx(2.0 * np.sqrt((1 - 0.81 ** 10) / 0.19), rel=0.05)
+
+def test_bands_keep_a_sample_and_are_seeded():
+    first = growth_simulator.simulate_bands.uncached(100.0, 5, 8.0, 3.0, 5000, seed=3, sample=10)
+    again = growth_simulator.simulate_bands.uncached(100.0, 5, 8.0, 3.0, 5000, seed=3, sample=10)
+    assert first['n_paths'] == 5000 and first['paths'].shape == (10, 6)
+    assert np.array_equal(first['bands'][50], again['bands'][50])
+    assert (first['bands'][5] <= first['bands'][50]).all() and (first['bands'][50] <= first['bands'][95]).all()
@@ -0,0 +1,69 @@
+import pytest
+from modules import instrumentation
+
+@pytest.fixture(autouse=True)
+def clean(monkeypatch):
+    monkeypatch.setattr(instrumentation, 'ENABLED', False)
+    monkeypatch.setattr(instrumentation, 'LOG_SPANS', False)
+    instrumentation.reset()
+    yield
+    instrumentation.reset()
+
+@instrumentation.timed("test.double")
+def double(x):
+    return 2 * x
+
+def test_disabled_records_nothing():
+    assert instrumentation.span("test.block") is instrumentation.NULL_SPAN
+    with instrumentation.span("test.block"):
+        pass
+    instrumentation.count("test.events")
+    assert double(3) == 6
+    assert instrumentation.snapshot() == ({}, {})
+
+def test_enabled_records_spans_counters_and_timed_calls():
+    instrumentation.enable()
+    with instrumentation.span("test.block"):
+        pass
+    instrumentation.count("test.events", 3)
+    instrumentation.count("test.events")
+    for x in range(4):
+        double(x)
+    stages, counters = instrumentation.snapshot()
+    assert counters == {'test.events': 4}
+    assert stages['test.block']['calls'] == 1
+    assert stages['test.double']['calls'] == 4
+    assert len(stages['test.double']['recent_ms']) == 4
+    instrumentation.disable()
+    double(5)
+    assert instrumentation.snapshot()[0]['test.double']['calls'] == 4
+
+def test_snapshot_percentiles_in_milliseconds():
+    for ms in range(1, 101):
+        instrumentation.observe("test.stage", ms / 1000)
+    stage = instrumentation.snapshot()[0]['test.stage']
+    assert stage['mean_ms'] == pytest.approx(50.5)
+    assert stage['p50_ms'] == pytest.approx(51.0)
+    assert stage['p99_ms'] == pytest.approx(100.0)
+    assert stage['max_ms'] == pytest.approx(100.0)
+
+def test_prometheus_histogram_is_cumulative():
+    instrumentation.enable()
+    for seconds in (0.0003, 0.002, 0.002, 20.0):
+        instrumentation.observe('test."quoted"', seconds)
+    instrumentation.count("test.events", 2)
+    text = instrumentation.prometheus_text(prefix="t")
+    assert 't_stage_seconds_bucket{stage="test.\\"quoted\\"",le="0.0005"} 1' in text
+    assert 't_stage_seconds_bucket{stage="test.\\"quoted\\"",le="0.0025"} 3' in text
+    assert 't_stage_seconds_bucket{stage="test.\\"quoted\\"",le="10.0"} 3' in text
+    assert 't_stage_seconds_bucket{stage="test.\\"quoted\\"",le="+Inf"} 4' in text
+    assert 't_stage_seconds_count{stage="test.\\"quoted\\""} 4' in text
+    assert 't_events_total{event="test.events"} 2' in text
+    assert text.endswith("\n")
+
+def test_reset_clears_everything():
+    instrumentation.enable()
+    instrumentation.observe("test.stage", 0.01)
+    instrumentation.count("test.events")
+    instrumentation.reset()
+    assert instrumentation.snapshot() == ({}, {})
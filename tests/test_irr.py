@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules import lbo
+from modules.irr import solve_irr, solve_moic
+
+def test_known_answers():
+    flows = [[-100, 110, 0, 0],         # 10% in one year
+             [-100, 0, 121, 0],         # 10% over two years
+             [-100, 60, 60, 0],         # 100 (1 + r)^2 = 60 (1 + r) + 60
+             [-1000, 100, 100, 1100]]   # par bond, 10% coupon
+    rates, converged = solve_irr(flows)
+    assert converged.all()
+    assert rates[:2] == pytest.approx([0.10, 0.10])
+    assert rates[2] == pytest.approx((60 + np.sqrt(60 ** 2 + 4 * 100 * 60)) / 200 - 1)
+    assert rates[3] == pytest.approx(0.10)
+
+def test_sign_changes_in_either_direction():
+    rates, converged = solve_irr([[-100, 50, 80], [100, -50, -80]])
+    assert converged.all()
+    assert rates[0] == pytest.approx(rates[1])
+    assert rates[0] == pytest.approx((50 + np.sqrt(50 ** 2 + 4 * 100 * 80)) / 200 - 1)
+
+def test_negative_irr():
+    rates, converged = solve_irr([[-100, 50]])
+    assert converged[0] and rates[0] == pytest.approx(-0.5)
+
+def test_no_real_root_gives_nan():
+    # All-negative, all-positive and same-sign-at-both-ends rows have no IRR in the bracket
+    rates, converged = solve_irr([[-100, -10, -10], [100, 10, 10], [-100, 250, -156.25]])
+    assert not converged.any()
+    assert np.isnan(rates).all()
+
+def test_nan_rows_do_not_poison_others():
+    rates, converged = solve_irr([[-100, np.nan, 121], [-100, 0, 121]])
+    assert list(converged) == [False, True]
+    assert np.isnan(rates[0]) and rates[1] == pytest.approx(0.10)
+
+def test_moic_counts_every_outflow_as_invested():
+    moic = solve_moic([[-100, 0, 250], [-100, -50, 300], [0, 10, 10], [-100, 20, 40]])
+    assert moic == pytest.approx([2.5, 2.0, 0.0, 0.6])
+
+def test_lbo_run_moic_is_inflows_over_all_outflows():
+    data = {'financials': {'income': pd.DataFrame({'revenues': [1e8]})}}
+    out = lbo.run(data, 60, 5.0, 8.0, 5, 5)
+    flows = np.asarray(out['cash_flows'])
+    assert flows[1:-1].max() < 0  # debt service exceeds FCF, so equity funds the early years
+    assert out['moic'] == pytest.approx(flows[flows > 0].sum() / -flows[flows < 0].sum())
+    assert out['moic'] == pytest.approx(2.4529, abs=1e-4)
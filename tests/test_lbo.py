@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules import lbo
+
+DATA = {'financials': {'income': pd.DataFrame({'revenues': [1e8]})}}
+
+def test_run_batch_matches_run_per_scenario():
+    debt_pct = np.array([40.0, 60.0, 75.0])[:, None]
+    holding_period = np.array([3, 5, 7])[None, :]
+    out = lbo.run_batch(DATA, debt_pct, 6.0, 9.0, holding_period)
+    assert out['irr'].shape == (3, 3)
+    for i, d in enumerate(debt_pct[:, 0]):
+        for j, h in enumerate(holding_period[0]):
+            single = lbo.run.uncached(DATA, d, 6.0, 9.0, 5, int(h))
+            assert out['irr'][i, j] == pytest.approx(single['irr'])
+            assert out['moic'][i, j] == pytest.approx(single['moic'])
+            assert out['cash_flows'][i, j, :h + 1] == pytest.approx(single['cash_flows'])
+            assert out['purchase_price'][i, j] == pytest.approx(single['purchase_price'])
+
+def test_flows_and_debt_stop_after_the_holding_period():
+    out = lbo.run_batch(DATA, 60.0, 5.0, 8.0, np.array([3, 5]))
+    assert (out['cash_flows'][0, 4:] == 0).all()
+    assert np.isnan(out['dscr'][0, 3:]).all()
+    assert out['debt_balance'][0, 2] == pytest.approx(0.0)
+
+def test_entry_multiple_defaults_to_exit_multiple():
+    same = lbo.run_batch(DATA, 60.0, 5.0, 8.0, 5)
+    explicit = lbo.run_batch(DATA, 60.0, 5.0, 8.0, 5, entry_multiple=8.0)
+    cheaper = lbo.run_batch(DATA, 60.0, 5.0, 8.0, 5, entry_multiple=6.0)
+    assert explicit['irr'] == pytest.approx(same['irr'])
+    assert cheaper['irr'] > same['irr']
+
+def test_missing_financials_returns_none():
+    assert lbo.run_batch({'financials': {'income': pd.DataFrame()}}, 60.0, 5.0, 8.0, 5) is None
@@ -0,0 +1,53 @@
+import pytest
+from modules import live, polygon_api
+
+def test_stop_joins_feed_and_reprice_threads():
+    book = live.LiveBook()
+    feed = live.SimulatedFeed(seed=0)
+    book.start(feed, interval=0.01)
+    threads = [feed.thread, book.thread]
+    assert all(t.is_alive() for t in threads)
+
+    book.stop()
+
+    assert not any(t.is_alive() for t in threads)
+    assert not book.running and book.feed is None and feed.thread is None
+
+ASSUMPTIONS = {'rev_growth': 10.0, 'ebitda_margin': 20.0, 'discount_rate': 10.0, 'exit_multiple': 8.0,
+               'exit_year': 5, 'debt_pct': 60.0, 'interest_rate': 5.0, 'holding_period': 5}
+
+def loaded_book(tickers=('AAA', 'BBB')):
+    book = live.LiveBook()
+    for t in tickers:
+        assert book.add(t, polygon_api.demo_data(), ASSUMPTIONS)
+    return book
+
+def test_ticks_coalesce_to_the_latest_price():
+    book = loaded_book()
+    start = book.marks().loc['AAA', 'price']
+    book.on_tick('AAA', start * 1.1, 1.0)
+    book.on_tick('AAA', start * 0.9, 2.0)
+    book.on_tick('ZZZ', 1.0, 2.0)
+    assert book.reprice() == 1
+    marks = book.marks()
+    assert marks.loc['AAA', 'price'] == pytest.approx(start * 0.9)
+    assert marks.loc['AAA', 'ticks'] == 1 and marks.loc['BBB', 'ticks'] == 0
+    # A cheaper entry means higher returns
+    assert marks.loc['AAA', 'entry_irr'] > marks.loc['BBB', 'entry_irr']
+    assert marks.loc['AAA', 'entry_moic'] > marks.loc['BBB', 'entry_moic']
+
+def test_premium_raises_the_entry_price():
+    book = loaded_book()
+    before = book.marks()['entry_irr']
+    book.set_premium(live.TAKEOVER_PREMIUM + 20)
+    assert (book.marks()['entry_irr'] < before).all()
+
+def test_release_keeps_names_other_sessions_watch():
+    book = loaded_book(('AAA', 'BBB', 'CCC'))
+    book.watch('one', ['AAA', 'BBB'])
+    book.watch('two', ['BBB', 'CCC'])
+    book.release('one')
+    assert book.names == ['BBB', 'CCC']
+    assert book.marks().index.tolist() == ['BBB', 'CCC']
+    book.release('two')
+    assert len(book) == 0
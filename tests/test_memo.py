@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules import dcf
+from modules.memo import LRUCache, memoize, stable_hash
+
+def test_stable_hash_is_type_and_content_sensitive():
+    assert stable_hash({'a': 1, 'b': [1, 2]}) == stable_hash({'b': [1, 2], 'a': 1})
+    assert stable_hash(1) != stable_hash(1.0)
+    assert stable_hash([1, 2]) != stable_hash((1, 2))
+    assert stable_hash(np.arange(3)) != stable_hash(np.arange(3.0))
+    df = pd.DataFrame({'revenues': [1e8]})
+    assert stable_hash(df) == stable_hash(df.copy())
+    assert stable_hash(df) != stable_hash(pd.DataFrame({'revenues': [2e8]}))
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None and cache.get('a') == 1
+    assert cache.stats()['evictions'] == 1
+
+def test_memoize_calls_once_per_distinct_arguments():
+    calls = []
+
+    @memoize(maxsize=8)
+    def double(x, scale=2):
+        calls.append(x)
+        return x * scale
+
+    assert double(3) == double(3) == 6
+    assert double(3, scale=3) == 9
+    assert calls == [3, 3]
+    assert double.uncached(3) == 6 and calls == [3, 3, 3]
+    assert double.cache.stats()['hits'] == 1
+
+def test_engine_cache_keys_on_data_content():
+    data = {'financials': {'income': pd.DataFrame({'revenues': [1e8]})}}
+    first = dcf.run(data, 8, 22, 10, 8, 5)
+    again = dcf.run({'financials': {'income': pd.DataFrame({'revenues': [1e8]})}}, 8, 22, 10, 8, 5)
+    other = dcf.run({'financials': {'income': pd.DataFrame({'revenues': [2e8]})}}, 8, 22, 10, 8, 5)
+    assert again is first
+    assert other['enterprise_value'] == pytest.approx(2 * first['enterprise_value'])
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules import monte_carlo
+
+DATA = {'financials': {'income': pd.DataFrame({'revenues': [1e8]})}}
+BASE = {'debt_pct': 60.0, 'interest_rate': 5.0, 'exit_multiple': 8.0, 'holding_period': 5}
+
+def test_histogram_moments_and_quantiles():
+    values = np.random.default_rng(0).normal(10, 2, 20000)
+    hist = monte_carlo.StreamingHistogram(np.linspace(0, 20, 201)).update(values)
+    summary = hist.summary()
+    assert summary['count'] == 20000
+    assert summary['mean'] == pytest.approx(values.mean())
+    assert summary['std'] == pytest.approx(values.std())
+    assert summary['percentiles'][50] == pytest.approx(np.median(values), abs=0.05)
+    assert summary['percentiles'][95] == pytest.approx(np.percentile(values, 95), abs=0.05)
+
+def test_merged_histograms_equal_one_pass():
+    values = np.append(np.random.default_rng(1).uniform(-5, 15, 5000), [np.nan, 50.0])
+    edges = np.linspace(0, 10, 51)
+    whole = monte_carlo.StreamingHistogram(edges).update(values)
+    parts = monte_carlo.StreamingHistogram(edges).update(values[:1234])
+    parts.merge(monte_carlo.StreamingHistogram(edges).update(values[1234:]))
+    assert (parts.counts == whole.counts).all()
+    assert (parts.underflow, parts.overflow, parts.missing) == (whole.underflow, whole.overflow, 1)
+    assert parts.mean == pytest.approx(whole.mean) and parts.m2 == pytest.approx(whole.m2)
+    assert parts.max == 50.0
+
+def test_seeded_runs_are_chunking_independent():
+    one = monte_carlo.simulate('lbo', DATA, BASE, n_paths=3000, chunk_size=3000, seed=7)
+    again = monte_carlo.simulate('lbo', DATA, BASE, n_paths=3000, chunk_size=3000, seed=7)
+    assert one['summaries']['irr']['mean'] == again['summaries']['irr']['mean']
+    chunked = monte_carlo.simulate('lbo', DATA, BASE, n_paths=3000, chunk_size=1000, seed=7)
+    assert chunked['summaries']['irr']['count'] + chunked['summaries']['irr']['missing'] == 3000
+    pooled = monte_carlo.simulate('lbo', DATA, BASE, n_paths=3000, chunk_size=1000, seed=7, processes=2)
+    assert pooled['summaries']['irr']['mean'] == pytest.approx(chunked['summaries']['irr']['mean'], rel=1e-12)
+    # Different chunking draws different paths but the same distribution
+    assert chunked['summaries']['irr']['mean'] == pytest.approx(one['summaries']['irr']['mean'], rel=0.05)
+
+def test_no_financials_returns_none():
+    assert monte_carlo.simulate('dcf', {}, {'rev_growth': 8, 'ebitda_margin': 22, 'discount_rate': 10,
+                                            'exit_multiple': 8, 'exit_year': 5}, n_paths=10) is None
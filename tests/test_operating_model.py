@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from modules.operating_model import OperatingModel
+
+def test_default_projection():
+    model = OperatingModel(100.0, 3, rev_growth=10)
+    assert model['revenue'] == pytest.approx([110.0, 121.0, 133.1])
+    assert model['ebitda'] == pytest.approx(0.22 * model['revenue'])
+    # Zero D&A, capex and working capital at a 30% tax rate leaves FCF = 0.7 x EBITDA
+    assert model['fcf'] == pytest.approx(0.7 * model['ebitda'])
+
+def test_working_capital_and_capex_reduce_fcf():
+    model = OperatingModel(100.0, 2, rev_growth=10, ebitda_margin=20, da_pct=5, capex_pct=4, nwc_pct=10, tax_rate=25)
+    revenue = np.array([110.0, 121.0])
+    ebit = revenue * 0.15
+    delta_nwc = np.diff(np.concatenate([[10.0], revenue * 0.10]))
+    assert model['fcf'] == pytest.approx(revenue * 0.20 - ebit * 0.25 - revenue * 0.04 - delta_nwc)
+
+def test_update_recomputes_downstream_from_the_changed_year():
+    model = OperatingModel(100.0, 5, rev_growth=[5, 5, 5, 5, 5])
+    model.update(ebitda_margin=[22, 22, 30, 30, 30])
+    assert dict(model.recomputed) == {'ebitda': 2, 'ebit': 2, 'taxes': 2, 'fcf': 2}
+    fresh = OperatingModel(100.0, 5, rev_growth=5, ebitda_margin=[22, 22, 30, 30, 30])
+    for item in ('revenue', 'ebitda', 'taxes', 'fcf'):
+        assert model[item] == pytest.approx(fresh[item])
+
+def test_unchanged_update_is_a_no_op():
+    model = OperatingModel(100.0, 3)
+    model.update(rev_growth=8.0)
+    assert model.recomputed == []
+
+def test_scenario_axes_broadcast():
+    model = OperatingModel(np.array([100.0, 200.0]), 4, rev_growth=np.array([[0.0], [10.0]]))
+    assert model['revenue'].shape == (2, 4)
+    assert model['revenue'][0] == pytest.approx([100.0] * 4)
+    assert model['revenue'][1, -1] == pytest.approx(200 * 1.1 ** 4)
@@ -0,0 +1,59 @@
+import pytest
+from modules import financials_store, polygon_api
+
+FINANCIALS = {'status': 'OK', 'results': [{
+    'end_date': '2024-12-31', 'fiscal_period': 'FY',
+    'financials': {'income_statement': {'revenues': {'value': 5e9}}}
+}]}
+
+@pytest.fixture
+def api(monkeypatch, tmp_path):
+    monkeypatch.setattr(polygon_api, 'API_KEY', 'test-key')
+    monkeypatch.setattr(polygon_api, 'STORE', financials_store.FinancialsStore(str(tmp_path)))
+    calls = []
+
+    def install(respond):
+        def get_json(ticker, endpoint, path):
+            calls.append((ticker, endpoint))
+            return respond(ticker, endpoint, sum(c == (ticker, endpoint) for c in calls))
+        monkeypatch.setattr(polygon_api, 'get_json', get_json)
+        return calls
+    return install
+
+def payload(ticker, endpoint, attempt):
+    if endpoint == 'financials':
+        return FINANCIALS
+    if endpoint == 'company_info':
+        return {'status': 'OK', 'results': {'name': ticker, 'market_cap': 1e10}}
+    return {'status': 'OK', 'ticker': {'lastTrade': {'p': 10.0}, 'day': {'v': 100}}}
+
+def test_rate_limited_requests_are_retried(api):
+    def respond(ticker, endpoint, attempt):
+        if endpoint == 'market_data' and attempt < 3:
+            raise polygon_api.RateLimited(retry_after=0.001)
+        return payload(ticker, endpoint, attempt)
+    calls = api(respond)
+    fetched = polygon_api.fetch_many(['AAA', 'AAA', 'BBB'], backoff=0.001)
+    assert fetched['failures'] == {}
+    assert list(fetched['results'].index) == ['AAA', 'BBB']
+    assert fetched['results'].loc['AAA', 'price'] == 10.0
+    assert calls.count(('AAA', 'market_data')) == 3 and calls.count(('AAA', 'financials')) == 1
+
+def test_failures_are_reported_per_endpoint(api):
+    def respond(ticker, endpoint, attempt):
+        if ticker == 'BAD' and endpoint == 'company_info':
+            return {'status': 'NOT_FOUND', 'message': 'unknown ticker'}
+        if ticker == 'SLOW':
+            raise polygon_api.RateLimited(retry_after=0.001)
+        return payload(ticker, endpoint, attempt)
+    api(respond)
+    fetched = polygon_api.fetch_many(['AAA', 'BAD', 'SLOW'], retries=1, backoff=0.001)
+    assert fetched['failures']['BAD'] == {'company_info': 'unknown ticker'}
+    assert set(fetched['failures']['SLOW']) == set(polygon_api.ENDPOINTS)
+    # A partial failure keeps the endpoints that did succeed
+    assert fetched['results'].loc['BAD', 'revenues'] == 5e9
+
+def test_fetched_financials_land_in_the_store(api):
+    api(payload)
+    polygon_api.fetch_many(['AAA'])
+    assert polygon_api.default_store().financials('AAA')['income']['revenues'][0] == 5e9
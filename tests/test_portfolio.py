@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from modules import portfolio
+
+DATES = ['2020-01-01', '2021-06-01']
+
+def test_revenue_alone_varies_per_deal():
+    book = portfolio.Portfolio('2020-01-01')
+    book.model_deals(['A', 'B'], DATES, [1e8, 2e8], 60, 5.0, 8.0, 5)
+    a, b = book.cash_flows
+    # Every LBO output scales with revenue
+    assert np.allclose(b, 2 * a)
+
+def test_scalar_inputs_give_one_row_per_deal():
+    book = portfolio.Portfolio('2020-01-01')
+    book.model_deals(['A', 'B'], DATES, 1e8, 60, 5.0, 8.0, 5)
+    assert book.cash_flows.shape == (2, 6)
+    assert np.allclose(book.cash_flows[0], book.cash_flows[1])
+
+def test_fund_totals_match_deal_flows():
+    book = portfolio.Portfolio('2020-01-01')
+    book.model_deals(['A', 'B'], DATES, [1e8, 2e8], [50, 60], 5.0, 8.0, [4, 5])
+    metrics = book.metrics()
+    flows = book.cash_flows
+    assert metrics['contributions'].sum() == pytest.approx(np.maximum(-flows, 0).sum())
+    assert metrics['distributions'].sum() == pytest.approx(np.maximum(flows, 0).sum())
+    # After every exit the fund holds nothing
+    assert metrics['nav'][-1] == pytest.approx(0.0)
+    assert metrics['final_tvpi'] == pytest.approx(metrics['final_dpi'])
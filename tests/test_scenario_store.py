@@ -0,0 +1,55 @@
+import pytest
+from modules import polygon_api, scenario_store
+
+BASE = {'rev_growth': 10.0, 'ebitda_margin': 20.0, 'discount_rate': 10.0, 'exit_multiple': 8.0,
+        'exit_year': 5, 'debt_pct': 60.0, 'interest_rate': 5.0, 'holding_period': 5}
+
+@pytest.fixture
+def store(tmp_path):
+    return scenario_store.ScenarioStore(str(tmp_path))
+
+def test_versions_count_per_case_and_equal_inputs_share_outputs(store, tmp_path):
+    data = polygon_api.demo_data()
+    first = store.save("Acme", "Base", data, BASE)
+    second = store.save("Acme", "Base", data, BASE)
+    upside = store.save("Acme", "Upside", data, {**BASE, 'rev_growth': 15.0})
+    assert (first['version'], second['version'], upside['version']) == (1, 2, 1)
+    assert (first['deduplicated'], second['deduplicated'], upside['deduplicated']) == (False, True, False)
+    assert second['lbo_irr'] == first['lbo_irr']
+    assert len(list((tmp_path / "outputs").iterdir())) == 2
+    assert list(store.list(deal="Acme", name="Base").index) == [2, 1]
+
+def test_load_returns_the_saved_outputs(store):
+    data = polygon_api.demo_data()
+    outputs = scenario_store.evaluate(data, BASE)
+    saved = store.save("Acme", "Base", data, BASE)
+    loaded = store.load(saved['id'])
+    assert loaded['assumptions'] == BASE
+    assert loaded['dcf']['enterprise_value'] == pytest.approx(outputs['dcf']['enterprise_value'])
+    assert loaded['dcf']['fcf_list'] == pytest.approx(list(outputs['dcf']['fcf_list']))
+    assert loaded['lbo']['irr'] == pytest.approx(outputs['lbo']['irr'])
+    assert loaded['lbo']['cash_flows'] == pytest.approx(list(outputs['lbo']['cash_flows']))
+    expected = outputs['lbo']['debt_schedule']
+    assert list(loaded['lbo']['debt_schedule'].columns) == list(expected.columns)
+    assert loaded['lbo']['debt_schedule'].to_numpy() == pytest.approx(expected.to_numpy())
+    with pytest.raises(KeyError):
+        store.load(99)
+
+def test_catalog_survives_a_new_store(store, tmp_path):
+    store.save("Acme", "Base", polygon_api.demo_data(), BASE)
+    assert list(scenario_store.ScenarioStore(str(tmp_path)).list()['name']) == ["Base"]
+
+def test_diff_shows_only_what_changed(store):
+    data = polygon_api.demo_data()
+    a = store.save("Acme", "Base", data, BASE)['id']
+    b = store.save("Acme", "Base", data, {**BASE, 'debt_pct': 70.0})['id']
+    diff = store.diff(a, b)
+    assert 'debt_pct' in diff.index and diff.loc['debt_pct', 'change'] == pytest.approx(10.0)
+    assert 'rev_growth' not in diff.index
+    assert 'dcf_enterprise_value' not in diff.index
+    assert 'lbo_irr' in diff.index
+    assert list(store.compare([a, b]).columns) == [f"Base v1 (#{a})", f"Base v2 (#{b})"]
+
+def test_saving_without_financials_fails(store):
+    with pytest.raises(ValueError):
+        store.save("Acme", "Base", {}, BASE)
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules import dcf, lbo, polygon_api, sensitivity
+
+DATA = {'financials': {'income': pd.DataFrame({'revenues': [1e8]})}}
+BASE = {'debt_pct': 60.0, 'interest_rate': 5.0, 'exit_multiple': 8.0, 'holding_period': 5}
+
+def test_table_cells_match_single_runs():
+    out = sensitivity.lbo_irr_table(DATA, BASE, [6.0, 8.0, 10.0], [40.0, 60.0])
+    assert out.shape == (3, 2)
+    for exit_multiple in out.index:
+        for debt_pct in out.columns:
+            single = lbo.run_batch(DATA, debt_pct, 5.0, exit_multiple, 5)
+            assert out.loc[exit_multiple, debt_pct] == pytest.approx(float(single['irr']))
+
+def test_cube_flattens_leading_axes():
+    axes = [('exit_multiple', [6.0, 8.0]), ('debt_pct', [40.0, 60.0]), ('interest_rate', [4.0, 5.0, 6.0])]
+    out = sensitivity.cube('lbo', DATA, BASE, axes, 'irr')
+    assert out.shape == (4, 3)
+    assert out.loc[(8.0, 60.0), 5.0] == pytest.approx(float(lbo.run_batch(DATA, 60.0, 5.0, 8.0, 5)['irr']))
+
+def test_no_financials_gives_empty_table():
+    assert sensitivity.lbo_irr_table({}, BASE, [8.0], [60.0]).empty
+
+def test_dcf_table_matches_scalar_engine():
+    data = polygon_api.demo_data()
+    base = {'rev_growth': 10.0, 'ebitda_margin': 20.0, 'discount_rate': 10.0, 'exit_multiple': 8.0, 'exit_year': 5}
+    out = sensitivity.dcf_ev_table(data, base, [8.0, 12.0], [5.0, 10.0, 15.0])
+    assert out.shape == (2, 3)
+    assert out.loc[12.0, 15.0] == pytest.approx(dcf.run.uncached(data, 15.0, 20.0, 12.0, 8.0, 5)['enterprise_value'])
+    # Value falls with the discount rate and rises with growth
+    assert (np.diff(out.to_numpy(), axis=0) < 0).all()
+    assert (np.diff(out.to_numpy(), axis=1) > 0).all()
@@ -0,0 +1,30 @@
+import asyncio
+import pandas as pd
+import pytest
+from modules import batch, lbo, server
+
+def test_lbo_defaults_agree_with_engine_and_batch():
+    d = server.DEFAULTS
+    served = server.batch_lbo([server.parse('lbo', {'revenue': 1e8})])[0]
+    engine = lbo.run({'financials': {'income': pd.DataFrame({'revenues': [1e8]})}}, d['debt_pct'], d['interest_rate'],
+                     d['exit_multiple'], d['exit_year'], int(d['holding_period']))
+    batched = batch.run(pd.DataFrame({'ticker': ['X'], 'revenues': [1e8]})).iloc[0]
+    for name in ('purchase_price', 'irr', 'moic'):
+        assert served[name] == pytest.approx(engine[name]) == pytest.approx(batched[name])
+
+@pytest.mark.parametrize('length', [b'abc', b'-5'])
+def test_bad_content_length_gets_400(length):
+    async def request():
+        app = server.Server(workers=1)
+        await app.start('127.0.0.1', 0)
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', app.port)
+            writer.write(b"POST /lbo HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+            await writer.drain()
+            status = await reader.readline()
+            writer.close()
+            return status
+        finally:
+            await app.close()
+
+    assert asyncio.run(request()).split()[1] == b'400'
@@ -0,0 +1,16 @@
+import importlib.util
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_benchmark():
+    spec = importlib.util.spec_from_file_location('startup', os.path.join(ROOT, 'benchmarks', 'startup.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_app_starts_bare_without_loading_tab_modules():
+    startup = load_benchmark()
+    result = startup.run_once()
+    assert result['loaded'] == []
+    assert result['n_modules'] > 0
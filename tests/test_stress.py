@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules import lbo, stress
+from modules.batch import DEFAULTS
+
+@pytest.mark.parametrize('holding_period', [0, -3, 2.5])
+def test_deal_columns_rejects_bad_holding_period(holding_period):
+    with pytest.raises(ValueError, match='holding_period'):
+        stress.deal_columns(pd.DataFrame({'revenues': [1e8], 'holding_period': [holding_period]}))
+
+BOOK = pd.DataFrame({'deal': ['A', 'B', 'C'], 'revenues': [1e8, 5e8, 2e9], 'debt_pct': [50.0, 60.0, 70.0],
+                     'holding_period': [3, 5, 7]})
+
+def test_base_shock_matches_lbo_engine():
+    result = stress.run(BOOK)
+    base = result['shocks'].index('base')
+    for i, deal in BOOK.iterrows():
+        data = {'financials': {'income': pd.DataFrame({'revenues': [deal['revenues']]})}}
+        expected = lbo.run_batch(data, deal['debt_pct'], DEFAULTS['interest_rate'], DEFAULTS['exit_multiple'],
+                                 deal['holding_period'], ebitda_margin=DEFAULTS['ebitda_margin'],
+                                 ebitda_growth=DEFAULTS['ebitda_growth'])
+        assert result['irr'][i, base] == pytest.approx(float(expected['irr']))
+        assert result['moic'][i, base] == pytest.approx(float(expected['moic']))
+
+def test_adverse_shocks_lower_returns_and_flag_breaches():
+    table = stress.breach_table(stress.run(BOOK))
+    irr = table['irr'].unstack()
+    for shock in ['rates +300bp', 'exit -2x', 'ebitda -20%', 'combined']:
+        assert (irr[shock] < irr['base']).all()
+    assert (irr['combined'] < irr[['rates +300bp', 'exit -2x', 'ebitda -20%']].min(axis=1)).all()
+    assert (table['irr_breach'] == (table['irr'] < stress.HURDLES['min_irr'])).all()
+    assert table.loc[('A', 'combined'), 'any_breach']
+
+def test_shards_and_processes_do_not_change_results():
+    whole = stress.run(BOOK, detail=False)
+    sharded = stress.run(BOOK, shard_size=1, processes=2, detail=False)
+    np.testing.assert_allclose(sharded['irr'], whole['irr'])
+    np.testing.assert_array_equal(sharded['dscr_breach'], whole['dscr_breach'])
+
+def test_unknown_shock_field_is_rejected():
+    with pytest.raises(ValueError, match='fx_pct'):
+        stress.run(BOOK, shocks={'fx': {'fx_pct': 10}})